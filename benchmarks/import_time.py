@@ -0,0 +1,108 @@
+"""Cold-start import cost of the CLI and of a validators-only import.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --baseline HEAD~1
+
+Each target is imported in a fresh interpreter under ``-X importtime``, and
+the cumulative time of its top-level module is reported. The median over
+several runs is used. With ``--baseline`` the same targets are also measured
+in a temporary git worktree of that revision.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "cli": "main",
+    "validators": "lib.validators",
+    "obsidian": "lib.obsidian",
+    "workflow": "lib.workflow",
+}
+
+
+def import_time_us(module: str, cwd: str) -> Optional[int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if result.returncode != 0:
+        return None
+
+    # Lines look like "import time:   self [us] | cumulative | imported package".
+    for line in reversed(result.stderr.splitlines()):
+        if not line.startswith("import time:"):
+            continue
+        parts = [part.strip() for part in line[len("import time:") :].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def measure(cwd: str, runs: int) -> Dict[str, Optional[float]]:
+    results: Dict[str, Optional[float]] = {}
+    for name, module in TARGETS.items():
+        samples: List[int] = []
+        for _ in range(runs):
+            elapsed = import_time_us(module, cwd)
+            if elapsed is None:
+                break
+            samples.append(elapsed)
+        results[name] = statistics.median(samples) / 1000 if samples else None
+    return results
+
+
+def measure_revision(revision: str, runs: int) -> Dict[str, Optional[float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, "baseline")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, revision],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+        )
+        try:
+            return measure(worktree, runs)
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                cwd=REPO_ROOT,
+                capture_output=True,
+            )
+
+
+def format_ms(value: Optional[float]) -> str:
+    return f"{value:8.1f} ms" if value is not None else "   failed"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", metavar="REV", help="git revision to compare")
+    args = parser.parse_args(argv)
+
+    current = measure(REPO_ROOT, args.runs)
+    baseline = measure_revision(args.baseline, args.runs) if args.baseline else None
+
+    print(f"⏱️ Import time, median of {args.runs} cold runs:")
+    for name, module in TARGETS.items():
+        line = f"  • {name:<10} ({module}): {format_ms(current[name])}"
+        if baseline is not None:
+            line += f"   baseline {format_ms(baseline[name])}"
+            if current[name] and baseline[name]:
+                line += f"   {baseline[name] / current[name]:.1f}x"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+"""Load and soak harness for concurrent automation runs.
+
+    python benchmarks/load_test.py --levels 1,2,4,8,16 --step-seconds 60
+    python benchmarks/load_test.py --soak-minutes 240 --soak-concurrency 8
+
+Each level runs N worker threads that call ``run_automation`` back to back
+for ``--step-seconds``. Calls go to a fake LLM with lognormal latency, a slow
+tail and injected errors, and blog scraping hits a local fixture server, so
+nothing leaves the machine. For every level the report shows throughput,
+p50/p95/p99 job latency, error rate and RSS. A soak run holds one level for
+a long time, samples RSS, and reports its growth rate.
+
+Everything the pipeline persists (blobs, archive, caches) goes to a
+temporary directory.
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Shared across levels so every job scrapes its own page and sends its own
+# prompts; repeats would be coalesced or cached and flatter the numbers.
+_job_ids = itertools.count(1)
+
+BLOG_PARAGRAPHS = 40
+FILLER = (
+    "Resolvers cache answers for the TTL the authoritative server hands out, "
+    "so a change propagates only as caches expire. Negative answers are cached "
+    "too, which is why a freshly created record can look missing for minutes. "
+)
+
+
+class FakeResponse:
+    def __init__(self, content: str, prompt: str):
+        self.content = content
+        self.usage_metadata = {
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(content) // 4,
+        }
+
+
+class FakeChatModel:
+    # Stands in for ChatGoogleGenerativeAI with the same invoke/ainvoke/batch
+    # surface. Replies are shaped per prompt template so every parser
+    # downstream sees plausible input.
+
+    def __init__(self, args: argparse.Namespace, seed: int):
+        self.args = args
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self) -> tuple:
+        with self._lock:
+            latency = self._rng.lognormvariate(
+                math.log(self.args.llm_latency_ms / 1000), self.args.llm_latency_sigma
+            )
+            if self._rng.random() < self.args.llm_tail_rate:
+                latency *= 10
+            failed = self._rng.random() < self.args.llm_error_rate
+            score = round(self._rng.uniform(5.5, 9.5), 1)
+            salt = self._rng.randrange(1 << 30)
+        return latency * self.args.time_scale, failed, score, salt
+
+    def _reply(self, prompt: str, score: float, salt: int) -> str:
+        if '"overall_score"' in prompt:
+            return json.dumps(
+                {
+                    "overall_score": score,
+                    "issues": [
+                        {
+                            "type": "specificity",
+                            "severity": "medium",
+                            "description": "Abstract claim",
+                            "suggestion": "Add a concrete number",
+                            "example": "",
+                        }
+                    ]
+                    if score < 8
+                    else [],
+                    "strengths": ["Clear hook"],
+                    "actionable_edits": [],
+                    "improvement_priority": "medium" if score < 8 else "low",
+                    "needs_human_review": False,
+                    "preserve_original": True,
+                    "banlist_hits": [],
+                }
+            )
+        if "fact-checking" in prompt:
+            return "No concerning claims found."
+        if "X (Twitter) thread" in prompt:
+            return "\n\n".join(
+                f"{i}/ Point {i} on caching and TTLs ({salt + i})." for i in range(1, 8)
+            )
+        paragraph = f"Run {salt}. {FILLER}"
+        return (paragraph * (1100 // len(paragraph) + 1))[:1100] + " What would you cache?"
+
+    def invoke(self, prompt: str) -> FakeResponse:
+        latency, failed, score, salt = self._draw()
+        time.sleep(latency)
+        if failed:
+            raise RuntimeError("503 injected upstream error")
+        return FakeResponse(self._reply(prompt, score, salt), prompt)
+
+    async def ainvoke(self, prompt: str) -> FakeResponse:
+        import asyncio
+
+        latency, failed, score, salt = self._draw()
+        await asyncio.sleep(latency)
+        if failed:
+            raise RuntimeError("503 injected upstream error")
+        return FakeResponse(self._reply(prompt, score, salt), prompt)
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def call(prompt):
+            try:
+                return self.invoke(prompt)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            return list(executor.map(call, prompts))
+
+    async def abatch(self, prompts, config=None, return_exceptions=False):
+        import asyncio
+
+        return await asyncio.gather(
+            *(self.ainvoke(prompt) for prompt in prompts),
+            return_exceptions=return_exceptions,
+        )
+
+
+def start_blog_server(latency_ms: float) -> ThreadingHTTPServer:
+    class BlogHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            paragraphs = "".join(
+                f"<p>{self.path} section {i}. {FILLER}</p>"
+                for i in range(BLOG_PARAGRAPHS)
+            )
+            body = (
+                f"<html><head><title>Post {self.path}</title></head><body>"
+                f"<nav>menu</nav><article><h1>Post {self.path}</h1>{paragraphs}"
+                "</article><footer>footer</footer></body></html>"
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BlogHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", "r") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # Peak rather than current RSS (KB on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class LoadRun:
+    def __init__(self, args: argparse.Namespace, blog_base: str):
+        from lib.workflow import run_automation
+
+        self.args = args
+        self.blog_base = blog_base
+        self.run_automation = run_automation
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.completed = 0
+
+    def run_job(self) -> None:
+        job = next(_job_ids)
+        started = time.perf_counter()
+        error = None
+        try:
+            final_state = self.run_automation(
+                idea_text=f"Load test idea {job}: eventual consistency in DNS",
+                blog_url=f"{self.blog_base}/blog/{job}",
+                phase="final",
+            )
+            error = final_state.get("error")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.completed += 1
+            self.latencies.append(elapsed)
+            if error:
+                key = str(error)[:80]
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def drive(self, concurrency: int, seconds: float, on_tick=None) -> None:
+        deadline = time.monotonic() + seconds
+
+        def worker():
+            while time.monotonic() < deadline:
+                self.run_job()
+
+        threads = [
+            threading.Thread(target=worker, daemon=True) for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=self.args.sample_seconds)
+                if on_tick:
+                    on_tick()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self.latencies)
+            errors = sum(self.errors.values())
+            completed = self.completed
+        return {
+            "completed": completed,
+            "errors": errors,
+            "error_rate": errors / completed if completed else 0.0,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+        }
+
+
+def ramp(args: argparse.Namespace, blog_base: str) -> List[Dict[str, Any]]:
+    results = []
+    for level in [int(n) for n in args.levels.split(",")]:
+        load = LoadRun(args, blog_base)
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        load.drive(level, args.step_seconds)
+        elapsed = time.perf_counter() - started
+        result = {
+            "concurrency": level,
+            **load.snapshot(),
+            "throughput_per_min": 60 * load.completed / elapsed,
+            "rss_mb": rss_mb(),
+            "rss_growth_mb": rss_mb() - rss_before,
+            "top_errors": sorted(load.errors.items(), key=lambda e: -e[1])[:3],
+        }
+        results.append(result)
+        report(format_level(result))
+    return results
+
+
+def soak(args: argparse.Namespace, blog_base: str) -> Dict[str, Any]:
+    load = LoadRun(args, blog_base)
+    started = time.monotonic()
+    samples = [(0.0, rss_mb(), 0)]
+
+    def on_tick():
+        now = time.monotonic() - started
+        if now - samples[-1][0] < args.sample_seconds:
+            return
+        snapshot = load.snapshot()
+        samples.append((now, rss_mb(), snapshot["completed"]))
+        report(
+            f"  {now / 60:6.1f} min: {snapshot['completed']} jobs, "
+            f"{snapshot['error_rate']:.1%} errors, RSS {samples[-1][1]:.0f} MB"
+        )
+
+    report(f"🧪 Soak at concurrency {args.soak_concurrency} for {args.soak_minutes} min")
+    load.drive(args.soak_concurrency, args.soak_minutes * 60, on_tick)
+    samples.append((time.monotonic() - started, rss_mb(), load.completed))
+
+    # Least-squares slope over the second half, after caches and pools have
+    # warmed up, so start-up allocation does not read as a leak.
+    tail = samples[len(samples) // 2 :]
+    slope = 0.0
+    if len(tail) >= 2:
+        mean_t = statistics.fmean(t for t, _, _ in tail)
+        mean_r = statistics.fmean(r for _, r, _ in tail)
+        variance = sum((t - mean_t) ** 2 for t, _, _ in tail)
+        if variance:
+            slope = (
+                sum((t - mean_t) * (r - mean_r) for t, r, _ in tail) / variance * 3600
+            )
+
+    result = {
+        "concurrency": args.soak_concurrency,
+        **load.snapshot(),
+        "throughput_per_min": 60 * load.completed / samples[-1][0],
+        "rss_start_mb": samples[0][1],
+        "rss_end_mb": samples[-1][1],
+        "rss_slope_mb_per_hour": slope,
+        "samples": samples,
+    }
+    report(
+        f"🧪 Soak: {result['completed']} jobs, "
+        f"{result['throughput_per_min']:.1f}/min, "
+        f"{result['error_rate']:.1%} errors, RSS {result['rss_start_mb']:.0f} → "
+        f"{result['rss_end_mb']:.0f} MB ({slope:+.1f} MB/h after warm-up)"
+    )
+    return result
+
+
+def format_level(result: Dict[str, Any]) -> str:
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.2f}s" if value is not None else "-"
+
+    return (
+        f"  N={result['concurrency']:<3} {result['throughput_per_min']:7.1f} jobs/min  "
+        f"p50 {seconds(result['p50'])}  p95 {seconds(result['p95'])}  "
+        f"p99 {seconds(result['p99'])}  errors {result['error_rate']:.1%}  "
+        f"RSS {result['rss_mb']:.0f} MB ({result['rss_growth_mb']:+.1f})"
+    )
+
+
+def saturation_point(results: List[Dict[str, Any]]) -> Optional[int]:
+    # First level where doubling concurrency bought less than 10% throughput.
+    for previous, current in zip(results, results[1:]):
+        if current["throughput_per_min"] < previous["throughput_per_min"] * 1.1:
+            return previous["concurrency"]
+    return None
+
+
+_report_stream = sys.stdout
+
+
+def report(line: str) -> None:
+    print(line, file=_report_stream, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,2,4,8,16")
+    parser.add_argument("--step-seconds", type=float, default=60.0)
+    parser.add_argument("--soak-minutes", type=float, default=0.0)
+    parser.add_argument("--soak-concurrency", type=int, default=8)
+    parser.add_argument("--sample-seconds", type=float, default=30.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--llm-tail-rate", type=float, default=0.02)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--llm-concurrency", type=int, default=None)
+    parser.add_argument("--blog-latency-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="multiply fake LLM latencies, e.g. 0.1 for a quick run",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep run output")
+    args = parser.parse_args(argv)
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    # Read at import time by lib.models / lib.prompt_cache / lib.scoring.
+    workdir = tempfile.mkdtemp(prefix="post-automation-load-")
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("SEMANTIC_CACHE", "0")
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    if args.llm_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+
+    import lib.models
+    import lib.workflow
+
+    fake = FakeChatModel(args, args.seed)
+    lib.models.get_client = lambda config, cached_content=None, timeout=None: fake
+    lib.workflow.register_context_caches = lambda prefixes: 0
+
+    server = start_blog_server(args.blog_latency_ms)
+    blog_base = f"http://127.0.0.1:{server.server_address[1]}"
+    report(f"📂 Working directory: {workdir}")
+    report(
+        f"🤖 Fake LLM: median {args.llm_latency_ms * args.time_scale:.0f} ms, "
+        f"{args.llm_tail_rate:.0%} 10x tail, {args.llm_error_rate:.0%} errors; "
+        f"LLM concurrency {lib.models.LLM_MAX_CONCURRENCY}"
+    )
+
+    results: Dict[str, Any] = {}
+    quiet = open(os.devnull, "w")
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else quiet):
+        if args.step_seconds > 0 and args.levels:
+            report("📈 Ramp:")
+            results["ramp"] = ramp(args, blog_base)
+            knee = saturation_point(results["ramp"])
+            report(
+                f"📈 Throughput saturates at N={knee}"
+                if knee
+                else "📈 No saturation within the tested levels"
+            )
+        if args.soak_minutes > 0:
+            results["soak"] = soak(args, blog_base)
+    server.shutdown()
+
+    if json_path:
+        with open(json_path, "w") as file:
+            json.dump(results, file, indent=2)
+        report(f"💾 Results written to {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
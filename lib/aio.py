@@ -0,0 +1,26 @@
+import asyncio
+import os
+from typing import Awaitable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+# Per-node fan-out; the shared LLM rate limiter still caps calls process-wide.
+ASYNC_FANOUT_LIMIT = int(os.getenv("ASYNC_FANOUT_LIMIT", "8"))
+
+
+async def gather_bounded(
+    awaitables: Iterable[Awaitable[T]], limit: int = ASYNC_FANOUT_LIMIT
+) -> List[T]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+
+async def offload(function, *args):
+    # CPU-bound parsing (BeautifulSoup, MinHash signatures) runs on the
+    # default executor so it never stalls the event loop.
+    return await asyncio.to_thread(function, *args)
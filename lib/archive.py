@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .file_lock import file_lock
+from .utils import AutomationState, SocialMediaPost
+
+ARCHIVE_DIR = os.getenv("POST_ARCHIVE_DIR", os.path.join(".post_automation", "archive"))
+
+# 64 permutations split into 16 bands of 4 rows: pairs above ~0.6 Jaccard
+# collide in at least one band with high probability, pairs below ~0.3 rarely.
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_WORDS = 3
+NEAR_DUPLICATE_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_CATEGORY_COLUMNS = ["platform", "post_type", "scheduled_day"]
+_HASH_BYTES = 16
+# Bytes per row in each column file.
+_ROW_BYTES = {
+    **{f"{column}.bin": 1 for column in _CATEGORY_COLUMNS},
+    "score.bin": array("f").itemsize,
+    "content_hash.bin": _HASH_BYTES,
+    "minhash.bin": NUM_PERM * array("Q").itemsize,
+}
+
+
+def content_hash(content: str) -> bytes:
+    normalized = " ".join(content.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=_HASH_BYTES).digest()
+
+
+def shingles(content: str) -> List[int]:
+    words = re.findall(r"[a-z0-9']+", content.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return list(
+        {
+            int.from_bytes(
+                hashlib.blake2b(
+                    " ".join(words[i : i + SHINGLE_WORDS]).encode("utf-8"),
+                    digest_size=8,
+                ).digest(),
+                "little",
+            )
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        }
+    )
+
+
+def minhash_signature(content: str) -> List[int]:
+    hashes = shingles(content)
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(left: List[int], right: List[int]) -> float:
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+class PostArchive:
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._reset()
+        if os.path.isdir(directory):
+            with file_lock(self._path(".lock")):
+                self._load()
+
+    def _reset(self) -> None:
+        self.categories: Dict[str, List[str]] = {c: [] for c in _CATEGORY_COLUMNS}
+        self.columns: Dict[str, array] = {c: array("B") for c in _CATEGORY_COLUMNS}
+        self.scores = array("f")
+        self.hashes: List[bytes] = []
+        self.signatures = array("Q")
+        self._hash_index: Dict[bytes, int] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [
+            {} for _ in range(LSH_BANDS)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path("dictionaries.json")):
+            return
+
+        with open(self._path("dictionaries.json"), "r", encoding="utf-8") as file:
+            self.categories = json.load(file)
+        for column in _CATEGORY_COLUMNS:
+            with open(self._path(f"{column}.bin"), "rb") as file:
+                self.columns[column].frombytes(file.read())
+        with open(self._path("score.bin"), "rb") as file:
+            self.scores.frombytes(file.read())
+        with open(self._path("content_hash.bin"), "rb") as file:
+            raw_hashes = file.read()
+        with open(self._path("minhash.bin"), "rb") as file:
+            self.signatures.frombytes(file.read())
+
+        # A crash mid-append can leave columns of different lengths; the
+        # shortest column decides how many rows are complete.
+        rows = min(
+            [len(self.columns[c]) for c in _CATEGORY_COLUMNS]
+            + [len(self.scores), len(raw_hashes) // _HASH_BYTES]
+            + [len(self.signatures) // NUM_PERM]
+        )
+        for column in _CATEGORY_COLUMNS:
+            del self.columns[column][rows:]
+        del self.scores[rows:]
+        del self.signatures[rows * NUM_PERM :]
+        self.hashes = [
+            raw_hashes[i * _HASH_BYTES : (i + 1) * _HASH_BYTES] for i in range(rows)
+        ]
+        for row in range(rows):
+            self._index_row(row)
+
+    def _sync(self) -> None:
+        # Called under the file lock: other worker processes may have
+        # appended rows (or new categories) since this one loaded, and a
+        # crashed writer may have left a partial row. Reload and cut every
+        # file back to the complete rows so the next append lines up.
+        sizes = {
+            name: os.path.getsize(self._path(name))
+            if os.path.exists(self._path(name))
+            else 0
+            for name in _ROW_BYTES
+        }
+        if all(size == len(self) * _ROW_BYTES[name] for name, size in sizes.items()):
+            return
+
+        self._reset()
+        self._load()
+        for name, size in sizes.items():
+            if size > len(self) * _ROW_BYTES[name]:
+                os.truncate(self._path(name), len(self) * _ROW_BYTES[name])
+
+    def _signature(self, row: int) -> List[int]:
+        return list(self.signatures[row * NUM_PERM : (row + 1) * NUM_PERM])
+
+    def _index_row(self, row: int) -> None:
+        self._hash_index[self.hashes[row]] = row
+        signature = self._signature(row)
+        for band in range(LSH_BANDS):
+            key = tuple(signature[band * LSH_ROWS : (band + 1) * LSH_ROWS])
+            self._buckets[band].setdefault(key, []).append(row)
+
+    def _category_code(self, column: str, value: str) -> int:
+        values = self.categories[column]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def add(self, post: SocialMediaPost) -> bool:
+        digest = content_hash(post.content)
+        signature = minhash_signature(post.content)
+
+        with self._lock, file_lock(self._path(".lock")):
+            self._sync()
+            if digest in self._hash_index:
+                return False
+
+            new_category = any(
+                (getattr(post, column) or "") not in self.categories[column]
+                for column in _CATEGORY_COLUMNS
+            )
+            codes = {
+                column: self._category_code(column, getattr(post, column) or "")
+                for column in _CATEGORY_COLUMNS
+            }
+            if new_category:
+                # Replaced whole, so a crash never leaves it half written.
+                path = self._path("dictionaries.json")
+                with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                    json.dump(self.categories, file)
+                os.replace(f"{path}.tmp", path)
+
+            for column in _CATEGORY_COLUMNS:
+                self.columns[column].append(codes[column])
+                with open(self._path(f"{column}.bin"), "ab") as file:
+                    file.write(bytes([codes[column]]))
+            score = array("f", [post.peer_review_score or 0.0])
+            self.scores.extend(score)
+            with open(self._path("score.bin"), "ab") as file:
+                file.write(score.tobytes())
+            self.hashes.append(digest)
+            with open(self._path("content_hash.bin"), "ab") as file:
+                file.write(digest)
+            packed = array("Q", signature)
+            self.signatures.extend(packed)
+            with open(self._path("minhash.bin"), "ab") as file:
+                file.write(packed.tobytes())
+
+            self._index_row(len(self.hashes) - 1)
+        return True
+
+    def row(self, row: int) -> Dict[str, object]:
+        record: Dict[str, object] = {
+            column: self.categories[column][self.columns[column][row]]
+            for column in _CATEGORY_COLUMNS
+        }
+        record["score"] = self.scores[row]
+        record["content_hash"] = self.hashes[row].hex()
+        return record
+
+    def find_near_duplicates(
+        self,
+        content: str,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        signature: Optional[List[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        exact = self._hash_index.get(content_hash(content))
+        if exact is not None:
+            return [(exact, 1.0)]
+
+        signature = signature or minhash_signature(content)
+        candidates = set()
+        for band in range(LSH_BANDS):
+            key = tuple(signature[band * LSH_ROWS : (band + 1) * LSH_ROWS])
+            candidates.update(self._buckets[band].get(key, ()))
+
+        matches = []
+        for row in candidates:
+            similarity = estimate_similarity(signature, self._signature(row))
+            if similarity >= threshold:
+                matches.append((row, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+
+_archive: Optional[PostArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> PostArchive:
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = PostArchive()
+        return _archive
+
+
+def near_duplicate_issue(post: SocialMediaPost) -> Optional[str]:
+    archive = get_archive()
+    if not len(archive):
+        return None
+
+    matches = archive.find_near_duplicates(post.content)
+    if not matches:
+        return None
+
+    row, similarity = matches[0]
+    record = archive.row(row)
+    return (
+        f"{post.platform} {post.post_type} is {similarity:.0%} similar to an archived "
+        f"{record['platform']} {record['post_type']} post"
+    )
+
+
+def archive_approved_posts(state: AutomationState) -> int:
+    # Idea/teaser/draft runs only produce candidates for a later run; only the
+    # final posts are the ones that actually get published.
+    if state.get("phase") != "final":
+        return 0
+    if state.get("error") or state.get("requires_human_review"):
+        return 0
+
+    posts = state.get("improved_linkedin_posts", []) + state.get(
+        "improved_x_posts", []
+    )
+    if not posts:
+        posts = state.get("linkedin_posts", []) + state.get("x_posts", [])
+
+    try:
+        archive = get_archive()
+        added = sum(1 for post in posts if archive.add(post))
+        print(f"🗄️ Archived {added} approved posts ({len(archive)} total)")
+        return added
+    except OSError as e:
+        print(f"⚠️ Failed to archive posts: {e}")
+        return 0
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(".post_automation", "blobs"))
+BLOB_CACHE_BYTES = 32 * 1024 * 1024
+BLOB_PREFIX = "blob:sha256:"
+
+# Short strings are cheaper to carry inline than to hash, write and look up.
+INLINE_MAX_CHARS = 256
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_PREFIX)
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(BLOB_STORE_DIR, digest[:2], digest[2:])
+
+
+def _remember(digest: str, text: str) -> None:
+    global _cache_bytes
+    with _lock:
+        if digest in _cache:
+            _cache.move_to_end(digest)
+            return
+        _cache[digest] = text
+        _cache_bytes += len(text)
+        while _cache_bytes > BLOB_CACHE_BYTES and len(_cache) > 1:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def store_text(text: str) -> str:
+    if not text or len(text) <= INLINE_MAX_CHARS or is_blob_ref(text):
+        return text
+
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    _remember(digest, text)
+    return f"{BLOB_PREFIX}{digest}"
+
+
+def load_text(value: str) -> str:
+    if not is_blob_ref(value):
+        return value
+
+    digest = value[len(BLOB_PREFIX) :]
+    with _lock:
+        text = _cache.get(digest)
+        if text is not None:
+            _cache.move_to_end(digest)
+            return text
+
+    with open(_blob_path(digest), "rb") as file:
+        text = file.read().decode("utf-8")
+    _remember(digest, text)
+    return text
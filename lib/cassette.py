@@ -0,0 +1,266 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+CASSETTE_VERSION = 1
+RECORD = "record"
+REPLAY = "replay"
+# strict: a changed prompt fails the call; warn: serve the recorded response
+# and report it; off: serve silently.
+STRICTNESS_LEVELS = ("strict", "warn", "off")
+
+
+class CassetteError(Exception):
+    pass
+
+
+@dataclass
+class ReplayedResponse:
+    content: str
+    usage_metadata: Dict[str, int] = field(default_factory=dict)
+
+
+def prompt_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str, strictness: str = "strict"):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if strictness not in STRICTNESS_LEVELS:
+            raise ValueError(f"Unknown cassette strictness: {strictness}")
+        self.path = path
+        self.mode = mode
+        self.strictness = strictness
+        self._lock = threading.Lock()
+        # (kind, key) -> entries in the order they were recorded.
+        self._tracks: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._used: Dict[Tuple[str, str], List[bool]] = {}
+        self.served = 0
+        self.mismatches: List[Dict[str, Any]] = []
+        if mode == REPLAY:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise CassetteError(
+                    f"Cassette {self.path} has version {header.get('version')}, "
+                    f"expected {CASSETTE_VERSION}"
+                )
+            for line in file:
+                entry = json.loads(line)
+                track = (entry["kind"], entry["key"])
+                self._tracks.setdefault(track, []).append(entry)
+        self._used = {track: [False] * len(e) for track, e in self._tracks.items()}
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as file:
+            file.write(
+                json.dumps({"version": CASSETTE_VERSION, "created_at": time.time()})
+                + "\n"
+            )
+            for entries in self._tracks.values():
+                for entry in entries:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _record(self, kind: str, key: str, request: str, response: Dict) -> None:
+        with self._lock:
+            entries = self._tracks.setdefault((kind, key), [])
+            entries.append(
+                {
+                    "kind": kind,
+                    "key": key,
+                    "seq": len(entries),
+                    "hash": prompt_hash(request),
+                    "response": response,
+                }
+            )
+
+    def _replay(self, kind: str, key: str, request: str) -> Dict:
+        # Parallel branches call the same node in any order, so an unused
+        # entry with a matching hash wins; otherwise the next unused entry
+        # in recorded order is served and the prompt change is reported.
+        request_hash = prompt_hash(request)
+        with self._lock:
+            entries = self._tracks.get((kind, key), [])
+            used = self._used.get((kind, key), [])
+            unused = [i for i, taken in enumerate(used) if not taken]
+            if not unused:
+                raise CassetteError(
+                    f"Cassette {self.path} has no more recorded {kind} calls for {key}"
+                )
+
+            matching = [i for i in unused if entries[i]["hash"] == request_hash]
+            index = matching[0] if matching else unused[0]
+            if not matching:
+                mismatch = {
+                    "kind": kind,
+                    "key": key,
+                    "seq": entries[index]["seq"],
+                    "recorded_hash": entries[index]["hash"],
+                    "request_hash": request_hash,
+                }
+                self.mismatches.append(mismatch)
+                if self.strictness == "strict":
+                    raise CassetteError(
+                        f"{kind} request for {key} (call {mismatch['seq']}) changed "
+                        f"since recording: {mismatch['recorded_hash']} → {request_hash}"
+                    )
+                if self.strictness == "warn":
+                    print(
+                        f"⚠️ Cassette: {kind} request for {key} (call {mismatch['seq']}) "
+                        "changed since recording, serving recorded response"
+                    )
+
+            used[index] = True
+            self.served += 1
+            return entries[index]["response"]
+
+    def _llm_response(self, response: Any) -> Dict:
+        return {
+            "content": response.content,
+            "usage": dict(getattr(response, "usage_metadata", None) or {}),
+        }
+
+    def call_llm(self, node: str, prompt: str, call: Callable[[], Any]) -> Any:
+        if self.replaying:
+            recorded = self._replay("llm", node, prompt)
+            return ReplayedResponse(recorded["content"], recorded["usage"])
+        response = call()
+        self._record("llm", node, prompt, self._llm_response(response))
+        return response
+
+    async def acall_llm(
+        self, node: str, prompt: str, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if self.replaying:
+            recorded = self._replay("llm", node, prompt)
+            return ReplayedResponse(recorded["content"], recorded["usage"])
+        response = await call()
+        self._record("llm", node, prompt, self._llm_response(response))
+        return response
+
+    def _replay_batch(self, node: str, prompt: str) -> List[ReplayedResponse]:
+        recorded = self._replay("llm", node, prompt)
+        return [
+            ReplayedResponse(response["content"], response["usage"])
+            for response in recorded["batch"]
+        ]
+
+    def _record_batch(self, node: str, prompt: str, responses: List[Any]) -> None:
+        # One entry per batch, so a replay gets back exactly the candidates
+        # that survived when it was recorded.
+        batch = [self._llm_response(response) for response in responses]
+        self._record("llm", node, prompt, {"batch": batch})
+
+    def call_llm_batch(
+        self, node: str, prompt: str, call: Callable[[], List[Any]]
+    ) -> List[Any]:
+        if self.replaying:
+            return self._replay_batch(node, prompt)
+        responses = call()
+        self._record_batch(node, prompt, responses)
+        return responses
+
+    async def acall_llm_batch(
+        self, node: str, prompt: str, call: Callable[[], Awaitable[List[Any]]]
+    ) -> List[Any]:
+        if self.replaying:
+            return self._replay_batch(node, prompt)
+        responses = await call()
+        self._record_batch(node, prompt, responses)
+        return responses
+
+    def fetch(self, url: str, call: Callable[[], bytes]) -> bytes:
+        if self.replaying:
+            return base64.b64decode(self._replay("http", url, url)["body"])
+        body = call()
+        self._record("http", url, url, {"body": base64.b64encode(body).decode()})
+        return body
+
+    async def afetch(self, url: str, call: Callable[[], Awaitable[bytes]]) -> bytes:
+        if self.replaying:
+            return base64.b64decode(self._replay("http", url, url)["body"])
+        body = await call()
+        self._record("http", url, url, {"body": base64.b64encode(body).decode()})
+        return body
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            recorded = sum(len(entries) for entries in self._tracks.values())
+            unused = [
+                f"{kind}:{key}#{entries[i]['seq']}"
+                for (kind, key), entries in self._tracks.items()
+                for i, taken in enumerate(self._used.get((kind, key), []))
+                if not taken
+            ]
+            return {
+                "mode": self.mode,
+                "entries": recorded,
+                "served": self.served,
+                "mismatches": list(self.mismatches),
+                "unused": unused if self.replaying else [],
+            }
+
+    def print_report(self) -> None:
+        report = self.report()
+        if report["mode"] == RECORD:
+            print(f"📼 Recorded {report['entries']} calls to {self.path}")
+            return
+
+        print(
+            f"📼 Replayed {report['served']}/{report['entries']} calls from {self.path}"
+        )
+        for mismatch in report["mismatches"]:
+            print(
+                f"  • changed {mismatch['kind']} request: {mismatch['key']} "
+                f"call {mismatch['seq']} ({mismatch['recorded_hash']} → "
+                f"{mismatch['request_hash']})"
+            )
+        if report["unused"]:
+            print(f"  • {len(report['unused'])} recorded calls were never made:")
+            print("\n".join(f"    - {entry}" for entry in report["unused"]))
+
+
+# A context variable rather than a global, so concurrent runs in one
+# process (the load harness, watchers) each see only their own cassette.
+# LangGraph copies the context into the threads and tasks that run nodes.
+_active: ContextVar[Optional[Cassette]] = ContextVar("cassette", default=None)
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _active.get()
+
+
+@contextmanager
+def use_cassette(cassette: Optional[Cassette]):
+    if cassette is None:
+        yield None
+        return
+
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+        if cassette.mode == RECORD:
+            cassette.save()
+        cassette.print_report()
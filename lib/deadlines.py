@@ -0,0 +1,59 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Wall-clock budget for a whole run; 0 means unbounded. run_automation's
+# deadline_seconds (or a queued job's payload) overrides it.
+RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "0"))
+
+# Remaining run time an optional stage needs before it is started. With
+# less, routing skips it and flags the run for human review instead.
+STAGE_BUDGETS = {
+    "fact_check": 30.0,
+    "peer_review": 30.0,
+    "improvement": 60.0,
+    "revalidation": 30.0,
+}
+# Calls on the required path (summary, post generation) never get less than
+# this, so a nearly spent run still ends with posts rather than a timeout.
+MIN_REQUIRED_CALL_SECONDS = 10.0
+OPTIONAL_NODES = {"validate_posts", "peer_review_agent", "improve_post_content"}
+
+# The deadline also lives in the graph state for routing; the context
+# variable carries it to the LLM and HTTP layers, which never see the state.
+# LangGraph copies the context into the threads and tasks that run nodes.
+_run_deadline: ContextVar[Optional[float]] = ContextVar("run_deadline", default=None)
+
+
+def make_deadline(seconds: Optional[float] = None) -> Optional[float]:
+    seconds = RUN_DEADLINE_SECONDS if seconds is None else seconds
+    return time.time() + seconds if seconds and seconds > 0 else None
+
+
+@contextmanager
+def use_deadline(deadline: Optional[float]):
+    token = _run_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _run_deadline.reset(token)
+
+
+def time_left(deadline: Optional[float] = None) -> Optional[float]:
+    deadline = _run_deadline.get() if deadline is None else deadline
+    return None if deadline is None else deadline - time.time()
+
+
+def has_time_for(stage: str, deadline: Optional[float] = None) -> bool:
+    left = time_left(deadline)
+    return left is None or left >= STAGE_BUDGETS[stage]
+
+
+def call_timeout(node_timeout: float, required: bool = True) -> float:
+    left = time_left()
+    if left is None:
+        return node_timeout
+    floor = MIN_REQUIRED_CALL_SECONDS if required else 0.0
+    return min(node_timeout, max(left, floor))
@@ -0,0 +1,106 @@
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+# A reviewer quote that differs from the post by a typo or re-punctuation
+# still matches; anything looser risks patching the wrong sentence.
+FUZZY_MATCH_RATIO = 0.85
+ISSUE_COVERAGE_RATIO = 0.6
+
+
+@dataclass
+class EditResult:
+    content: str
+    applied: List[Dict[str, str]] = field(default_factory=list)
+    skipped: List[Dict[str, str]] = field(default_factory=list)
+
+
+def _word_boundaries(content: str) -> List[int]:
+    return [0] + [m.end() for m in re.finditer(r"\s+", content)] + [len(content)]
+
+
+def _fuzzy_span(content: str, quote: str) -> Optional[Tuple[int, int]]:
+    lower_content = content.lower()
+    lower_quote = quote.lower()
+    anchor = SequenceMatcher(
+        None, lower_content, lower_quote, autojunk=False
+    ).find_longest_match(0, len(lower_content), 0, len(lower_quote))
+    if anchor.size == 0:
+        return None
+
+    guess = anchor.a - anchor.b
+    slack = max(10, len(quote) // 5)
+    boundaries = _word_boundaries(content)
+    starts = [b for b in boundaries if abs(b - guess) <= slack]
+    ends = [b for b in boundaries if abs(b - (guess + len(quote))) <= slack]
+
+    best = None
+    best_ratio = FUZZY_MATCH_RATIO
+    for start in starts:
+        for end in ends:
+            if end <= start:
+                continue
+            candidate = lower_content[start:end].rstrip()
+            ratio = SequenceMatcher(None, candidate, lower_quote).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = (start, start + len(candidate)), ratio
+    return best
+
+
+def locate_quote(content: str, quote: str) -> Optional[Tuple[int, int]]:
+    quote = quote.strip().strip('"').strip()
+    if not quote:
+        return None
+
+    start = content.find(quote)
+    if start >= 0:
+        return start, start + len(quote)
+
+    pattern = r"\s+".join(re.escape(word) for word in quote.split())
+    match = re.search(pattern, content, re.IGNORECASE)
+    if match:
+        return match.span()
+
+    return _fuzzy_span(content, quote)
+
+
+def apply_actionable_edits(content: str, edits: List[Dict[str, str]]) -> EditResult:
+    result = EditResult(content=content)
+    for edit in edits or []:
+        quote = edit.get("target_quote") or ""
+        replacement = edit.get("edit_text")
+        span = locate_quote(result.content, quote) if replacement is not None else None
+        if span is None:
+            result.skipped.append(edit)
+            continue
+
+        start, end = span
+        result.content = result.content[:start] + replacement + result.content[end:]
+        result.applied.append(edit)
+    return result
+
+
+def _related(left: str, right: str) -> bool:
+    left, right = left.lower().strip(), right.lower().strip()
+    if not left or not right:
+        return False
+    if left in right or right in left:
+        return True
+    return SequenceMatcher(None, left, right).ratio() >= ISSUE_COVERAGE_RATIO
+
+
+def uncovered_issues(
+    issues: List[Dict[str, str]], applied_edits: List[Dict[str, str]]
+) -> List[Dict[str, str]]:
+    remaining = []
+    for issue in issues:
+        issue_type = (issue.get("type") or "").lower()
+        covered = any(
+            _related(issue.get("example") or "", edit.get("target_quote") or "")
+            or (issue_type and issue_type in (edit.get("rationale") or "").lower())
+            for edit in applied_edits
+        )
+        if not covered:
+            remaining.append(issue)
+    return remaining
@@ -0,0 +1,430 @@
+import contextvars
+import hashlib
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, is_dataclass
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .blobs import is_blob_ref, load_text
+from .tracing import annotate, span
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+# Off for a local stand-in such as `python -m aiosmtpd -n -l localhost:8025`.
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+DIGEST_FROM = os.getenv("DIGEST_FROM", "post-automation@localhost")
+DIGEST_TO = [
+    address.strip()
+    for address in os.getenv("DIGEST_TO", "").split(",")
+    if address.strip()
+]
+SENT_DIGESTS_DB = os.getenv(
+    "SENT_DIGESTS_DB", os.path.join(".post_automation", "sent_digests.sqlite")
+)
+
+# Connections, and so concurrent sends, per delivery. Each new connection
+# costs a TCP + TLS handshake and an AUTH round-trip; providers also cap
+# concurrent sessions per account well below the number of digests.
+SMTP_POOL_SIZE = 4
+SMTP_TIMEOUT_SECONDS = 30
+# Servers drop idle sessions after a few minutes; a pooled connection idle
+# for longer than this is checked with NOOP before it is reused.
+SMTP_IDLE_CHECK_SECONDS = 30.0
+MAX_SEND_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 1.0
+# A digest claimed this long ago but never marked sent belongs to a sender
+# that crashed mid-delivery, and may be claimed again.
+SEND_CLAIM_SECONDS = 600.0
+DAY_ORDER = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sent_digests (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    sent_at REAL
+);
+"""
+
+
+@dataclass
+class DigestEmail:
+    key: str
+    day: str
+    message: EmailMessage
+
+
+def _post_fields(post: Any) -> Dict[str, Any]:
+    # Live runs hand over SocialMediaPost objects; queued results come back
+    # from JSON as plain dicts.
+    return asdict(post) if is_dataclass(post) else dict(post)
+
+
+def digest_posts(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    posts = state.get("improved_linkedin_posts", []) + state.get(
+        "improved_x_posts", []
+    )
+    if not posts:
+        posts = state.get("linkedin_posts", []) + state.get("x_posts", [])
+    return [_post_fields(post) for post in posts]
+
+
+def run_key(state: Dict[str, Any], posts: List[Dict[str, Any]]) -> str:
+    # Idempotency key for a run outside the work queue: the same idea and
+    # posts delivered again map to the same key.
+    digest = hashlib.blake2b(digest_size=12)
+    for part in [state.get("idea_text", ""), state.get("blog_url", "")] + [
+        post["content"] for post in posts
+    ]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _day_rank(day: str) -> int:
+    return DAY_ORDER.index(day) if day in DAY_ORDER else len(DAY_ORDER)
+
+
+def _text(value: Any) -> str:
+    return load_text(value) if is_blob_ref(value) else value or ""
+
+
+def format_post(post: Dict[str, Any]) -> str:
+    score = post.get("peer_review_score")
+    heading = f"{post['platform']} {post['post_type']}"
+    details = [f"{post.get('char_count') or len(post['content'])} chars"]
+    if score is not None:
+        details.insert(0, f"score {score:.1f}/10")
+    lines = [f"{heading} ({', '.join(details)})", "-" * 40, post["content"].strip()]
+    if post.get("validation_notes"):
+        lines.append("\nValidation notes:")
+        lines.extend(f"  - {note}" for note in post["validation_notes"])
+    if post.get("improvement_notes"):
+        lines.append("\nImprovements:")
+        lines.extend(f"  - {note}" for note in post["improvement_notes"])
+    return "\n".join(lines)
+
+
+def digest_body(state: Dict[str, Any], day: str, posts: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"Posts scheduled for {day}",
+        f"Idea: {_text(state.get('idea_text')).strip()[:200]}",
+        f"Blog: {state.get('blog_url') or 'Not yet published'}",
+    ]
+    if state.get("requires_human_review"):
+        reason = state.get("human_review_reason") or "flagged by the review loop"
+        lines.append(f"Needs human review: {reason}")
+    return "\n".join(lines) + "\n\n" + "\n\n\n".join(map(format_post, posts)) + "\n"
+
+
+def compose_digests(
+    state: Dict[str, Any],
+    key: Optional[str] = None,
+    recipients: Optional[List[str]] = None,
+    sender: str = DIGEST_FROM,
+) -> List[DigestEmail]:
+    # One email per scheduled day of a run. `key` identifies the run (the
+    # job id for queued runs); each day's digest is sent at most once per key.
+    if state.get("error"):
+        return []
+    posts = digest_posts(state)
+    if not posts:
+        return []
+
+    key = key or run_key(state, posts)
+    recipients = recipients or DIGEST_TO
+    if not recipients:
+        raise ValueError("No digest recipients: set DIGEST_TO")
+    by_day: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for post in posts:
+        by_day[post.get("scheduled_day") or "Unscheduled"].append(post)
+
+    review = " [needs review]" if state.get("requires_human_review") else ""
+    emails = []
+    for day in sorted(by_day, key=_day_rank):
+        digest_key = f"{key}:{day}"
+        message = EmailMessage()
+        message["Subject"] = f"{day} posts{review}: {len(by_day[day])} ready"
+        message["From"] = sender
+        message["To"] = ", ".join(recipients)
+        message["Date"] = formatdate(localtime=True)
+        # Deterministic, so even a resend after a crash threads as the same
+        # message in most clients.
+        digest_hash = hashlib.blake2b(digest_key.encode("utf-8"), digest_size=16)
+        message["Message-ID"] = f"<{digest_hash.hexdigest()}@post-automation>"
+        message["X-Post-Automation-Key"] = digest_key
+        message.set_content(digest_body(state, day, by_day[day]))
+        emails.append(DigestEmail(digest_key, day, message))
+    return emails
+
+
+class SentDigests:
+    # Idempotency store: a digest is claimed before it is sent and marked
+    # sent afterwards, so concurrent deliveries and reruns skip it.
+
+    def __init__(self, db_path: str = SENT_DIGESTS_DB):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def claim(self, email: DigestEmail) -> bool:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT status, claimed_at FROM sent_digests WHERE key = ?",
+                (email.key,),
+            ).fetchone()
+            if row is not None and (
+                row[0] == "sent" or now - row[1] < SEND_CLAIM_SECONDS
+            ):
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO sent_digests (key, status, message_id, "
+                "claimed_at) VALUES (?, 'sending', ?, ?)",
+                (email.key, email.message["Message-ID"], now),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def mark_sent(self, email: DigestEmail) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE sent_digests SET status = 'sent', sent_at = ? WHERE key = ?",
+                (time.time(), email.key),
+            )
+        finally:
+            conn.close()
+
+    def release(self, email: DigestEmail) -> None:
+        # A failed send gives the claim back so the next delivery retries it.
+        conn = self._connect()
+        try:
+            conn.execute(
+                "DELETE FROM sent_digests WHERE key = ? AND status = 'sending'",
+                (email.key,),
+            )
+        finally:
+            conn.close()
+
+
+class SMTPPool:
+    # At most `size` SMTP sessions, reused across messages. A rejected
+    # message leaves its session usable (smtplib resets it); any other error
+    # closes the session, since its state is unknown.
+
+    def __init__(
+        self,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        size: int = SMTP_POOL_SIZE,
+        username: str = SMTP_USERNAME,
+        password: str = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+    ):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self.stats: Counter = Counter()
+
+    def _open(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password)
+        except BaseException:
+            connection.close()
+            raise
+        with self._lock:
+            self.stats["opened"] += 1
+        return connection
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, idle_since = self._idle.pop()
+            if time.monotonic() - idle_since < SMTP_IDLE_CHECK_SECONDS:
+                return connection
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except smtplib.SMTPException:
+                pass
+            self._close(connection)
+        return self._open()
+
+    def _close(self, connection: smtplib.SMTP) -> None:
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        with self._slots:
+            connection = self._checkout()
+            try:
+                yield connection
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                self._release(connection)
+                raise
+            except BaseException:
+                with self._lock:
+                    self.stats["discarded"] += 1
+                self._close(connection)
+                raise
+            self._release(connection)
+
+    def _release(self, connection: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+
+def _retryable(error: Exception) -> bool:
+    # 4xx replies (greylisting, rate limits, mailbox busy) and dropped
+    # connections are transient; 5xx and refused recipients are not.
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, OSError)
+
+
+def send_with_retry(pool: SMTPPool, email: DigestEmail) -> None:
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        try:
+            with span("smtp send", {"email.key": email.key, "email.attempt": attempt}):
+                with pool.connection() as connection:
+                    connection.send_message(email.message)
+            return
+        except Exception as e:
+            if attempt == MAX_SEND_ATTEMPTS or not _retryable(e):
+                raise
+            delay = RETRY_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            print(f"🔄 Digest {email.key} attempt {attempt} failed ({e}), retrying")
+            time.sleep(delay)
+
+
+def deliver_digests(
+    emails: Iterable[DigestEmail],
+    pool: Optional[SMTPPool] = None,
+    db_path: str = SENT_DIGESTS_DB,
+) -> Dict[str, int]:
+    store = SentDigests(db_path)
+    emails = list(emails)
+    pending = [email for email in emails if store.claim(email)]
+    report = {"sent": 0, "failed": 0, "skipped": len(emails) - len(pending)}
+    if not pending:
+        print(f"📧 No digests to send ({report['skipped']} already sent)")
+        return report
+
+    own_pool = pool is None
+    pool = pool or SMTPPool()
+
+    def send(email: DigestEmail) -> bool:
+        try:
+            send_with_retry(pool, email)
+        except Exception as e:
+            store.release(email)
+            print(f"❌ Digest {email.key} not sent: {e}")
+            return False
+        store.mark_sent(email)
+        return True
+
+    with span("digest delivery", {"email.count": len(pending)}):
+        try:
+            with ThreadPoolExecutor(
+                max_workers=pool.size, thread_name_prefix="smtp"
+            ) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, send, email)
+                    for email in pending
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            if own_pool:
+                pool.close()
+        report["sent"] = sum(results)
+        report["failed"] = len(results) - report["sent"]
+        report["connections"] = pool.stats["opened"]
+        annotate(
+            {"email.sent": report["sent"], "smtp.connections": pool.stats["opened"]}
+        )
+
+    print(
+        f"📧 Sent {report['sent']}/{len(pending)} digests over "
+        f"{pool.stats['opened']} SMTP connections ({report['skipped']} already sent"
+        f"{', ' + str(report['failed']) + ' failed' if report['failed'] else ''})"
+    )
+    return report
+
+
+def deliver_run_digests(
+    state: Dict[str, Any], key: Optional[str] = None, db_path: str = SENT_DIGESTS_DB
+) -> Dict[str, int]:
+    return deliver_digests(compose_digests(state, key), db_path=db_path)
+
+
+def deliver_queue_digests(
+    queue_path: str, db_path: str = SENT_DIGESTS_DB
+) -> Dict[str, int]:
+    from .work_queue import completed_results
+
+    emails = (
+        email
+        for job_id, result in completed_results(queue_path)
+        for email in compose_digests(result, key=job_id)
+    )
+    return deliver_digests(emails, db_path=db_path)
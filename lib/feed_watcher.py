@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterator, List, Optional
+
+from .blobs import load_text
+from .file_lock import file_lock
+from .tracing import span
+from .utils import SCRAPER_HEADERS, AutomationState, annotate_response
+from .work_queue import DEFAULT_QUEUE_PATH, enqueue_job
+
+FEED_STATE_PATH = os.getenv(
+    "FEED_STATE_PATH", os.path.join(".post_automation", "feed_state.json")
+)
+PENDING_DRAFTS_PATH = os.getenv(
+    "PENDING_DRAFTS_PATH", os.path.join(".post_automation", "pending_drafts.json")
+)
+FEED_POLL_SECONDS = 300
+DRAFT_MATCH_THRESHOLD = 0.6
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def _read_json(path: str, default: Any) -> Any:
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _write_json(path: str, data: Any) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _normalize_title(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+
+
+def draft_title(state: AutomationState) -> str:
+    draft = load_text(state.get("blog_content", ""))
+    heading = re.search(r"^#\s+(.+)$", draft, re.MULTILINE)
+    if heading:
+        return heading.group(1).strip()
+    idea_lines = state["idea_text"].strip().splitlines()
+    return idea_lines[0] if idea_lines else ""
+
+
+def record_pending_draft(
+    state: AutomationState, path: str = PENDING_DRAFTS_PATH
+) -> bool:
+    # A finished draft waits here until its post shows up in the feed.
+    if state.get("error") or state.get("phase") != "draft":
+        return False
+    if not state.get("blog_content"):
+        return False
+
+    # A file lock, since draft runs in worker processes and the feed watcher
+    # update the same file.
+    with file_lock(f"{path}.lock"):
+        drafts = _read_json(path, [])
+        drafts.append(
+            {
+                "title": draft_title(state),
+                "idea_text": state["idea_text"],
+                "obsidian_notes": load_text(state.get("obsidian_notes", "")),
+                "created_at": time.time(),
+            }
+        )
+        _write_json(path, drafts)
+    print(f"📌 Recorded pending draft: {drafts[-1]['title'][:80]}")
+    return True
+
+
+def _best_match(title: str, drafts: List[Dict[str, Any]]) -> Optional[int]:
+    target = _normalize_title(title)
+    best_index, best_ratio = None, DRAFT_MATCH_THRESHOLD
+    for index, draft in enumerate(drafts):
+        ratio = SequenceMatcher(None, target, _normalize_title(draft["title"])).ratio()
+        if ratio >= best_ratio:
+            best_index, best_ratio = index, ratio
+    return best_index
+
+
+@contextmanager
+def pending_draft(
+    title: str, path: str = PENDING_DRAFTS_PATH
+) -> Iterator[Optional[Dict[str, Any]]]:
+    # Yields the draft best matching `title`, or None. It is removed only
+    # once the block completes (its final-phase job is enqueued); if the
+    # block raises, the draft stays for the next poll. The lock is held
+    # throughout, so two watchers cannot both claim one draft.
+    with file_lock(f"{path}.lock"):
+        drafts = _read_json(path, [])
+        index = _best_match(title, drafts)
+        if index is None:
+            yield None
+            return
+        yield drafts[index]
+        del drafts[index]
+        _write_json(path, drafts)
+
+
+def parse_feed(body: bytes) -> List[Dict[str, str]]:
+    root = ElementTree.fromstring(body)
+    entries = []
+
+    # RSS 2.0: <rss><channel><item>
+    for item in root.iter("item"):
+        link = (item.findtext("link") or "").strip()
+        entries.append(
+            {
+                "id": (item.findtext("guid") or link).strip(),
+                "title": (item.findtext("title") or "").strip(),
+                "link": link,
+            }
+        )
+
+    # Atom: <feed><entry>, preferring the rel="alternate" link.
+    for entry in root.iter(f"{_ATOM_NS}entry"):
+        link = ""
+        for link_elem in entry.findall(f"{_ATOM_NS}link"):
+            if link_elem.get("rel", "alternate") == "alternate":
+                link = link_elem.get("href", "")
+                break
+        entries.append(
+            {
+                "id": (entry.findtext(f"{_ATOM_NS}id") or link).strip(),
+                "title": (entry.findtext(f"{_ATOM_NS}title") or "").strip(),
+                "link": link.strip(),
+            }
+        )
+
+    return [entry for entry in entries if entry["id"] and entry["link"]]
+
+
+def final_phase_payload(
+    entry: Dict[str, str], draft: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    if draft:
+        print(f"🔗 Matched '{entry['title']}' to pending draft '{draft['title']}'")
+        idea_text, obsidian_notes = draft["idea_text"], draft["obsidian_notes"]
+    else:
+        print(f"⚠️ No pending draft matches '{entry['title']}', using the post title")
+        idea_text, obsidian_notes = entry["title"], ""
+    return {
+        "idea_text": idea_text,
+        "obsidian_notes": obsidian_notes,
+        "blog_url": entry["link"],
+        "phase": "final",
+    }
+
+
+def poll_feed(
+    feed_url: str,
+    state_path: str = FEED_STATE_PATH,
+    db_path: str = DEFAULT_QUEUE_PATH,
+) -> List[str]:
+    import requests
+
+    stored_state = _read_json(state_path, {})
+    feed_state = dict(stored_state)
+    headers = dict(SCRAPER_HEADERS)
+    if feed_state.get("etag"):
+        headers["If-None-Match"] = feed_state["etag"]
+    if feed_state.get("last_modified"):
+        headers["If-Modified-Since"] = feed_state["last_modified"]
+
+    with span("http GET", {"http.url": feed_url}):
+        response = requests.get(feed_url, headers=headers, timeout=30)
+        annotate_response(response)
+    if response.status_code == 304:
+        return []
+    response.raise_for_status()
+
+    # Servers that ignore conditional requests still send identical bytes
+    # for an unchanged feed; the hash check skips parsing those too.
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    feed_state["etag"] = response.headers.get("ETag")
+    feed_state["last_modified"] = response.headers.get("Last-Modified")
+    if body_hash == feed_state.get("body_hash"):
+        _write_json(state_path, feed_state)
+        return []
+
+    entries = parse_feed(response.content)
+    seen = set(feed_state.get("seen", []))
+    first_poll = "seen" not in feed_state
+    new_entries = [entry for entry in entries if entry["id"] not in seen]
+
+    job_ids = []
+    if first_poll:
+        # Everything already published is history, not a publish event.
+        print(f"📰 Seeded feed state with {len(new_entries)} existing entries")
+    else:
+        for entry in new_entries:
+            with pending_draft(entry["title"]) as draft:
+                payload = final_phase_payload(entry, draft)
+                job_id = enqueue_job(payload, db_path=db_path)
+                # Marked seen before the next enqueue can fail, so a retry
+                # does not queue this post twice. The stored ETag and body
+                # hash stay old until the loop finishes, so that retry still
+                # fetches and parses the whole feed.
+                seen.add(entry["id"])
+                _write_json(state_path, {**stored_state, "seen": sorted(seen)})
+            print(f"📥 New post '{entry['title']}' → job {job_id}")
+            job_ids.append(job_id)
+
+    feed_state["seen"] = sorted(seen | {entry["id"] for entry in entries})
+    feed_state["body_hash"] = body_hash
+    _write_json(state_path, feed_state)
+    return job_ids
+
+
+def watch_feed(
+    feed_url: str,
+    interval: float = FEED_POLL_SECONDS,
+    state_path: str = FEED_STATE_PATH,
+    db_path: str = DEFAULT_QUEUE_PATH,
+) -> None:
+    print(f"📰 Watching {feed_url} every {interval:.0f}s")
+    while True:
+        try:
+            poll_feed(feed_url, state_path, db_path)
+        except Exception as e:
+            print(f"⚠️ Feed poll failed: {e}")
+        time.sleep(interval)
@@ -0,0 +1,20 @@
+import fcntl
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    # Exclusive advisory lock on `path`, held across worker processes and
+    # across threads (each holder opens its own file description). The lock
+    # file itself stays empty.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as file:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,863 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple, Union
+
+from .cassette import active_cassette
+from .deadlines import OPTIONAL_NODES, call_timeout
+from .profiling import wait_span
+from .prompts import RenderedPrompt, estimate_tokens, prompt_text
+from .singleflight import fingerprint, llm_flight
+from .tracing import annotate, span
+
+# asyncio is imported where it is used: lib.validators reaches this module
+# through lib.utils and should not pay for the event loop machinery.
+if TYPE_CHECKING:
+    import asyncio
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    model: str
+    temperature: float
+    max_output_tokens: Optional[int] = None
+
+
+GENERATION_MODEL = ModelConfig(model="gemini-2.5-flash", temperature=0.7)
+# Fact-checking and JSON scoring need consistency, not creativity: a lighter
+# model at low temperature with a bounded reply.
+REVIEW_MODEL = ModelConfig(
+    model="gemini-2.5-flash-lite", temperature=0.2, max_output_tokens=2048
+)
+VALIDATION_MODEL = ModelConfig(
+    model="gemini-2.5-flash-lite", temperature=0.0, max_output_tokens=1024
+)
+
+NODE_MODELS: Dict[str, ModelConfig] = {
+    "generate_blog_summary": GENERATION_MODEL,
+    "teaser_generator": GENERATION_MODEL,
+    "blog_drafter": GENERATION_MODEL,
+    "generate_linkedin_posts": GENERATION_MODEL,
+    "generate_x_posts": GENERATION_MODEL,
+    "validate_posts": VALIDATION_MODEL,
+    "peer_review_agent": REVIEW_MODEL,
+    "improve_post_content": GENERATION_MODEL,
+}
+
+# Prompt template -> nodes that render it, so a template's context cache is
+# created only on the models that will actually be sent its prefix.
+TEMPLATE_NODES: Dict[str, List[str]] = {
+    "blog_summary": ["generate_blog_summary"],
+    "teaser_posts": ["teaser_generator"],
+    "blog_draft": ["blog_drafter"],
+    "linkedin_teaser": ["generate_linkedin_posts"],
+    "linkedin_blog_reference": ["generate_linkedin_posts"],
+    "x_thread": ["generate_x_posts"],
+    "fact_check": ["validate_posts"],
+    "peer_review": ["peer_review_agent"],
+    "improve_post": ["improve_post_content"],
+}
+
+# USD per million tokens (input, output).
+MODEL_PRICES: Dict[str, tuple] = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+# Wall-clock budget per call, hedges included. Without these a single slow
+# Gemini request stalls the whole sequential graph.
+NODE_DEADLINES: Dict[str, float] = {
+    "generate_blog_summary": 60.0,
+    "teaser_generator": 60.0,
+    "blog_drafter": 180.0,
+    "generate_linkedin_posts": 60.0,
+    "generate_x_posts": 60.0,
+    "validate_posts": 30.0,
+    "peer_review_agent": 30.0,
+    "improve_post_content": 60.0,
+}
+DEFAULT_DEADLINE = 90.0
+
+# A duplicate request goes out once a call has run longer than this percentile
+# of the node's recent latencies; until enough samples exist, at half the
+# deadline.
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 10
+LATENCY_WINDOW = 200
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "120"))
+
+# Estimated prompt tokens above which a call is flagged. Drafts carry the
+# full research notes, so they get more room.
+PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+    "blog_drafter": 8000,
+}
+DEFAULT_PROMPT_TOKEN_BUDGET = 2500
+
+# Gemini refuses explicit context caches below this many tokens; shorter
+# prefixes still benefit from the provider's implicit prefix caching because
+# they are byte-identical and come first.
+CONTEXT_CACHE_MIN_TOKENS = 1024
+CONTEXT_CACHE_TTL_SECONDS = 3600
+# A cache this close to expiry is treated as gone, so a call started just
+# before the provider drops it does not fail.
+CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS = 120
+
+# Optional JSON file mapping node names to {"model", "temperature",
+# "max_output_tokens"} so routes can be tuned without a code change.
+MODEL_ROUTES_PATH = os.getenv("MODEL_ROUTES_PATH")
+
+_clients: Dict[
+    Tuple[ModelConfig, Optional[str], Optional[float]], "ChatGoogleGenerativeAI"
+] = {}
+# (model, prefix hash) -> (cache name, expiry as time.time())
+_context_caches: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_clients_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = defaultdict(
+    lambda: {
+        "calls": 0,
+        "seconds": 0.0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cost": 0.0,
+        "prompt_tokens_estimated": 0,
+        "over_budget": 0,
+        "hedges": 0,
+        "hedge_wins": 0,
+        "timeouts": 0,
+    }
+)
+_stats_lock = threading.Lock()
+_latencies: Dict[str, Deque[float]] = defaultdict(
+    lambda: deque(maxlen=LATENCY_WINDOW)
+)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: int, max_concurrency: int):
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._many_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        # With a timeout, gives up (returning False) rather than wait past it
+        # for a concurrency slot or for the next request slot.
+        until = None if timeout is None else time.monotonic() + timeout
+        if timeout is not None and blocking:
+            timeout = max(timeout, 0)
+        if not self._slots.acquire(blocking, timeout if blocking else None):
+            return False
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_slot - now
+            if wait_seconds > 0 and (
+                not blocking or (until is not None and now + wait_seconds > until)
+            ):
+                self._slots.release()
+                return False
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return True
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        # Polls the non-blocking path so a waiting coroutine never parks an
+        # event-loop thread; sync and async callers share the same budget.
+        import asyncio
+
+        until = None if timeout is None else time.monotonic() + timeout
+        while not self.acquire(blocking=False):
+            if until is not None and time.monotonic() >= until:
+                return False
+            await asyncio.sleep(max(self.interval / 2, 0.01))
+        return True
+
+    def _reserve(self, count: int, until: Optional[float] = None) -> Optional[float]:
+        # Books `count` consecutive request slots and returns how long to wait
+        # until the last of them, since a batch sends all requests at once.
+        # Books nothing and returns None if that wait would run past `until`.
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            wait_seconds = start + (count - 1) * self.interval - now
+            if until is not None and now + wait_seconds > until:
+                return None
+            self._next_slot = start + count * self.interval
+        return wait_seconds
+
+    def acquire_many(self, count: int, timeout: Optional[float] = None) -> bool:
+        # Only one caller gathers several slots at a time, so two batches can
+        # never each hold part of the pool while waiting on the other.
+        until = None if timeout is None else time.monotonic() + timeout
+
+        def left() -> Optional[float]:
+            return None if until is None else max(until - time.monotonic(), 0)
+
+        if not self._many_lock.acquire(timeout=-1 if until is None else left()):
+            return False
+        acquired = 0
+        try:
+            while acquired < count and self._slots.acquire(timeout=left()):
+                acquired += 1
+        finally:
+            self._many_lock.release()
+        wait_seconds = self._reserve(count, until) if acquired == count else None
+        if wait_seconds is None:
+            self.release(acquired)
+            return False
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+        return True
+
+    async def aacquire_many(self, count: int, timeout: Optional[float] = None) -> bool:
+        import asyncio
+
+        until = None if timeout is None else time.monotonic() + timeout
+        poll_seconds = max(self.interval / 2, 0.01)
+        acquired = 0
+
+        def expired() -> bool:
+            return until is not None and time.monotonic() >= until
+
+        try:
+            while not self._many_lock.acquire(blocking=False):
+                if expired():
+                    return False
+                await asyncio.sleep(poll_seconds)
+            try:
+                while acquired < count:
+                    if self._slots.acquire(blocking=False):
+                        acquired += 1
+                    elif expired():
+                        break
+                    else:
+                        await asyncio.sleep(poll_seconds)
+            finally:
+                self._many_lock.release()
+            wait_seconds = self._reserve(count, until) if acquired == count else None
+            if wait_seconds is None:
+                self.release(acquired)
+                acquired = 0
+                return False
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            return True
+        except BaseException:
+            self.release(acquired)
+            raise
+
+    def release(self, count: int = 1) -> None:
+        for _ in range(count):
+            self._slots.release()
+
+
+rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_MAX_CONCURRENCY)
+_executor = ThreadPoolExecutor(
+    max_workers=LLM_MAX_CONCURRENCY * 2, thread_name_prefix="llm"
+)
+
+
+def load_model_routes(path: Optional[str] = MODEL_ROUTES_PATH) -> None:
+    if not path:
+        return
+    with open(path, "r", encoding="utf-8") as file:
+        routes = json.load(file)
+    for node, config in routes.items():
+        NODE_MODELS[node] = ModelConfig(**config)
+
+
+def model_for_node(node: str) -> ModelConfig:
+    return NODE_MODELS.get(node, GENERATION_MODEL)
+
+
+_env_loaded = False
+
+
+def gemini_api_key() -> Optional[str]:
+    # .env is read on first use rather than at import, so importing lib for
+    # the validators or notes parser stays cheap.
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+    return os.getenv("GEMINI_API_KEY")
+
+
+def request_timeout(node: str) -> float:
+    # Per-request HTTP timeout for the client. A call the hedged wait has
+    # abandoned still holds an executor thread and a rate-limiter slot until
+    # its request returns; this bounds how long.
+    return NODE_DEADLINES.get(node, DEFAULT_DEADLINE)
+
+
+def get_client(
+    config: ModelConfig,
+    cached_content: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> "ChatGoogleGenerativeAI":
+    with _clients_lock:
+        client = _clients.get((config, cached_content, timeout))
+        if client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            client = ChatGoogleGenerativeAI(
+                model=config.model,
+                google_api_key=gemini_api_key(),
+                temperature=config.temperature,
+                max_output_tokens=config.max_output_tokens,
+                cached_content=cached_content,
+                timeout=timeout,
+            )
+            _clients[(config, cached_content, timeout)] = client
+        return client
+
+
+def _prefix_key(prefix: str) -> str:
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+
+def _live_context_cache(key: Tuple[str, str]) -> Optional[str]:
+    entry = _context_caches.get(key)
+    if entry is None:
+        return None
+    name, expires_at = entry
+    if time.time() >= expires_at - CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS:
+        # Expired provider-side (or about to be); the next run's
+        # register_context_caches creates a fresh one.
+        _context_caches.pop(key, None)
+        return None
+    return name
+
+
+def register_context_caches(prefixes: Dict[str, str]) -> int:
+    # ~4 characters per token; close enough to decide eligibility.
+    eligible = {
+        name: prefix
+        for name, prefix in prefixes.items()
+        if len(prefix) // 4 >= CONTEXT_CACHE_MIN_TOKENS
+    }
+    if not eligible:
+        return 0
+
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client(api_key=gemini_api_key())
+    registered = 0
+    for name, prefix in eligible.items():
+        models = {model_for_node(node).model for node in TEMPLATE_NODES.get(name, [])}
+        for model in sorted(models):
+            key = (model, _prefix_key(prefix))
+            if _live_context_cache(key):
+                continue
+            try:
+                # Taken before the request, so the recorded expiry is never
+                # later than the provider's.
+                expires_at = time.time() + CONTEXT_CACHE_TTL_SECONDS
+                cache = client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"post-automation-{name}",
+                        contents=[
+                            types.Content(role="user", parts=[types.Part(text=prefix)])
+                        ],
+                        ttl=f"{CONTEXT_CACHE_TTL_SECONDS}s",
+                    ),
+                )
+                _context_caches[key] = (cache.name, expires_at)
+                registered += 1
+            except Exception as e:
+                print(f"⚠️ Context cache for {name} on {model} not created: {e}")
+    if registered:
+        print(f"🗂️ Registered {registered} provider context caches")
+    return registered
+
+
+def record_usage(
+    node: str, config: ModelConfig, seconds: Optional[float], response: Any
+) -> None:
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    input_price, output_price = MODEL_PRICES.get(config.model, (0.0, 0.0))
+
+    with _stats_lock:
+        stats = _stats[node]
+        stats["model"] = config.model
+        if seconds is not None:
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            _latencies[node].append(seconds)
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["cost"] += (
+            input_tokens * input_price + output_tokens * output_price
+        ) / 1e6
+
+
+def annotate_usage(responses: List[Any], attempts: int) -> None:
+    usages = [getattr(response, "usage_metadata", None) or {} for response in responses]
+    annotate(
+        {
+            "llm.input_tokens": sum(usage.get("input_tokens", 0) for usage in usages),
+            "llm.output_tokens": sum(usage.get("output_tokens", 0) for usage in usages),
+            "llm.attempts": attempts,
+        }
+    )
+
+
+def hedge_delay(node: str, deadline: float) -> float:
+    samples = sorted(_latencies[node])
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return deadline / 2
+    return min(samples[int(HEDGE_PERCENTILE * (len(samples) - 1))], deadline)
+
+
+def _limited_invoke(
+    config: ModelConfig,
+    prompt: str,
+    cached_content: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Any:
+    try:
+        return get_client(config, cached_content, timeout).invoke(prompt)
+    finally:
+        rate_limiter.release()
+
+
+def _start_limited_task(
+    config: ModelConfig,
+    prompt: str,
+    cached_content: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> "asyncio.Task":
+    # Released from a done-callback: a task cancelled before its first step
+    # never runs a finally block.
+    import asyncio
+
+    task = asyncio.ensure_future(
+        get_client(config, cached_content, timeout).ainvoke(prompt)
+    )
+    task.add_done_callback(lambda _: rate_limiter.release())
+    return task
+
+
+def _cancel(future) -> bool:
+    # A future cancelled before it started never runs _limited_invoke, so
+    # the rate-limiter slot taken for it is handed back here.
+    if future.cancel():
+        rate_limiter.release()
+        return True
+    return False
+
+
+def _limiter_timeout(node: str, deadline: float) -> TimeoutError:
+    # Waiting for the rate limiter counts against the node's deadline: when
+    # slots are held by slow calls, later calls fail instead of queueing
+    # past their budget.
+    with _stats_lock:
+        _stats[node]["timeouts"] += 1
+    annotate({"llm.timed_out": True, "llm.limiter_timeout": True})
+    return TimeoutError(
+        f"LLM call for {node} waited {deadline:.0f}s for a rate-limiter slot"
+    )
+
+
+def _record_loser(node: str, config: ModelConfig, future) -> None:
+    # A hedge loser that already started cannot be interrupted; its tokens
+    # are still billed, so count them without polluting the latency window.
+    if not future.cancelled() and future.exception() is None:
+        record_usage(node, config, None, future.result())
+
+
+def invoke_llm(node: str, prompt: Union[str, RenderedPrompt]) -> Any:
+    with wait_span("llm"), span(f"llm {node}", {"llm.node": node}):
+        # Cassettes key on the full prompt text so a replay matches whether
+        # or not a context cache shortened the payload when it was recorded.
+        cassette = active_cassette()
+        if cassette is not None:
+            annotate({"llm.cassette": cassette.mode})
+            return cassette.call_llm(
+                node, prompt_text(prompt), lambda: _invoke_llm(node, prompt)
+            )
+        return _invoke_llm(node, prompt)
+
+
+def _prepare_call(
+    node: str, prompt: Union[str, RenderedPrompt]
+) -> Tuple[ModelConfig, float, str, Optional[str]]:
+    config = model_for_node(node)
+    # The node's own budget, cut to what is left of the run's deadline.
+    deadline = call_timeout(
+        NODE_DEADLINES.get(node, DEFAULT_DEADLINE),
+        required=node not in OPTIONAL_NODES,
+    )
+    if deadline <= 0:
+        raise TimeoutError(f"Run deadline passed before the {node} call")
+
+    # With a registered context cache the provider already holds the prefix,
+    # so only the variable body is sent.
+    cached_content = None
+    payload = prompt_text(prompt)
+    if isinstance(prompt, RenderedPrompt):
+        cache_key = (config.model, _prefix_key(prompt.prefix))
+        cached_content = _live_context_cache(cache_key)
+        if cached_content:
+            payload = prompt.body
+
+    prompt_tokens = estimate_tokens(payload)
+    budget = PROMPT_TOKEN_BUDGETS.get(node, DEFAULT_PROMPT_TOKEN_BUDGET)
+    with _stats_lock:
+        _stats[node]["prompt_tokens_estimated"] += prompt_tokens
+        _stats[node]["over_budget"] += prompt_tokens > budget
+    # Per-call sizes only show up when over budget; totals are in the model
+    # report.
+    if prompt_tokens > budget:
+        print(f"⚠️ {node} prompt is ~{prompt_tokens} tokens (budget {budget})")
+    annotate(
+        {
+            "llm.model": config.model,
+            "llm.temperature": config.temperature,
+            "llm.prompt_tokens_estimated": prompt_tokens,
+            "llm.context_cache": bool(cached_content),
+            "llm.timeout_seconds": round(deadline, 1),
+        }
+    )
+
+    return config, deadline, payload, cached_content
+
+
+def _invoke_llm(node: str, prompt: Union[str, RenderedPrompt]) -> Any:
+    config, deadline, payload, cached_content = _prepare_call(node, prompt)
+
+    def lead() -> Any:
+        annotate({"llm.coalesced": False})
+        return _call_hedged(node, config, deadline, payload, cached_content)
+
+    # Identical requests already in flight from another run share that
+    # call's response (or its failure) instead of going upstream again.
+    annotate({"llm.coalesced": True})
+    return llm_flight.do(fingerprint(config, cached_content, payload), lead)
+
+
+def _call_hedged(
+    node: str,
+    config: ModelConfig,
+    deadline: float,
+    payload: str,
+    cached_content: Optional[str],
+) -> Any:
+    started = time.perf_counter()
+    timeout = request_timeout(node)
+
+    if not rate_limiter.acquire(timeout=deadline):
+        raise _limiter_timeout(node, deadline)
+    primary = _executor.submit(
+        _limited_invoke, config, payload, cached_content, timeout
+    )
+    futures = [primary]
+
+    done, _ = wait(futures, timeout=hedge_delay(node, deadline))
+    if not done and rate_limiter.acquire(blocking=False):
+        futures.append(
+            _executor.submit(_limited_invoke, config, payload, cached_content, timeout)
+        )
+        with _stats_lock:
+            _stats[node]["hedges"] += 1
+        elapsed = time.perf_counter() - started
+        print(f"⏱️ Hedging slow {node} call after {elapsed:.1f}s")
+        annotate({"llm.hedged": True, "llm.hedge_after_seconds": round(elapsed, 2)})
+
+    pending = set(futures)
+    winner = None
+    while winner is None:
+        remaining = deadline - (time.perf_counter() - started)
+        done, pending = wait(
+            pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED
+        )
+        if not done:
+            for future in pending:
+                _cancel(future)
+            with _stats_lock:
+                _stats[node]["timeouts"] += 1
+            annotate({"llm.timed_out": True})
+            raise TimeoutError(
+                f"LLM call for {node} exceeded {deadline:.0f}s deadline"
+            )
+        succeeded = [future for future in done if future.exception() is None]
+        if succeeded:
+            winner = succeeded[0]
+        elif not pending:
+            raise next(iter(done)).exception()
+
+    for future in pending:
+        if not _cancel(future):
+            future.add_done_callback(
+                lambda f, node=node, config=config: _record_loser(node, config, f)
+            )
+    if winner is not primary:
+        with _stats_lock:
+            _stats[node]["hedge_wins"] += 1
+    annotate({"llm.hedge_won": winner is not primary})
+
+    response = winner.result()
+    record_usage(node, config, time.perf_counter() - started, response)
+    annotate_usage([response], len(futures))
+    return response
+
+
+async def ainvoke_llm(node: str, prompt: Union[str, RenderedPrompt]) -> Any:
+    with span(f"llm {node}", {"llm.node": node}):
+        cassette = active_cassette()
+        if cassette is not None:
+            annotate({"llm.cassette": cassette.mode})
+            return await cassette.acall_llm(
+                node, prompt_text(prompt), lambda: _ainvoke_llm(node, prompt)
+            )
+        return await _ainvoke_llm(node, prompt)
+
+
+async def _ainvoke_llm(node: str, prompt: Union[str, RenderedPrompt]) -> Any:
+    config, deadline, payload, cached_content = _prepare_call(node, prompt)
+
+    async def lead() -> Any:
+        annotate({"llm.coalesced": False})
+        return await _acall_hedged(node, config, deadline, payload, cached_content)
+
+    annotate({"llm.coalesced": True})
+    return await llm_flight.ado(fingerprint(config, cached_content, payload), lead)
+
+
+async def _acall_hedged(
+    node: str,
+    config: ModelConfig,
+    deadline: float,
+    payload: str,
+    cached_content: Optional[str],
+) -> Any:
+    import asyncio
+
+    started = time.perf_counter()
+    timeout = request_timeout(node)
+
+    if not await rate_limiter.aacquire(timeout=deadline):
+        raise _limiter_timeout(node, deadline)
+    primary = _start_limited_task(config, payload, cached_content, timeout)
+    tasks = {primary}
+
+    done, _ = await asyncio.wait(tasks, timeout=hedge_delay(node, deadline))
+    if not done and rate_limiter.acquire(blocking=False):
+        tasks.add(_start_limited_task(config, payload, cached_content, timeout))
+        with _stats_lock:
+            _stats[node]["hedges"] += 1
+        elapsed = time.perf_counter() - started
+        print(f"⏱️ Hedging slow {node} call after {elapsed:.1f}s")
+        annotate({"llm.hedged": True, "llm.hedge_after_seconds": round(elapsed, 2)})
+
+    pending = tasks
+    winner = None
+    try:
+        while winner is None:
+            remaining = deadline - (time.perf_counter() - started)
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(remaining, 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                with _stats_lock:
+                    _stats[node]["timeouts"] += 1
+                annotate({"llm.timed_out": True})
+                raise TimeoutError(
+                    f"LLM call for {node} exceeded {deadline:.0f}s deadline"
+                )
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                winner = succeeded[0]
+            elif not pending:
+                raise next(iter(done)).exception()
+    finally:
+        # Unlike a running thread, an in-flight coroutine can be cancelled,
+        # so hedge losers stop instead of running to completion.
+        for task in pending:
+            task.cancel()
+
+    if winner is not primary:
+        with _stats_lock:
+            _stats[node]["hedge_wins"] += 1
+    annotate({"llm.hedge_won": winner is not primary})
+
+    response = winner.result()
+    record_usage(node, config, time.perf_counter() - started, response)
+    annotate_usage([response], len(tasks))
+    return response
+
+
+def _batch_results(
+    node: str, config: ModelConfig, started: float, results: List[Any]
+) -> List[Any]:
+    responses = [result for result in results if not isinstance(result, Exception)]
+    if not responses:
+        raise results[0]
+    elapsed = time.perf_counter() - started
+    for response in responses:
+        record_usage(node, config, elapsed, response)
+    annotate_usage(responses, len(results))
+    return responses
+
+
+def _limited_batch(
+    config: ModelConfig,
+    prompt: str,
+    cached_content: Optional[str],
+    count: int,
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    try:
+        return get_client(config, cached_content, timeout).batch(
+            [prompt] * count,
+            config={"max_concurrency": count},
+            return_exceptions=True,
+        )
+    finally:
+        rate_limiter.release(count)
+
+
+def invoke_llm_batch(
+    node: str, prompt: Union[str, RenderedPrompt], count: int
+) -> List[Any]:
+    # `count` independent samples of one prompt for best-of-N selection.
+    # Single-flight is bypassed on purpose: the point is distinct outputs,
+    # and the samples already race each other, so there is no hedging.
+    count = max(1, min(count, rate_limiter.max_concurrency))
+    with wait_span("llm"), span(f"llm {node}", {"llm.node": node, "llm.batch": count}):
+        cassette = active_cassette()
+        if cassette is not None:
+            annotate({"llm.cassette": cassette.mode})
+            # The sample count is part of the request, so replaying with a
+            # different N reports a changed prompt instead of a short batch.
+            return cassette.call_llm_batch(
+                node,
+                f"{prompt_text(prompt)}\n[best of {count}]",
+                lambda: _invoke_llm_batch(node, prompt, count),
+            )
+        return _invoke_llm_batch(node, prompt, count)
+
+
+def _invoke_llm_batch(
+    node: str, prompt: Union[str, RenderedPrompt], count: int
+) -> List[Any]:
+    config, deadline, payload, cached_content = _prepare_call(node, prompt)
+    started = time.perf_counter()
+
+    if not rate_limiter.acquire_many(count, timeout=deadline):
+        raise _limiter_timeout(node, deadline)
+    future = _executor.submit(
+        _limited_batch, config, payload, cached_content, count, request_timeout(node)
+    )
+    try:
+        results = future.result(
+            timeout=max(deadline - (time.perf_counter() - started), 0)
+        )
+    except FutureTimeoutError:
+        if future.cancel():
+            rate_limiter.release(count)
+        with _stats_lock:
+            _stats[node]["timeouts"] += 1
+        annotate({"llm.timed_out": True})
+        raise TimeoutError(f"LLM batch for {node} exceeded {deadline:.0f}s deadline")
+    return _batch_results(node, config, started, results)
+
+
+async def ainvoke_llm_batch(
+    node: str, prompt: Union[str, RenderedPrompt], count: int
+) -> List[Any]:
+    count = max(1, min(count, rate_limiter.max_concurrency))
+    with span(f"llm {node}", {"llm.node": node, "llm.batch": count}):
+        cassette = active_cassette()
+        if cassette is not None:
+            annotate({"llm.cassette": cassette.mode})
+            return await cassette.acall_llm_batch(
+                node,
+                f"{prompt_text(prompt)}\n[best of {count}]",
+                lambda: _ainvoke_llm_batch(node, prompt, count),
+            )
+        return await _ainvoke_llm_batch(node, prompt, count)
+
+
+async def _ainvoke_llm_batch(
+    node: str, prompt: Union[str, RenderedPrompt], count: int
+) -> List[Any]:
+    import asyncio
+
+    config, deadline, payload, cached_content = _prepare_call(node, prompt)
+    started = time.perf_counter()
+
+    if not await rate_limiter.aacquire_many(count, timeout=deadline):
+        raise _limiter_timeout(node, deadline)
+    task = asyncio.ensure_future(
+        get_client(config, cached_content, request_timeout(node)).abatch(
+            [payload] * count,
+            config={"max_concurrency": count},
+            return_exceptions=True,
+        )
+    )
+    task.add_done_callback(lambda _: rate_limiter.release(count))
+    try:
+        results = await asyncio.wait_for(
+            task, timeout=max(deadline - (time.perf_counter() - started), 0)
+        )
+    except asyncio.TimeoutError:
+        with _stats_lock:
+            _stats[node]["timeouts"] += 1
+        annotate({"llm.timed_out": True})
+        raise TimeoutError(f"LLM batch for {node} exceeded {deadline:.0f}s deadline")
+    return _batch_results(node, config, started, results)
+
+
+def model_report() -> Dict[str, Dict[str, Any]]:
+    with _stats_lock:
+        return {node: dict(stats) for node, stats in _stats.items()}
+
+
+def print_model_report() -> None:
+    report = model_report()
+    if not report:
+        return
+
+    print("🤖 LLM usage by node:")
+    lines: List[str] = []
+    for node, stats in sorted(report.items()):
+        average = stats["seconds"] / stats["calls"] if stats["calls"] else 0.0
+        prompt_average = (
+            stats["prompt_tokens_estimated"] // stats["calls"] if stats["calls"] else 0
+        )
+        hedge_rate = stats["hedges"] / stats["calls"] if stats["calls"] else 0.0
+        lines.append(
+            f"  • {node} [{stats['model']}]: {stats['calls']} calls, "
+            f"{average:.2f}s avg, {stats['input_tokens']}/{stats['output_tokens']} "
+            f"tokens in/out, ${stats['cost']:.4f}, hedge rate {hedge_rate:.0%} "
+            f"({stats['hedge_wins']} won), {stats['timeouts']} timeouts, "
+            f"~{stats['prompt_tokens_estimated']} prompt tokens estimated "
+            f"(~{prompt_average}/call), "
+            f"{stats['over_budget']} over budget"
+        )
+    print("\n".join(lines))
+
+
+load_model_routes()
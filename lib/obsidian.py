@@ -1,23 +1,24 @@
 import os
 import re
 
+from .blobs import load_text, store_text
 from .utils import AutomationState
 
 
+def clean_obsidian_text(content: str) -> str:
+    content = re.sub(r"\[\[(.*?)\]\]", r"\1", content)
+    content = re.sub(r"!\[\[(.*?)\]\]", "", content)
+    content = re.sub(r"#\w+", "", content)
+    return re.sub(r"\s+", " ", content).strip()
+
+
 def read_obsidian_notes(file_path: str) -> str:
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Obsidian file not found: {file_path}")
 
         with open(file_path, "r", encoding="utf-8") as file:
-            content = file.read()
-
-        content = re.sub(r"\[\[(.*?)\]\]", r"\1", content)
-        content = re.sub(r"!\[\[(.*?)\]\]", "", content)
-        content = re.sub(r"#\w+", "", content)
-        content = re.sub(r"\s+", " ", content).strip()
-
-        return content
+            return clean_obsidian_text(file.read())
 
     except Exception as e:
         raise Exception(f"Failed to read Obsidian notes: {str(e)}")
@@ -30,15 +31,13 @@ def process_obsidian_content(state: AutomationState) -> AutomationState:
     try:
         print("📝 Processing Obsidian notes...")
 
-        notes_content = state["obsidian_notes"]
+        notes_content = load_text(state["obsidian_notes"])
         if state.get("blog_content"):
-            combined_content = (
-                f"{state['blog_content']}\n\nAdditional Notes:\n{notes_content}"
-            )
+            combined_content = f"{load_text(state['blog_content'])}\n\nAdditional Notes:\n{notes_content}"
         else:
             combined_content = f"Notes Content:\n{notes_content}"
 
-        state["blog_content"] = combined_content
+        state["blog_content"] = store_text(combined_content)
         print("✅ Obsidian notes integrated")
 
     except Exception as e:
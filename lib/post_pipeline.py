@@ -0,0 +1,248 @@
+import asyncio
+from typing import Any, Dict, List, Optional, TypedDict
+
+from .aio import offload
+from .blobs import store_text
+from .deadlines import has_time_for
+from .social_media import (
+    FACT_CHECK_ISSUE,
+    afact_check_posts,
+    aimprove_if_needed,
+    areview_post,
+    check_post,
+    fact_check_posts,
+    fact_check_skipped,
+    improve_if_needed,
+    make_post_id,
+    review_post,
+    review_reason,
+    review_requires_human,
+)
+from .utils import SocialMediaPost, set_review_flags
+
+
+class PostState(TypedDict):
+    post_index: int
+    original_post: SocialMediaPost
+    post: SocialMediaPost
+    blog_url: str
+    blog_summary: str
+    validation_issues: List[str]
+    fact_check_report: str
+    peer_review_feedback: Dict[str, Any]
+    improvement_summary: List[str]
+    requires_human_review: bool
+    human_review_reason: str
+    deadline_skips: List[str]
+    review_flags: List[str]
+    improvement_iteration_count: int
+    post_changed: bool
+    deadline: Optional[float]
+    error: Optional[str]
+
+
+def make_post_state(
+    post_index: int,
+    post: SocialMediaPost,
+    blog_url: str,
+    blog_summary: str,
+    deadline: Optional[float] = None,
+) -> PostState:
+    return {
+        "post_index": post_index,
+        "original_post": post,
+        "post": post,
+        "blog_url": blog_url,
+        "blog_summary": blog_summary,
+        "validation_issues": [],
+        "fact_check_report": "",
+        "peer_review_feedback": {},
+        "improvement_summary": [],
+        "requires_human_review": False,
+        "human_review_reason": "",
+        "deadline_skips": [],
+        "review_flags": [],
+        "improvement_iteration_count": 0,
+        "post_changed": False,
+        "deadline": deadline,
+        "error": None,
+    }
+
+
+def _label(state: PostState) -> str:
+    post = state["post"]
+    return f"{post.platform} {post.post_type}"
+
+
+def _fact_check_args(post) -> tuple:
+    return ([], [post]) if post.platform == "X" else ([post], [])
+
+
+def _store_validation(
+    state: PostState, issues: List[str], report: Optional[str]
+) -> None:
+    state["post"].validation_notes.extend(issues)
+    # Each round replaces the last round's report, so a clean re-check
+    # clears it.
+    state["fact_check_report"] = store_text(report) if report else ""
+    if report:
+        issues = issues + [FACT_CHECK_ISSUE]
+    state["validation_issues"] = issues
+    print(f"🔍 {_label(state)}: {len(issues)} validation issues")
+
+
+def validate_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        post = state["post"]
+        issues = check_post(post, state["blog_url"])
+        report = None
+        if has_time_for("fact_check", state.get("deadline")):
+            report = fact_check_posts(*_fact_check_args(post))
+        else:
+            fact_check_skipped(state)
+        _store_validation(state, issues, report)
+
+    except Exception as e:
+        error_msg = f"Validation failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+async def avalidate_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        post = state["post"]
+        fact_check = None
+        if has_time_for("fact_check", state.get("deadline")):
+            fact_check = afact_check_posts(*_fact_check_args(post))
+        else:
+            fact_check_skipped(state)
+        issues, report = await asyncio.gather(
+            offload(check_post, post, state["blog_url"]),
+            fact_check or asyncio.sleep(0),
+        )
+        _store_validation(state, issues, report)
+
+    except Exception as e:
+        error_msg = f"Validation failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+def _store_review(state: PostState, feedback: dict) -> None:
+    state["peer_review_feedback"] = feedback
+    set_review_flags(
+        state,
+        (
+            [review_reason(state["post"], feedback)]
+            if review_requires_human(feedback)
+            else []
+        ),
+    )
+    print(f"🔍 {_label(state)}: review score {state['post'].peer_review_score}")
+
+
+def review_single_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        _store_review(state, review_post(state["post"], state["blog_url"]))
+
+    except Exception as e:
+        error_msg = f"Peer review failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+async def areview_single_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        _store_review(state, await areview_post(state["post"], state["blog_url"]))
+
+    except Exception as e:
+        error_msg = f"Peer review failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+def _store_improvement(state: PostState, improved_post, note: Optional[str]) -> None:
+    state["post_changed"] = improved_post is not state["post"]
+    state["post"] = improved_post
+    if note:
+        state["improvement_summary"] = state["improvement_summary"] + [note]
+    print(
+        f"✨ {_label(state)}: improvement iteration {state['improvement_iteration_count']}"
+    )
+
+
+def improve_single_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        state["improvement_iteration_count"] += 1
+        improved_post, note = improve_if_needed(
+            state["post"], state["peer_review_feedback"], state
+        )
+        _store_improvement(state, improved_post, note)
+
+    except Exception as e:
+        error_msg = f"Content improvement failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+async def aimprove_single_post(state: PostState) -> PostState:
+    if state.get("error"):
+        return state
+
+    try:
+        state["improvement_iteration_count"] += 1
+        improved_post, note = await aimprove_if_needed(
+            state["post"], state["peer_review_feedback"], state
+        )
+        _store_improvement(state, improved_post, note)
+
+    except Exception as e:
+        error_msg = f"Content improvement failed for {_label(state)}: {str(e)}"
+        print(f"❌ {error_msg}")
+        state["error"] = error_msg
+
+    return state
+
+
+def post_result(state: PostState) -> Dict[str, Any]:
+    return {
+        "post_index": state["post_index"],
+        "post_id": make_post_id(state["original_post"]),
+        "original_post": state["original_post"],
+        "post": state["post"],
+        "validation_issues": state["validation_issues"],
+        "fact_check_report": state["fact_check_report"],
+        "peer_review_feedback": state["peer_review_feedback"],
+        "improvement_summary": state["improvement_summary"],
+        "requires_human_review": state["requires_human_review"],
+        "human_review_reason": state["human_review_reason"],
+        "deadline_skips": state["deadline_skips"],
+        "review_flags": state["review_flags"],
+        "improvement_iteration_count": state["improvement_iteration_count"],
+        "error": state["error"],
+    }
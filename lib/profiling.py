@@ -0,0 +1,221 @@
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".post_automation/profiles")
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 10
+
+
+@dataclass
+class NodeProfile:
+    node: str
+    call: int
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    wait_seconds: Dict[str, float] = field(default_factory=dict)
+    allocated_bytes: int = 0
+    profile_file: Optional[str] = None
+    allocations_file: Optional[str] = None
+
+    @property
+    def other_seconds(self) -> float:
+        # Wall time that is neither this thread's CPU nor tagged network wait:
+        # lock contention, GIL hand-offs, untagged I/O.
+        waited = sum(self.wait_seconds.values())
+        return max(self.wall_seconds - self.cpu_seconds - waited, 0.0)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def wait_span(kind: str):
+    # Tags time the current node spends blocked on the network ("llm",
+    # "http") so it is reported apart from CPU time. A no-op unless a
+    # profiled node is running on this thread.
+    record = getattr(_local, "record", None)
+    if record is None:
+        yield
+        return
+
+    _local.waiting = kind
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        record.wait_seconds[kind] = record.wait_seconds.get(kind, 0.0) + elapsed
+        _local.waiting = None
+
+
+class Profiler:
+    def __init__(self, base_dir: str = PROFILE_DIR):
+        self.run_dir = os.path.join(base_dir, time.strftime("%Y%m%d-%H%M%S"))
+        self.records: List[NodeProfile] = []
+        self.stacks: Counter = Counter()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        # thread ident -> (node, thread-local state) for the sampler.
+        self._running: Dict[int, tuple] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+
+    def start(self) -> "Profiler":
+        os.makedirs(self.run_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._sampler = threading.Thread(
+            target=self._sample, name="profile-sampler", daemon=True
+        )
+        self._sampler.start()
+        print(f"🔬 Profiling enabled, writing to {self.run_dir}")
+        return self
+
+    def wrap(self, node: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def profiled(state, *args, **kwargs):
+            if getattr(_local, "record", None) is not None:
+                # Already inside a profiled node on this thread (a sub-graph);
+                # the outer profile covers it.
+                return fn(state, *args, **kwargs)
+            return self._run(node, fn, state, *args, **kwargs)
+
+        return profiled
+
+    def _run(self, node: str, fn: Callable, state, *args, **kwargs):
+        with self._lock:
+            self._calls[node] += 1
+            record = NodeProfile(node=node, call=self._calls[node])
+            self.records.append(record)
+        name = f"{node}.{record.call}"
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active (Python 3.12+ allows only one
+            # per process); keep the timings and skip the .prof for this call.
+            profile = None
+
+        before = tracemalloc.take_snapshot()
+        _local.record = record
+        _local.waiting = None
+        ident = threading.get_ident()
+        with self._lock:
+            self._running[ident] = (node, _local.__dict__)
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            return fn(state, *args, **kwargs)
+        finally:
+            record.cpu_seconds = time.thread_time() - cpu_started
+            record.wall_seconds = time.perf_counter() - wall_started
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._running.pop(ident, None)
+            _local.record = None
+
+            after = tracemalloc.take_snapshot()
+            self._write_node_files(name, record, profile, before, after)
+
+    def _write_node_files(self, name, record, profile, before, after) -> None:
+        if profile is not None:
+            record.profile_file = os.path.join(self.run_dir, f"{name}.prof")
+            profile.dump_stats(record.profile_file)
+
+        diff = after.compare_to(before, "lineno")
+        record.allocated_bytes = sum(stat.size_diff for stat in diff)
+        record.allocations_file = os.path.join(self.run_dir, f"{name}.alloc.txt")
+        with open(record.allocations_file, "w", encoding="utf-8") as file:
+            for stat in diff[:TOP_ALLOCATIONS]:
+                file.write(f"{stat}\n")
+
+    def _sample(self) -> None:
+        # cProfile has caller/callee pairs but no full stacks, so flame graphs
+        # come from periodic samples of the threads running a node.
+        while not self._stop.wait(SAMPLE_INTERVAL_SECONDS):
+            with self._lock:
+                running = dict(self._running)
+            frames = sys._current_frames()
+            for ident, (node, thread_state) in running.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                    )
+                    frame = frame.f_back
+                waiting = thread_state.get("waiting")
+                root = [node, f"[{waiting}-wait]" if waiting else "[cpu]"]
+                self.stacks[";".join(root + stack[::-1])] += 1
+
+    def finish(self) -> Dict[str, List[dict]]:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        with open(
+            os.path.join(self.run_dir, "stacks.collapsed"), "w", encoding="utf-8"
+        ) as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{stack} {count}\n")
+
+        summary = {
+            "nodes": [
+                dict(asdict(record), other_seconds=record.other_seconds)
+                for record in self.records
+            ]
+        }
+        with open(
+            os.path.join(self.run_dir, "summary.json"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(summary, file, indent=2)
+        return summary
+
+    def print_report(self) -> None:
+        if not self.records:
+            return
+
+        totals: Dict[str, NodeProfile] = {}
+        for record in self.records:
+            total = totals.setdefault(record.node, NodeProfile(record.node, 0))
+            total.call += 1
+            total.wall_seconds += record.wall_seconds
+            total.cpu_seconds += record.cpu_seconds
+            total.allocated_bytes += record.allocated_bytes
+            for kind, seconds in record.wait_seconds.items():
+                total.wait_seconds[kind] = total.wait_seconds.get(kind, 0.0) + seconds
+
+        print(f"🔬 Profile by node (details in {self.run_dir}):")
+        lines = []
+        for total in sorted(totals.values(), key=lambda t: -t.wall_seconds):
+            waits = ", ".join(
+                f"{kind} wait {seconds:.2f}s"
+                for kind, seconds in sorted(total.wait_seconds.items())
+            )
+            lines.append(
+                f"  • {total.node}: {total.call} calls, {total.wall_seconds:.2f}s wall, "
+                f"{total.cpu_seconds:.2f}s cpu, {waits or 'no network wait'}, "
+                f"{total.other_seconds:.2f}s other, "
+                f"{total.allocated_bytes / 1024:.0f} KiB net allocated"
+            )
+        print("\n".join(lines))
@@ -0,0 +1,277 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+from .aio import offload
+from .cassette import active_cassette
+from .models import ainvoke_llm, invoke_llm, model_for_node
+from .prompts import RenderedPrompt, prompt_text
+from .tracing import annotate, span
+
+SEMANTIC_CACHE_DB = os.getenv(
+    "SEMANTIC_CACHE_DB", os.path.join(".post_automation", "semantic_cache.sqlite")
+)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1") != "0"
+
+# Maximum Hamming distance (out of 64 SimHash bits) between the variable
+# sections of two prompts for the older response to be reused. Rewriting one
+# sentence of a ten-sentence summary moves ~9 bits; unrelated texts sit above
+# 20. Nodes not listed, reviews among them, only reuse exact matches: a
+# score must describe the exact post.
+SEMANTIC_CACHE_THRESHOLDS: Dict[str, int] = {
+    "generate_linkedin_posts": 10,
+    "generate_x_posts": 10,
+}
+SEMANTIC_CACHE_CANDIDATES = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    node TEXT NOT NULL,
+    static_key TEXT NOT NULL,
+    prompt_key TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    response TEXT NOT NULL,
+    prompt_chars INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lookup_idx ON entries (node, static_key, created_at);
+"""
+
+_lock = threading.Lock()
+_stats: Dict[str, Counter] = defaultdict(Counter)
+
+
+def _connect() -> sqlite3.Connection:
+    directory = os.path.dirname(SEMANTIC_CACHE_DB)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(SEMANTIC_CACHE_DB, timeout=30, isolation_level=None)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def simhash(text: str) -> int:
+    words = re.findall(r"\w+", text.lower())
+    features = Counter(" ".join(words[i : i + 2]) for i in range(max(len(words) - 1, 1)))
+    weights = [0] * 64
+    for feature, count in features.items():
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return bin(left ^ right).count("1")
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def _static_key(node: str, prompt: str, variable_sections: Sequence[str]) -> str:
+    static = prompt
+    for section in sorted(variable_sections, key=len, reverse=True):
+        if section:
+            static = static.replace(section, "\x00")
+    # The routed model is part of the key, so changing a node's model or
+    # temperature does not serve responses from the old one.
+    model = model_for_node(node)
+    return hashlib.sha256(
+        f"{node}\x00{model}\x00{static}".encode("utf-8")
+    ).hexdigest()
+
+
+def _lookup(
+    node: str, static_key: str, prompt_key: str, fingerprint: int
+) -> Optional[tuple]:
+    threshold = SEMANTIC_CACHE_THRESHOLDS.get(node)
+    conn = _connect()
+    try:
+        if threshold is None:
+            rows = conn.execute(
+                """
+                SELECT prompt_key, simhash, response FROM entries
+                WHERE node = ? AND static_key = ? AND prompt_key = ?
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (node, static_key, prompt_key),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """
+                SELECT prompt_key, simhash, response FROM entries
+                WHERE node = ? AND static_key = ?
+                ORDER BY created_at DESC LIMIT ?
+                """,
+                (node, static_key, SEMANTIC_CACHE_CANDIDATES),
+            ).fetchall()
+    finally:
+        conn.close()
+
+    best = None
+    for row_prompt_key, row_simhash, response in rows:
+        if row_prompt_key == prompt_key:
+            return ("exact", 0, response)
+        distance = hamming_distance(fingerprint, _to_unsigned(row_simhash))
+        if distance <= threshold and (best is None or distance < best[1]):
+            best = ("near", distance, response)
+    return best
+
+
+def _store(
+    node: str, static_key: str, prompt_key: str, fingerprint: int, prompt: str, response: str
+) -> None:
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                node,
+                static_key,
+                prompt_key,
+                _to_signed(fingerprint),
+                response,
+                len(prompt),
+                time.time(),
+            ),
+        )
+    finally:
+        conn.close()
+
+
+def _cache_lookup(
+    node: str,
+    text: str,
+    variable_sections: Sequence[str],
+    validate: Optional[Callable[[str], bool]],
+) -> Tuple[Tuple[str, str, int], Optional[str]]:
+    static_key = _static_key(node, text, variable_sections)
+    prompt_key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    fingerprint = simhash("\n".join(variable_sections))
+    keys = (static_key, prompt_key, fingerprint)
+
+    with span("prompt_cache lookup", {"llm.node": node}):
+        try:
+            hit = _lookup(node, static_key, prompt_key, fingerprint)
+        except sqlite3.Error as e:
+            print(f"⚠️ Semantic cache lookup failed: {e}")
+            hit = None
+        annotate({"cache.hit": hit[0] if hit else "miss"})
+
+    if hit is not None:
+        kind, distance, response = hit
+        if validate is None or validate(response):
+            with _lock:
+                _stats[node][f"{kind}_hits"] += 1
+                _stats[node]["saved_prompt_chars"] += len(text)
+                _stats[node]["saved_response_chars"] += len(response)
+            print(f"♻️ Reused cached {node} response ({kind}, distance {distance})")
+            return keys, response
+        with _lock:
+            _stats[node]["rejected"] += 1
+    return keys, None
+
+
+def _cache_store(
+    node: str, keys: Tuple[str, str, int], text: str, response: str
+) -> None:
+    with _lock:
+        _stats[node]["misses"] += 1
+    try:
+        _store(node, *keys, text, response)
+    except sqlite3.Error as e:
+        print(f"⚠️ Semantic cache store failed: {e}")
+
+
+def cached_invoke(
+    node: str,
+    prompt: Union[str, RenderedPrompt],
+    variable_sections: Sequence[str],
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    # A cassette must see every call, or replay order would depend on
+    # whatever the local cache happened to hold.
+    if not SEMANTIC_CACHE_ENABLED or active_cassette() is not None:
+        return invoke_llm(node, prompt).content
+
+    text = prompt_text(prompt)
+    keys, response = _cache_lookup(node, text, variable_sections, validate)
+    if response is not None:
+        return response
+
+    response = invoke_llm(node, prompt).content
+    _cache_store(node, keys, text, response)
+    return response
+
+
+async def acached_invoke(
+    node: str,
+    prompt: Union[str, RenderedPrompt],
+    variable_sections: Sequence[str],
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    if not SEMANTIC_CACHE_ENABLED or active_cassette() is not None:
+        return (await ainvoke_llm(node, prompt)).content
+
+    # SimHash and SQLite are blocking; keep them off the event loop.
+    text = prompt_text(prompt)
+    keys, response = await offload(
+        _cache_lookup, node, text, variable_sections, validate
+    )
+    if response is not None:
+        return response
+
+    response = (await ainvoke_llm(node, prompt)).content
+    await offload(_cache_store, node, keys, text, response)
+    return response
+
+
+def semantic_cache_report() -> Dict[str, Dict[str, float]]:
+    report = {}
+    with _lock:
+        for node, counts in _stats.items():
+            hits = counts["exact_hits"] + counts["near_hits"]
+            lookups = hits + counts["misses"]
+            report[node] = {
+                **counts,
+                "threshold": SEMANTIC_CACHE_THRESHOLDS.get(node),
+                "hit_rate": hits / lookups if lookups else 0.0,
+                # ~4 characters per token for English prose.
+                "saved_tokens": (
+                    counts["saved_prompt_chars"] + counts["saved_response_chars"]
+                )
+                // 4,
+            }
+    return report
+
+
+def _threshold_label(threshold: Optional[int]) -> str:
+    return "exact only" if threshold is None else f"threshold {threshold} bits"
+
+
+def print_semantic_cache_report() -> None:
+    report = semantic_cache_report()
+    if not report:
+        return
+
+    print("♻️ Semantic cache:")
+    for node, stats in sorted(report.items()):
+        print(
+            f"  • {node}: {stats['hit_rate']:.0%} hit rate "
+            f"({stats.get('exact_hits', 0)} exact, {stats.get('near_hits', 0)} near, "
+            f"{stats.get('misses', 0)} misses, {stats.get('rejected', 0)} rejected), "
+            f"{_threshold_label(stats['threshold'])}, "
+            f"~{stats['saved_tokens']} tokens saved"
+        )
@@ -0,0 +1,390 @@
+import json
+import re
+import textwrap
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List
+
+# Every prompt is assembled as <static prefix><variable body>. The prefix is
+# byte-identical across calls so provider-side prefix/context caches can hit;
+# anything that changes per call (summary, post, feedback, URLs) belongs in
+# the body. Instructions therefore refer to values "given below".
+
+HOUSE_STYLE = """You write and edit social media posts for an individual technical practitioner.
+
+## House style (applies to every post):
+- Individual practitioner voice. Avoid team pronouns ("we", "our", "us", "the team").
+- Do not explicitly state role or motives (e.g., "I'm a dev", "to grow my network").
+- Avoid using words that statiscally more likely to appear in the text generation of gemini-2.5-flash
+- Banlist: avoid "unlock", "leverage", "cutting-edge", "AI-powered", "revolutionize", "game-changer", "drive impact", "elevate", "innovative" unless quoted from a source.
+- Use acscii to visualize tough parts: prefer one micro ASCII sketch (3-5 lines) OR one simple equation when it clarifies.
+
+"""
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    instructions: str
+    body: str
+    shared_prefix: str = ""
+
+    @property
+    def prefix(self) -> str:
+        return "".join(
+            f"{part}\n\n" for part in (self.shared_prefix, self.instructions) if part
+        )
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    name: str
+    prefix: str
+    body: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.body
+
+    def __str__(self) -> str:
+        return self.text
+
+
+TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def minify_prompt(text: str) -> str:
+    # Only template text goes through here; variable values such as post
+    # bodies keep their whitespace because ASCII sketches depend on it.
+    lines = [
+        re.sub(r"(?<=\S)[ \t]{2,}", " ", line).rstrip()
+        for line in textwrap.dedent(text).split("\n")
+    ]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    # Gemini averages ~4 characters per token on English prose; exact counts
+    # need an API round-trip, and usage_metadata reports them afterwards.
+    return (len(text) + 3) // 4
+
+
+def format_post_list(contents: List[str]) -> str:
+    if not contents:
+        return "None"
+    # Only blank lines are trimmed: a leading ASCII sketch keeps its indent.
+    return "\n\n".join(
+        f"[Post {i}]\n" + content.strip("\n") for i, content in enumerate(contents, 1)
+    )
+
+
+def format_bullets(items: List[Any]) -> str:
+    if not items:
+        return "None"
+    return "\n".join(f"- {item}" for item in items)
+
+
+def format_json_lines(items: List[Any]) -> str:
+    if not items:
+        return "None"
+    return "\n".join(json.dumps(item, ensure_ascii=False) for item in items)
+
+
+def register_template(template: PromptTemplate) -> PromptTemplate:
+    template = replace(
+        template,
+        shared_prefix=minify_prompt(template.shared_prefix),
+        instructions=minify_prompt(template.instructions),
+        body=minify_prompt(template.body),
+    )
+    TEMPLATES[template.name] = template
+    return template
+
+
+def render_prompt(name: str, **variables) -> RenderedPrompt:
+    # The template was minified at registration; values are interpolated
+    # verbatim, since post bodies and sketches depend on their whitespace.
+    template = TEMPLATES[name]
+    return RenderedPrompt(
+        name=name,
+        prefix=template.prefix,
+        body=template.body.format(**variables) + "\n",
+    )
+
+
+def prompt_text(prompt) -> str:
+    return prompt.text if isinstance(prompt, RenderedPrompt) else prompt
+
+
+def template_prefixes() -> Dict[str, str]:
+    return {name: template.prefix for name, template in TEMPLATES.items()}
+
+
+register_template(
+    PromptTemplate(
+        name="blog_summary",
+        instructions="""Analyze the blog post given below and extract key insights for social media content creation.
+
+Please provide:
+1. A concise summary (100-150 words)
+2. 3-5 key takeaways/insights
+3. Main topic/theme
+4. Target audience
+5. Key statistics or claims that need validation
+
+Format your response clearly with sections.
+
+""",
+        body="""Blog Content:
+{blog_content}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="teaser_posts",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: Create engaging teaser posts based on the idea and research notes given below.
+
+Generate:
+1. A LinkedIn teaser post (1000-1200 characters) that creates curiosity without revealing everything
+2. An X thread teaser (3-4 tweets) that hints at the upcoming content
+
+Requirements:
+- NO LINKS (this is a teaser before the blog is published)
+- Create anticipation for the full content coming later
+- No emojis or exclamation points
+
+""",
+        body="""Idea: {idea_text}
+Research Notes: {obsidian_notes}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="blog_draft",
+        instructions="""Create a comprehensive blog post draft based on the initial idea and research notes given below.
+
+Create a well-structured blog post with:
+- Compelling title
+- Introduction that hooks the reader
+- Main content sections with clear headings
+- Concrete examples and explanations
+- Conclusion with key takeaways
+
+Style: Technical but accessible, individual practitioner voice, no hype words.
+
+""",
+        body="""Initial Idea: {idea_text}
+Research Notes: {obsidian_notes}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="linkedin_teaser",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: Create a LinkedIn teaser post based on the blog summary given below.
+
+## Sample tone and style of the content for reference:
+DNS is perhaps the largest eventually consistent system in the world. A single request travels through recursive resolvers, root servers, TLDs, and authoritative name servers, with caching at every layer to make it feel instant. The fact that this happens billions of times a second, across every corner of the globe, with so many independent actors cooperating without a central authority, is wild. And don't even get me started on how the internet itself works. Packets, literally just light pulses, race across networks and switches to reach the right machines, processes, and threads in milliseconds. It almost feels magical.
+
+## Requirements:
+- 1000-1200 characters total
+- Engaging hook to grab attention
+- Professional LinkedIn tone
+- Include relevant hashtags
+- NO LINKS (this is a teaser)
+- End with a question or call for engagement
+- Do not use emojis
+
+Make it compelling enough that people want to know more.
+
+""",
+        body="""## Blog Summary:
+{blog_summary}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="linkedin_blog_reference",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: Create a LinkedIn post that references the full blog post summarized below.
+
+## Requirements:
+- 1000-1200 characters total
+- Reference insights from the blog
+- Include the blog URL given below
+- Professional but engaging tone
+- Add relevant hashtags
+- Include a clear call-to-action to read the full post
+- Share 1-2 specific takeaways from the blog
+- Do not use emojis
+
+This should provide value while encouraging clicks to the full article.
+
+""",
+        body="""## Blog Summary:
+{blog_summary}
+## Blog URL:
+{blog_url}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="x_thread",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: Create a complete X (Twitter) thread based on the blog summary given below.
+
+## Requirements:
+Create exactly 3 separate posts for a complete thread:
+
+1. **Hook Tweet**: A short, engaging tweet (under 280 chars) that hints at the topic and creates curiosity
+
+2. **Thread Starter**: A main tweet (under 280 chars) that introduces the thread topic and says "Thread 🧵" or similar
+
+3. **Thread Content**: A complete numbered thread with 6-8 tweets, each under 280 characters:
+   - Format as: "1/ First insight about..."
+   - Format as: "2/ Second key point..."
+   - Continue with "3/", "4/", etc.
+   - Include the blog URL given below in the final tweet
+   - Each tweet should be on a new line
+
+## Style Guidelines:
+- Twitter-appropriate tone (casual, engaging)
+- Use line breaks between numbered tweets
+- Make each tweet valuable on its own
+- Build narrative flow through the thread
+
+Return the 3 posts clearly separated, with the thread content as one cohesive block.
+
+""",
+        body="""## Blog Summary:
+{blog_summary}
+## Blog URL:
+{blog_url}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="fact_check",
+        instructions="""Review the social media posts given below for potentially unsupported claims or statements that need fact-checking.
+
+Flag any:
+- Specific statistics without clear sources
+- Bold claims that seem unverifiable
+- Statements presented as facts that could be opinions
+- Exaggerated language
+
+Return a list of concerning claims that should be marked with ⚠️ for manual review.
+
+""",
+        body="""LinkedIn Posts:
+{linkedin_posts}
+
+X Posts:
+{x_posts}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="peer_review",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: You are a senior editor reviewing the post given below. Your job is to deliver surgical, concrete edits that raise clarity and specificity without changing the author's core message or structure.
+
+CRITERIA:
+- Engagement: precise, curiosity-driven hook without hype.
+- Specificity: replace abstractions with concrete mechanisms, examples, or numbers.
+- Platform fit: native formatting and constraints for the platform given below.
+- Accuracy: avoid unsupported claims; flag stats without sources.
+- Style: short sentences, plain language, no emojis, no exclamation points.
+- Banlist: flag any house-style banlist words.
+- LinkedIn length: 1000–1200 characters for both teaser and blog-reference posts.
+- Voice: individual practitioner tone; avoid team pronouns ("we", "our", "us", "the team"). Do not insert explicit role/motive statements.
+
+WHAT TO RETURN:
+Return ONLY valid JSON (no markdown, no code fences) with this exact shape and keys:
+{"overall_score": number, "issues": [{"type": string, "severity": "low"|"medium"|"high", "description": string, "suggestion": string, "example": string}], "strengths": [string], "actionable_edits": [{"target_quote": string, "rationale": string, "edit_text": string}], "improvement_priority": "low"|"medium"|"high", "needs_human_review": boolean, "preserve_original": true, "banlist_hits": [string]}
+
+EDIT FOCUS:
+- Prefer adding one concrete example that illustrates mechanism/cause, not just naming concepts.
+- When applicable, propose one micro ASCII sketch (3-5 lines) OR one simple equation to clarify.
+- For LinkedIn: ensure <=3 relevant hashtags max; Monday teaser has no links and ends with a question.
+- For X threads: preserve numbering and per-line <280 chars; final line includes the blog URL given below.
+
+Output the JSON only.
+
+""",
+        body="""POST DETAILS:
+- Platform: {platform}
+- Type: {post_type}
+- Length: {char_count} characters
+- Source: {source_type}
+- Blog URL: {blog_url}
+- Existing validation issues:
+{validation_notes}
+
+POST CONTENT:
+{content}
+""",
+    )
+)
+
+register_template(
+    PromptTemplate(
+        name="improve_post",
+        shared_prefix=HOUSE_STYLE,
+        instructions="""# Task: Improve the post given below based on the peer review feedback. Keep the author's core idea and structure. Make precise, minimal edits that increase specificity and clarity.
+
+REQUIREMENTS (platform-aware):
+- Target length: the target character count given below (stay within ±10%).
+- Style: short sentences, plain language, no emojis, no exclamation points, avoid hype.
+- Specificity: add 1 concrete example grounded in the topic or summary.
+- Preserve any numbered or bulleted structure present in the original.
+
+- If Platform = LinkedIn and Type = "Monday Teaser":
+  - 1000-1200 characters, no links, end with a genuine question, <=3 relevant hashtags.
+- If Platform = LinkedIn and Type = "Thursday Blog Reference":
+  - 1000-1200 characters, include the blog URL given below, 1-2 concrete takeaways, clear CTA to read more, <=3 relevant hashtags.
+- If Platform = X (Twitter) and Type contains "Thread":
+  - Preserve numbered thread format, each line < 280 chars, final line includes the blog URL given below.
+
+Address all peer review issues given below and keep the listed strengths.
+
+OUTPUT:
+- Return ONLY the improved post content, nothing else. No JSON, no prefixes, no backticks.
+- Keep the voice human and specific. Do not add filler or buzzwords.
+
+""",
+        body="""POST DETAILS:
+- Platform: {platform}
+- Type: {post_type}
+- Target length: {char_count} characters
+- Blog URL: {blog_url}
+
+ORIGINAL POST:
+{content}
+
+CONTEXT (may use for concrete examples):
+Blog summary (if available): {blog_summary}
+
+PEER REVIEW FEEDBACK (one JSON issue per line):
+{issues}
+
+Strengths to maintain:
+{strengths}
+""",
+    )
+)
+
@@ -0,0 +1,381 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .cassette import active_cassette
+from .utils import SocialMediaPost
+
+SCORE_CALIBRATION_PATH = os.getenv(
+    "SCORE_CALIBRATION_PATH",
+    os.path.join(".post_automation", "score_calibration.jsonl"),
+)
+LOCAL_SCORE_GATE = os.getenv("LOCAL_SCORE_GATE", "1") != "0"
+
+# Until a platform has this many LLM-scored posts the gate stays open and
+# every post is reviewed (which is also how the samples accumulate).
+MIN_CALIBRATION_SAMPLES = 30
+# A post skips the LLM review only when its calibrated score, widened by
+# CONFIDENCE_MARGIN calibration errors, clears the thresholds the review
+# would decide anyway: >= 8 means no rewrite, < 6 means human review.
+SKIP_ABOVE_SCORE = 8.0
+SKIP_BELOW_SCORE = 6.0
+CONFIDENCE_MARGIN = 1.5
+
+# Mirrors the house-style banlist in prompts.HOUSE_STYLE.
+BANLIST = [
+    "unlock",
+    "leverage",
+    "cutting-edge",
+    "ai-powered",
+    "revolutionize",
+    "game-changer",
+    "drive impact",
+    "elevate",
+    "innovative",
+]
+LINKEDIN_MAX_HASHTAGS = 3
+
+_WORD_RE = re.compile(r"[A-Za-z0-9']+")
+_SENTENCE_RE = re.compile(r"[.!?]+(?:\s+|$)|\n+")
+_SYLLABLE_RE = re.compile(r"[aeiouy]+")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?%?")
+_CODE_RE = re.compile(r"`[^`\n]+`|\w\(\)|[a-z]_[a-z]")
+# Written to start with the literal "#" (the lookbehind then checks the
+# character before it) so the regex engine can skip straight to candidates.
+_HASHTAG_RE = re.compile(r"#(?<!\w#)\w+")
+_EMOJI_RE = re.compile("[\U0001f300-\U0001faff\u2600-\u27bf]")
+_SKETCH_LINE_RE = re.compile(r"-->|<--|->|\+-{2,}|\|.*\||[─│┌┐└┘├┤▲▼]")
+_BANLIST_RE = re.compile(
+    r"\b(" + "|".join(re.escape(word) for word in BANLIST) + r")\b"
+)
+
+
+class PostScore(NamedTuple):
+    platform: str
+    raw: float
+    features: Dict[str, float]
+    issues: List[dict]
+
+
+def post_features(post: SocialMediaPost) -> Dict[str, float]:
+    text = post.content.strip()
+    lower = text.lower()
+    words = _WORD_RE.findall(text)
+    word_count = max(len(words), 1)
+    sentences = [s for s in _SENTENCE_RE.split(text) if s.strip()]
+    sentence_words = [len(s.split()) for s in sentences] or [0]
+    lines = text.splitlines()
+    hook = lines[0] if lines else ""
+    words_per_sentence = word_count / max(len(sentences), 1)
+    syllables_per_word = len(_SYLLABLE_RE.findall(lower)) / word_count
+    # Substring checks are far cheaper than the regex passes; most posts have
+    # no banlist words or code at all, so those passes are usually skipped.
+    banlist_hits = (
+        len(_BANLIST_RE.findall(lower)) if any(w in lower for w in BANLIST) else 0
+    )
+    has_code = "`" in text or "()" in text or "_" in text
+
+    return {
+        "words": float(len(words)),
+        "words_per_sentence": words_per_sentence,
+        "long_sentence_ratio": sum(n > 25 for n in sentence_words)
+        / len(sentence_words),
+        # Flesch reading ease with vowel groups standing in for syllables.
+        "reading_ease": 206.835
+        - 1.015 * words_per_sentence
+        - 84.6 * syllables_per_word,
+        "hook_words": float(len(_WORD_RE.findall(hook))),
+        "hook_specific": float(bool(_NUMBER_RE.search(hook)) or hook.endswith("?")),
+        "hashtags": float(len(_HASHTAG_RE.findall(text))),
+        "ends_with_question": float(text.endswith("?")),
+        "banlist_hits": float(banlist_hits),
+        "banlist_density": 100 * banlist_hits / word_count,
+        "exclamations": float(text.count("!")),
+        "emojis": float(len(_EMOJI_RE.findall(text))),
+        "numbers": float(len(_NUMBER_RE.findall(text))),
+        "code": float(len(_CODE_RE.findall(text)) if has_code else 0),
+        "ascii_sketch": float(
+            bool(_SKETCH_LINE_RE.search(text))
+            and sum(bool(_SKETCH_LINE_RE.search(line)) for line in lines) >= 2
+        ),
+        "validation_notes": float(len(post.validation_notes)),
+    }
+
+
+def _issue(issue_type: str, severity: str, description: str, suggestion: str) -> dict:
+    return {
+        "type": issue_type,
+        "severity": severity,
+        "description": description,
+        "suggestion": suggestion,
+    }
+
+
+def heuristic_score(
+    post: SocialMediaPost, features: Dict[str, float]
+) -> Tuple[float, List[dict]]:
+    score = 7.0
+    issues = []
+
+    if 40 <= features["reading_ease"] <= 80:
+        score += 0.5
+    elif features["reading_ease"] < 30:
+        score -= 0.5
+    if features["words_per_sentence"] <= 20:
+        score += 0.3
+    elif features["words_per_sentence"] > 28:
+        score -= 0.7
+        issues.append(
+            _issue(
+                "style",
+                "medium",
+                f"Sentences average {features['words_per_sentence']:.0f} words",
+                "Split long sentences; keep most under 20 words",
+            )
+        )
+
+    if features["hook_words"] <= 20:
+        score += 0.3
+    elif features["hook_words"] > 35:
+        score -= 0.5
+        issues.append(
+            _issue(
+                "engagement",
+                "medium",
+                f"Opening line runs {features['hook_words']:.0f} words",
+                "Tighten the hook to one short, concrete sentence",
+            )
+        )
+    if features["hook_specific"]:
+        score += 0.3
+
+    if post.platform == "LinkedIn":
+        if features["hashtags"] > LINKEDIN_MAX_HASHTAGS:
+            score -= 0.7
+            issues.append(
+                _issue(
+                    "platform_fit",
+                    "medium",
+                    f"{features['hashtags']:.0f} hashtags",
+                    f"Keep at most {LINKEDIN_MAX_HASHTAGS} relevant hashtags",
+                )
+            )
+        if post.post_type == "Monday Teaser" and not features["ends_with_question"]:
+            score -= 0.5
+            issues.append(
+                _issue(
+                    "engagement",
+                    "medium",
+                    "Teaser does not end with a question",
+                    "Close with a question that invites replies",
+                )
+            )
+
+    if features["banlist_hits"]:
+        score -= min(0.8 * features["banlist_hits"], 2.4)
+        issues.append(
+            _issue(
+                "banlist",
+                "high",
+                f"{features['banlist_hits']:.0f} house-style banlist words",
+                "Replace banlist words with plain, specific language",
+            )
+        )
+    if features["exclamations"] or features["emojis"]:
+        score -= min(0.4 * (features["exclamations"] + features["emojis"]), 1.2)
+        issues.append(
+            _issue(
+                "style",
+                "medium",
+                "Exclamation points or emojis",
+                "Remove emojis and exclamation points",
+            )
+        )
+
+    if features["numbers"] >= 1:
+        score += 0.3
+    if features["numbers"] >= 3:
+        score += 0.2
+    if features["code"]:
+        score += 0.3
+    if features["ascii_sketch"]:
+        score += 0.4
+    if not (features["numbers"] or features["code"] or features["ascii_sketch"]):
+        score -= 0.3
+        issues.append(
+            _issue(
+                "specificity",
+                "medium",
+                "No numbers, code or sketch to ground the claims",
+                "Add one concrete example, number or micro ASCII sketch",
+            )
+        )
+
+    if features["validation_notes"]:
+        score -= min(0.6 * features["validation_notes"], 1.8)
+        issues.extend(
+            _issue("validation", "high", note, "Fix the validation issue")
+            for note in post.validation_notes
+        )
+
+    return max(1.0, min(10.0, score)), issues
+
+
+def score_post(post: SocialMediaPost) -> PostScore:
+    features = post_features(post)
+    raw, issues = heuristic_score(post, features)
+    return PostScore(post.platform, raw, features, issues)
+
+
+class Calibration:
+    # Running sums for a least-squares fit llm_score ~ a + b * raw, so a new
+    # sample updates the fit in O(1) instead of re-reading the file.
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def add(self, raw: float, llm_score: float) -> None:
+        self.n += 1
+        self.sx += raw
+        self.sy += llm_score
+        self.sxx += raw * raw
+        self.sxy += raw * llm_score
+        self.syy += llm_score * llm_score
+
+    def fit(self) -> Optional[Tuple[float, float, float]]:
+        if self.n < MIN_CALIBRATION_SAMPLES:
+            return None
+        variance = self.n * self.sxx - self.sx * self.sx
+        if variance <= 0:
+            return None
+        b = (self.n * self.sxy - self.sx * self.sy) / variance
+        a = (self.sy - b * self.sx) / self.n
+        sse = (
+            self.syy
+            - 2 * a * self.sy
+            - 2 * b * self.sxy
+            + self.n * a * a
+            + 2 * a * b * self.sx
+            + b * b * self.sxx
+        )
+        return a, b, math.sqrt(max(sse, 0.0) / self.n)
+
+
+_lock = threading.Lock()
+_calibrations: Dict[str, Calibration] = {}
+_loaded = False
+_stats: Counter = Counter()
+
+
+def _load_calibrations() -> None:
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if not os.path.exists(SCORE_CALIBRATION_PATH):
+        return
+    with open(SCORE_CALIBRATION_PATH, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                sample = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            _calibrations.setdefault(sample["platform"], Calibration()).add(
+                sample["raw"], sample["llm_score"]
+            )
+
+
+def calibrated_score(score: PostScore) -> Optional[Tuple[float, float]]:
+    with _lock:
+        _load_calibrations()
+        calibration = _calibrations.get(score.platform)
+        fit = calibration.fit() if calibration else None
+    if fit is None:
+        return None
+    a, b, rmse = fit
+    return a + b * score.raw, rmse
+
+
+def record_review_score(score: PostScore, llm_score) -> None:
+    cassette = active_cassette()
+    if not isinstance(llm_score, (int, float)) or (cassette and cassette.replaying):
+        return
+    sample = {
+        "platform": score.platform,
+        "raw": round(score.raw, 3),
+        "llm_score": float(llm_score),
+        "features": {name: round(value, 3) for name, value in score.features.items()},
+        "recorded_at": time.time(),
+    }
+    with _lock:
+        _load_calibrations()
+        _calibrations.setdefault(score.platform, Calibration()).add(
+            sample["raw"], sample["llm_score"]
+        )
+        directory = os.path.dirname(SCORE_CALIBRATION_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(SCORE_CALIBRATION_PATH, "a", encoding="utf-8") as file:
+            file.write(json.dumps(sample) + "\n")
+
+
+def local_review(score: PostScore) -> Optional[dict]:
+    # Feedback in the LLM review's shape for posts the calibrated score
+    # places clearly above or below the review thresholds; None sends the
+    # post to the LLM. Under a cassette every review goes out so replays do
+    # not depend on the local calibration file.
+    gated = LOCAL_SCORE_GATE and active_cassette() is None
+    estimate = calibrated_score(score) if gated else None
+    if estimate is None:
+        with _lock:
+            _stats["uncalibrated"] += 1
+        return None
+
+    predicted, rmse = estimate
+    margin = CONFIDENCE_MARGIN * rmse
+    if predicted - margin >= SKIP_ABOVE_SCORE:
+        outcome = "skipped_high"
+    elif predicted + margin < SKIP_BELOW_SCORE:
+        outcome = "skipped_low"
+    else:
+        outcome = "sent_to_llm"
+    with _lock:
+        _stats[outcome] += 1
+    if outcome == "sent_to_llm":
+        return None
+
+    overall = round(max(1.0, min(10.0, predicted)), 1)
+    return {
+        "overall_score": overall,
+        "issues": score.issues if outcome == "skipped_low" else [],
+        "strengths": [],
+        "actionable_edits": [],
+        "improvement_priority": "high" if outcome == "skipped_low" else "low",
+        "needs_human_review": False,
+        "scored_locally": True,
+    }
+
+
+def scoring_report() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats)
+
+
+def print_scoring_report() -> None:
+    report = scoring_report()
+    skipped = report.get("skipped_high", 0) + report.get("skipped_low", 0)
+    if not skipped and not report.get("sent_to_llm"):
+        return
+
+    print(
+        f"🎯 Local scorer: {skipped} reviews skipped "
+        f"({report.get('skipped_high', 0)} clearly good, "
+        f"{report.get('skipped_low', 0)} clearly weak), "
+        f"{report.get('sent_to_llm', 0)} sent to the LLM"
+    )
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+
+def fingerprint(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    # Concurrent callers with the same key share one execution: the first
+    # becomes the leader, the rest wait on its future and get the same result
+    # or exception. Nothing is kept once the call settles, so this is not a
+    # cache; it only collapses duplicates that overlap in time. Sync threads
+    # and coroutines share the same in-flight table.
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.stats: Counter = Counter()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.stats["executed"] += 1
+            return future, True
+
+    def _settle(self, key: str, future: Future, result: Any, error: Any) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            self.stats["failed"] += 1
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, future, None, e)
+            raise
+        self._settle(key, future, result, None)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            import asyncio
+
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._settle(key, future, None, e)
+            raise
+        self._settle(key, future, result, None)
+        return result
+
+
+llm_flight = SingleFlight("llm")
+fetch_flight = SingleFlight("fetch")
+_flights: List[SingleFlight] = [llm_flight, fetch_flight]
+
+
+def singleflight_report() -> Dict[str, Dict[str, int]]:
+    return {flight.name: dict(flight.stats) for flight in _flights if flight.stats}
+
+
+def print_singleflight_report() -> None:
+    report = singleflight_report()
+    coalesced = {
+        name: stats for name, stats in report.items() if stats.get("coalesced")
+    }
+    if not coalesced:
+        return
+
+    print("🔀 Coalesced in-flight duplicates:")
+    print(
+        "\n".join(
+            f"  • {name}: {stats['coalesced']} joined {stats['executed']} executed calls"
+            for name, stats in sorted(coalesced.items())
+        )
+    )
@@ -0,0 +1,303 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# "jsonl" writes finished spans to TRACE_FILE_PATH (works offline), "otlp"
+# sends them to a collector at OTEL_EXPORTER_OTLP_ENDPOINT
+# (http://localhost:4318 by default); empty leaves tracing off.
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "")
+TRACE_FILE_PATH = os.getenv(
+    "TRACE_FILE_PATH", os.path.join(".post_automation", "traces.jsonl")
+)
+SERVICE_NAME = "post-automation"
+# Queue payload key carrying the W3C traceparent from enqueue to worker.
+TRACE_CONTEXT_KEY = "trace_context"
+
+_lock = threading.Lock()
+_exporter_name = TRACE_EXPORTER
+_provider = None
+_tracer = None
+
+
+class JsonLinesSpanExporter:
+    # Implements the SDK's SpanExporter interface without subclassing it, so
+    # this module imports without OpenTelemetry installed.
+
+    def __init__(self, path: str = TRACE_FILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = "".join(json.dumps(span_record(span)) + "\n" for span in spans)
+        try:
+            with self._lock:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(lines)
+        except OSError as e:
+            print(f"⚠️ Trace export to {self.path} failed: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def span_record(span) -> Dict[str, Any]:
+    parent = span.parent
+    return {
+        "trace_id": format(span.context.trace_id, "032x"),
+        "span_id": format(span.context.span_id, "016x"),
+        "parent_id": format(parent.span_id, "016x") if parent else None,
+        "name": span.name,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+        "pid": os.getpid(),
+    }
+
+
+def _make_exporter(name: str) -> Any:
+    if name == "jsonl":
+        return JsonLinesSpanExporter(TRACE_FILE_PATH)
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+
+def _get_tracer() -> Any:
+    global _exporter_name, _provider, _tracer
+    if not _exporter_name:
+        return None
+    if _tracer is not None:
+        return _tracer
+
+    with _lock:
+        if _tracer is None and _exporter_name:
+            try:
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                provider = TracerProvider(
+                    resource=Resource.create({"service.name": SERVICE_NAME})
+                )
+                provider.add_span_processor(
+                    BatchSpanProcessor(_make_exporter(_exporter_name))
+                )
+            except ImportError as e:
+                print(f"⚠️ Tracing disabled, OpenTelemetry is not installed: {e}")
+                _exporter_name = ""
+                return None
+            # Kept out of the global provider so worker processes forked
+            # after setup, and embedding apps with their own provider, are
+            # not affected.
+            _provider = provider
+            _tracer = provider.get_tracer(__name__)
+    return _tracer
+
+
+def enable_tracing(exporter: str) -> None:
+    global _exporter_name
+    _exporter_name = exporter
+    if _get_tracer() is None:
+        raise RuntimeError(
+            "Tracing needs opentelemetry-sdk: pip install opentelemetry-sdk "
+            "(and opentelemetry-exporter-otlp-proto-http for otlp)"
+        )
+    target = TRACE_FILE_PATH if exporter == "jsonl" else "the OTLP collector"
+    print(f"🧭 Tracing to {target}")
+
+
+def flush_traces() -> None:
+    # Worker processes leave through os._exit, which skips the provider's
+    # atexit flush; they call this after each job.
+    if _provider is not None:
+        _provider.force_flush()
+
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        key: value if isinstance(value, (bool, int, float, str)) else str(value)
+        for key, value in (attributes or {}).items()
+        if value is not None
+    }
+
+
+@contextmanager
+def span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    carrier: Optional[Dict[str, str]] = None,
+) -> Iterator[Any]:
+    # Yields the OpenTelemetry span, or None with tracing off. Spans nest
+    # through contextvars, so they follow asyncio tasks and LangGraph's
+    # executor threads; `carrier` continues a trace from another process.
+    tracer = _get_tracer()
+    if tracer is None:
+        yield None
+        return
+
+    context = None
+    if carrier:
+        from opentelemetry.propagate import extract
+
+        context = extract(carrier)
+    with tracer.start_as_current_span(
+        name, context=context, attributes=_clean(attributes)
+    ) as current:
+        yield current
+
+
+def annotate(attributes: Dict[str, Any]) -> None:
+    # Adds attributes to whatever span is current, e.g. hedging details
+    # from deep inside an LLM call.
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def inject_context() -> Dict[str, str]:
+    carrier: Dict[str, str] = {}
+    if _get_tracer() is not None:
+        from opentelemetry.propagate import inject
+
+        inject(carrier)
+    return carrier
+
+
+def current_trace_id() -> Optional[str]:
+    if _tracer is None:
+        return None
+    from opentelemetry import trace
+
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+def _mark_failed(current: Any, result: Any) -> None:
+    # Nodes catch their own exceptions and report through state["error"].
+    if current is None or not isinstance(result, dict) or not result.get("error"):
+        return
+    from opentelemetry.trace import Status, StatusCode
+
+    current.set_attribute("graph.error", str(result["error"]))
+    current.set_status(Status(StatusCode.ERROR, str(result["error"])))
+
+
+def traced_node(name: str, node: Callable) -> Callable:
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def atraced(state, *args, **kwargs):
+            with span(f"node {name}", {"graph.node": name}) as current:
+                result = await node(state, *args, **kwargs)
+                _mark_failed(current, result)
+                return result
+
+        return atraced
+
+    @functools.wraps(node)
+    def traced(state, *args, **kwargs):
+        with span(f"node {name}", {"graph.node": name}) as current:
+            result = node(state, *args, **kwargs)
+            _mark_failed(current, result)
+            return result
+
+    return traced
+
+
+def load_trace(
+    path: str = TRACE_FILE_PATH, trace_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    # All spans of one trace; the most recently finished run by default.
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    last_root = None
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            traces[record["trace_id"]].append(record)
+            if record["parent_id"] is None:
+                last_root = record["trace_id"]
+    return traces.get(trace_id or last_root, [])
+
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any]]]:
+    # Walks back from each span's end: the child that finished last is what
+    # the parent waited on, then the child that finished before that one
+    # started, and so on. Returns (depth, span) in start order.
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    ids = {record["span_id"] for record in spans}
+    for record in spans:
+        parent = record["parent_id"] if record["parent_id"] in ids else None
+        children[parent].append(record)
+
+    path: List[Tuple[int, Dict[str, Any]]] = []
+
+    def walk(record: Dict[str, Any], depth: int) -> None:
+        path.append((depth, record))
+        chain = []
+        # A queued job outlives the enqueue span that parents it, so the
+        # walk starts from whichever finished last.
+        kids = sorted(children[record["span_id"]], key=lambda r: r["end_ns"])
+        cursor = max([record["end_ns"]] + [kid["end_ns"] for kid in kids])
+        for child in reversed(kids):
+            if child["end_ns"] <= cursor:
+                chain.append(child)
+                cursor = child["start_ns"]
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda r: r["start_ns"]):
+        walk(root, 0)
+    return path
+
+
+def print_critical_path(spans: List[Dict[str, Any]]) -> None:
+    if not spans:
+        print("⚠️ No spans found")
+        return
+
+    print(f"🧭 Critical path of trace {spans[0]['trace_id']}:")
+    for depth, record in critical_path(spans):
+        attributes = record["attributes"]
+        details = ", ".join(
+            f"{key}={attributes[key]}"
+            for key in ("llm.model", "llm.output_tokens", "llm.hedged", "http.url")
+            if key in attributes
+        )
+        status = " ❌" if record["status"] == "ERROR" else ""
+        print(
+            f"  {'  ' * depth}{record['name']}: {record['duration_ms'] / 1000:.2f}s"
+            f"{status}{f' ({details})' if details else ''}"
+        )
+
+
+if __name__ == "__main__":
+    trace_path = sys.argv[1] if len(sys.argv) > 1 else TRACE_FILE_PATH
+    trace_id = sys.argv[2] if len(sys.argv) > 2 else None
+    print_critical_path(load_trace(trace_path, trace_id))
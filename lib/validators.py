@@ -0,0 +1,71 @@
+from typing import List
+
+from .utils import SocialMediaPost
+from .x_thread import MAX_TWEET_WEIGHT, weighted_length
+
+LINKEDIN_MIN_CHARS = 1000
+LINKEDIN_MAX_CHARS = 1200
+BANNED_TEAM_PRONOUNS = [" we ", " our ", " us ", " the team "]
+BANNED_ROLE_PHRASES = [
+    "i'm a dev",
+    "i am a dev",
+    "to grow my network",
+    "to increase my network",
+]
+
+
+def linkedin_issues(post: SocialMediaPost, blog_url: str) -> List[str]:
+    issues = []
+    content = post.content.lower()
+
+    if post.post_type == "Monday Teaser":
+        if not (LINKEDIN_MIN_CHARS <= post.char_count <= LINKEDIN_MAX_CHARS):
+            issues.append(
+                f"LinkedIn Monday post length issue: {post.char_count} chars (should be {LINKEDIN_MIN_CHARS}-{LINKEDIN_MAX_CHARS})"
+            )
+        if blog_url and blog_url.lower() in content:
+            issues.append("LinkedIn Monday teaser contains link (should not have links)")
+
+    elif post.post_type == "Thursday Blog Reference":
+        if not (LINKEDIN_MIN_CHARS <= post.char_count <= LINKEDIN_MAX_CHARS):
+            issues.append(
+                f"LinkedIn Thursday post length issue: {post.char_count} chars (should be {LINKEDIN_MIN_CHARS}-{LINKEDIN_MAX_CHARS})"
+            )
+        if blog_url.lower() not in content:
+            issues.append("LinkedIn Thursday post missing blog URL")
+
+    return issues
+
+
+def x_thread_issues(post: SocialMediaPost) -> List[str]:
+    issues = []
+    thread_lines = [line.strip() for line in post.content.split("\n") if line.strip()]
+    for line_num, line in enumerate(thread_lines, 1):
+        line_weight = weighted_length(line)
+        if line_weight > MAX_TWEET_WEIGHT:
+            issues.append(
+                f"X thread line {line_num} too long: {line_weight} weighted chars (max {MAX_TWEET_WEIGHT})"
+            )
+    return issues
+
+
+def voice_issues(post: SocialMediaPost) -> List[str]:
+    issues = []
+    lower = f" {post.content.lower()} "
+    if any(p in lower for p in BANNED_TEAM_PRONOUNS):
+        issues.append("Team-voice pronouns detected (use individual practitioner voice)")
+    if any(phrase in lower for phrase in BANNED_ROLE_PHRASES):
+        issues.append(
+            "Explicit role/motive statement detected (omit explicit self-description/motives)"
+        )
+    return issues
+
+
+def local_post_issues(post: SocialMediaPost, blog_url: str = "") -> List[str]:
+    if post.platform == "LinkedIn":
+        issues = linkedin_issues(post, blog_url)
+    elif post.platform == "X":
+        issues = x_thread_issues(post)
+    else:
+        issues = []
+    return issues + voice_issues(post)
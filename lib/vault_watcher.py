@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .feed_watcher import _read_json, _write_json
+from .obsidian import clean_obsidian_text
+from .work_queue import DEFAULT_QUEUE_PATH, enqueue_job
+
+VAULT_STATE_PATH = os.getenv(
+    "VAULT_STATE_PATH", os.path.join(".post_automation", "vault_state.json")
+)
+# A save burst (editor autosave, sync clients rewriting files) settles for
+# this long before the touched files are parsed.
+DEBOUNCE_SECONDS = 2.0
+# Share of the idea's keywords a section from another note must mention to
+# count as related material.
+KEYWORD_OVERLAP_THRESHOLD = 0.2
+MIN_KEYWORD_LENGTH = 4
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*$", re.MULTILINE)
+_WIKILINK_RE = re.compile(r"\[\[([^\]|#]+)")
+_STOPWORDS = {
+    "about",
+    "across",
+    "after",
+    "also",
+    "from",
+    "have",
+    "into",
+    "more",
+    "perhaps",
+    "that",
+    "their",
+    "there",
+    "these",
+    "this",
+    "what",
+    "when",
+    "where",
+    "which",
+    "with",
+    "works",
+}
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    # Heading -> section text; anything before the first heading is "".
+    sections: Dict[str, str] = {}
+    headings = list(_HEADING_RE.finditer(text))
+    starts = [(match.start(), match.group(1)) for match in headings]
+    bounds = [(0, "")] + starts
+    for index, (start, heading) in enumerate(bounds):
+        end = bounds[index + 1][0] if index + 1 < len(bounds) else len(text)
+        body = text[start:end].strip()
+        if not body:
+            continue
+        key, suffix = heading, 2
+        while key in sections:
+            key, suffix = f"{heading} ({suffix})", suffix + 1
+        sections[key] = body
+    return sections
+
+
+def section_hash(text: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def idea_keywords(idea_text: str) -> Set[str]:
+    words = re.findall(r"[a-z0-9]+", idea_text.lower())
+    return {
+        word
+        for word in words
+        if len(word) >= MIN_KEYWORD_LENGTH and word not in _STOPWORDS
+    }
+
+
+def is_related(section: str, keywords: Set[str], note_name: str) -> bool:
+    links = {link.strip().lower() for link in _WIKILINK_RE.findall(section)}
+    if note_name.lower() in links:
+        return True
+    if not keywords:
+        return False
+    mentioned = keywords & set(re.findall(r"[a-z0-9]+", section.lower()))
+    return len(mentioned) / len(keywords) >= KEYWORD_OVERLAP_THRESHOLD
+
+
+def _is_note(path: str) -> bool:
+    # Skips .obsidian/, .trash/ and editor swap files.
+    parts = os.path.normpath(path).split(os.sep)
+    return path.endswith(".md") and not any(part.startswith(".") for part in parts)
+
+
+class VaultWatcher:
+    def __init__(
+        self,
+        vault_dir: str,
+        idea_text: str,
+        notes_path: str,
+        phase: str = "draft",
+        db_path: str = DEFAULT_QUEUE_PATH,
+        state_path: str = VAULT_STATE_PATH,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+    ):
+        self.vault_dir = os.path.abspath(vault_dir)
+        self.idea_text = idea_text
+        self.notes_path = os.path.abspath(notes_path)
+        self.note_name = os.path.splitext(os.path.basename(notes_path))[0]
+        self.phase = phase
+        self.db_path = db_path
+        self.state_path = state_path
+        self.debounce_seconds = debounce_seconds
+        self.keywords = idea_keywords(idea_text)
+        # path -> {"mtime", "sections": {heading: hash}, "related": {heading: text}}
+        self.state: Dict[str, Any] = _read_json(state_path, {"files": {}})
+        self._touched: Set[str] = set()
+        self._last_event = 0.0
+        self._changed = threading.Condition()
+
+    def touch(self, path: str) -> None:
+        path = os.path.abspath(path)
+        if not _is_note(os.path.relpath(path, self.vault_dir)):
+            return
+        with self._changed:
+            self._touched.add(path)
+            self._last_event = time.monotonic()
+            self._changed.notify()
+
+    def wait_for_batch(self) -> Set[str]:
+        # Blocks on the condition rather than polling, so an idle vault costs
+        # no CPU; returns once no save has arrived for debounce_seconds.
+        with self._changed:
+            while not self._touched:
+                self._changed.wait()
+            while True:
+                remaining = self._last_event + self.debounce_seconds - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            batch, self._touched = self._touched, set()
+            return batch
+
+    def _reparse(self, path: str) -> List[Tuple[str, str]]:
+        # Re-reads one note and returns the (heading, text) sections whose
+        # hash changed; a deleted section comes back with empty text.
+        files = self.state["files"]
+        previous = files.get(path, {"sections": {}, "related": {}})
+        if not os.path.exists(path):
+            files.pop(path, None)
+            return [(heading, "") for heading in previous["sections"]]
+
+        with open(path, "r", encoding="utf-8") as file:
+            sections = split_sections(file.read())
+        hashes = {heading: section_hash(text) for heading, text in sections.items()}
+        changed = [
+            (heading, text)
+            for heading, text in sections.items()
+            if previous["sections"].get(heading) != hashes[heading]
+        ] + [(heading, "") for heading in previous["sections"] if heading not in hashes]
+
+        related = {}
+        if path != self.notes_path:
+            related = {
+                heading: clean_obsidian_text(text)
+                for heading, text in sections.items()
+                if is_related(text, self.keywords, self.note_name)
+            }
+        files[path] = {
+            "mtime": os.path.getmtime(path),
+            "sections": hashes,
+            "related": related,
+        }
+        return changed
+
+    def relevant_changes(self, paths: Set[str]) -> List[str]:
+        changes = []
+        for path in sorted(paths):
+            was_related = set(self.state["files"].get(path, {}).get("related", {}))
+            for heading, text in self._reparse(path):
+                # Every edit to the idea's own note matters; elsewhere only
+                # sections that are, or just stopped being, related do.
+                if (
+                    path == self.notes_path
+                    or heading in was_related
+                    or (text and is_related(text, self.keywords, self.note_name))
+                ):
+                    label = heading or "(top)"
+                    changes.append(f"{os.path.relpath(path, self.vault_dir)}#{label}")
+        _write_json(self.state_path, self.state)
+        return changes
+
+    def obsidian_notes(self) -> str:
+        notes = ""
+        if os.path.exists(self.notes_path):
+            with open(self.notes_path, "r", encoding="utf-8") as file:
+                notes = clean_obsidian_text(file.read())
+        related = [
+            text
+            for path, entry in sorted(self.state["files"].items())
+            for text in entry.get("related", {}).values()
+        ]
+        if related:
+            notes = f"{notes}\n\nRelated notes:\n" + "\n\n".join(related)
+        return notes
+
+    def process(self, paths: Set[str]) -> Optional[str]:
+        changes = self.relevant_changes(paths)
+        if not changes:
+            print(f"💤 {len(paths)} notes changed, none relevant to the pending idea")
+            return None
+
+        print(f"📝 Relevant note changes: {', '.join(changes[:5])}")
+        job_id = enqueue_job(
+            {
+                "idea_text": self.idea_text,
+                "obsidian_notes": self.obsidian_notes(),
+                "blog_url": "",
+                "phase": self.phase,
+            },
+            db_path=self.db_path,
+        )
+        print(f"📥 Enqueued {self.phase} regeneration → job {job_id}")
+        return job_id
+
+    def scan(self) -> Optional[str]:
+        # Catches up on edits made while the watcher was down. The first run
+        # only seeds the section hashes, like the feed watcher's first poll.
+        first_run = not self.state["files"]
+        stale = set()
+        for root, dirs, files in os.walk(self.vault_dir):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            for name in files:
+                path = os.path.join(root, name)
+                if not _is_note(os.path.relpath(path, self.vault_dir)):
+                    continue
+                known = self.state["files"].get(path)
+                if not known or known["mtime"] != os.path.getmtime(path):
+                    stale.add(path)
+        stale |= {path for path in self.state["files"] if not os.path.exists(path)}
+
+        if first_run:
+            self.relevant_changes(stale)
+            print(f"🗂️ Seeded vault state with {len(stale)} notes")
+            return None
+        return self.process(stale) if stale else None
+
+
+def watch_vault(
+    vault_dir: str,
+    idea_text: str,
+    notes_path: str,
+    phase: str = "draft",
+    db_path: str = DEFAULT_QUEUE_PATH,
+    state_path: str = VAULT_STATE_PATH,
+    debounce_seconds: float = DEBOUNCE_SECONDS,
+) -> None:
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        raise RuntimeError("Vault watch mode needs watchdog: pip install watchdog")
+
+    watcher = VaultWatcher(
+        vault_dir, idea_text, notes_path, phase, db_path, state_path, debounce_seconds
+    )
+
+    class NoteEvents(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory or event.event_type not in (
+                "created",
+                "modified",
+                "moved",
+                "deleted",
+            ):
+                return
+            watcher.touch(event.src_path)
+            if getattr(event, "dest_path", None):
+                watcher.touch(event.dest_path)
+
+    watcher.scan()
+    observer = Observer()
+    observer.schedule(NoteEvents(), watcher.vault_dir, recursive=True)
+    observer.start()
+    print(f"👀 Watching {watcher.vault_dir} for changes to '{watcher.note_name}'")
+    try:
+        while True:
+            try:
+                watcher.process(watcher.wait_for_batch())
+            except Exception as e:
+                print(f"⚠️ Vault change processing failed: {e}")
+    finally:
+        observer.stop()
+        observer.join()
@@ -0,0 +1,361 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, is_dataclass
+from multiprocessing import Process
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .blobs import is_blob_ref, load_text
+from .tracing import TRACE_CONTEXT_KEY, flush_traces, inject_context, span
+
+DEFAULT_QUEUE_PATH = os.getenv("WORK_QUEUE_DB", "post_automation_queue.sqlite")
+
+# A worker renews its lease every HEARTBEAT_SECONDS; a lease that has not been
+# renewed for LEASE_SECONDS belongs to a crashed or partitioned worker and the
+# job goes back to the queue on the next claim.
+LEASE_SECONDS = 120.0
+HEARTBEAT_SECONDS = 30.0
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, created_at);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # Rollback journal (not WAL) so the file can live on a share mounted by
+    # several machines; WAL needs shared memory and only works on one host.
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def serialize_state(state: Any) -> Any:
+    # Results leave the worker's host, so blob references are inlined.
+    if is_blob_ref(state):
+        return load_text(state)
+    if is_dataclass(state) and not isinstance(state, type):
+        return asdict(state)
+    if isinstance(state, dict):
+        return {key: serialize_state(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [serialize_state(value) for value in state]
+    return state
+
+
+def enqueue_job(payload: Dict[str, Any], db_path: str = DEFAULT_QUEUE_PATH) -> str:
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with span("queue enqueue", {"queue.job_id": job_id}):
+        # The worker continues this trace, so a job's run shows up under
+        # whatever enqueued it (a CLI call, the feed or vault watcher).
+        carrier = inject_context()
+        if carrier:
+            payload = {**payload, TRACE_CONTEXT_KEY: carrier}
+        conn = _connect(db_path)
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, payload, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(payload), now, now),
+            )
+        finally:
+            conn.close()
+    return job_id
+
+
+def requeue_expired_leases(
+    conn: sqlite3.Connection, now: Optional[float] = None
+) -> int:
+    now = now or time.time()
+    exhausted = conn.execute(
+        """
+        UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_expires = NULL,
+            error = 'Lease expired after maximum attempts', updated_at = ?
+        WHERE status = 'running' AND lease_expires < ? AND attempts >= ?
+        """,
+        (now, now, MAX_ATTEMPTS),
+    ).rowcount
+    requeued = conn.execute(
+        """
+        UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires = NULL,
+            updated_at = ?
+        WHERE status = 'running' AND lease_expires < ?
+        """,
+        (now, now),
+    ).rowcount
+    if exhausted or requeued:
+        print(f"🔄 Requeued {requeued} expired jobs, failed {exhausted}")
+    return requeued
+
+
+def claim_job(
+    worker_id: str,
+    db_path: str = DEFAULT_QUEUE_PATH,
+    lease_seconds: float = LEASE_SECONDS,
+) -> Optional[Job]:
+    conn = _connect(db_path)
+    try:
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can
+        # never select the same queued row.
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        requeue_expired_leases(conn, now)
+        row = conn.execute(
+            "SELECT id, payload, attempts FROM jobs WHERE status = 'queued' "
+            "ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        job_id, payload, attempts = row
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?,
+                attempts = attempts + 1, updated_at = ?
+            WHERE id = ?
+            """,
+            (worker_id, now + lease_seconds, now, job_id),
+        )
+        conn.execute("COMMIT")
+        return Job(id=job_id, payload=json.loads(payload), attempts=attempts + 1)
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def heartbeat(
+    job_id: str,
+    worker_id: str,
+    db_path: str = DEFAULT_QUEUE_PATH,
+    lease_seconds: float = LEASE_SECONDS,
+) -> bool:
+    now = time.time()
+    conn = _connect(db_path)
+    try:
+        updated = conn.execute(
+            """
+            UPDATE jobs SET lease_expires = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (now + lease_seconds, now, job_id, worker_id),
+        ).rowcount
+    finally:
+        conn.close()
+    return updated == 1
+
+
+def complete_job(
+    job_id: str,
+    worker_id: str,
+    result: Dict[str, Any],
+    db_path: str = DEFAULT_QUEUE_PATH,
+) -> bool:
+    conn = _connect(db_path)
+    try:
+        # Guarded by lease_owner: a worker whose lease was taken over must not
+        # overwrite the result of the worker that now owns the job.
+        updated = conn.execute(
+            """
+            UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL,
+                lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (json.dumps(serialize_state(result)), time.time(), job_id, worker_id),
+        ).rowcount
+    finally:
+        conn.close()
+    return updated == 1
+
+
+def fail_job(
+    job_id: str,
+    worker_id: str,
+    error: str,
+    db_path: str = DEFAULT_QUEUE_PATH,
+) -> bool:
+    conn = _connect(db_path)
+    try:
+        updated = conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (MAX_ATTEMPTS, error, time.time(), job_id, worker_id),
+        ).rowcount
+    finally:
+        conn.close()
+    return updated == 1
+
+
+def get_job(job_id: str, db_path: str = DEFAULT_QUEUE_PATH) -> Optional[Dict[str, Any]]:
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT id, status, attempts, result, error FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {
+        "id": row[0],
+        "status": row[1],
+        "attempts": row[2],
+        "result": json.loads(row[3]) if row[3] else None,
+        "error": row[4],
+    }
+
+
+def completed_results(
+    db_path: str = DEFAULT_QUEUE_PATH,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    # (job id, final state) of every finished job, oldest first.
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, result FROM jobs WHERE status = 'done' ORDER BY created_at"
+        )
+        for job_id, result in rows:
+            if result:
+                yield job_id, json.loads(result)
+    finally:
+        conn.close()
+
+
+def queue_stats(db_path: str = DEFAULT_QUEUE_PATH) -> Dict[str, int]:
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {status: count for status, count in rows}
+
+
+def _keep_lease_alive(
+    job_id: str, worker_id: str, db_path: str, stop: threading.Event
+) -> None:
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try:
+            if not heartbeat(job_id, worker_id, db_path):
+                print(f"⚠️ Lost lease on job {job_id}")
+                return
+        except sqlite3.Error as e:
+            print(f"⚠️ Heartbeat failed for job {job_id}: {e}")
+
+
+def run_worker(
+    db_path: str = DEFAULT_QUEUE_PATH,
+    worker_id: Optional[str] = None,
+    stop_when_empty: bool = False,
+) -> int:
+    from .workflow import run_automation
+
+    worker_id = worker_id or make_worker_id()
+    processed = 0
+    print(f"👷 Worker {worker_id} polling {db_path}")
+
+    while True:
+        job = claim_job(worker_id, db_path)
+        if job is None:
+            if stop_when_empty and not queue_stats(db_path).get("running"):
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+
+        print(f"📥 Worker {worker_id} claimed job {job.id} (attempt {job.attempts})")
+        stop = threading.Event()
+        keeper = threading.Thread(
+            target=_keep_lease_alive,
+            args=(job.id, worker_id, db_path, stop),
+            daemon=True,
+        )
+        keeper.start()
+        carrier = job.payload.pop(TRACE_CONTEXT_KEY, None)
+        try:
+            with span(
+                "queue job",
+                {
+                    "queue.job_id": job.id,
+                    "queue.attempt": job.attempts,
+                    "queue.worker_id": worker_id,
+                },
+                carrier=carrier,
+            ):
+                final_state = run_automation(**job.payload)
+            # run_automation reports node failures in the state rather than
+            # raising; such a run is retried like a crash, not marked done.
+            if final_state.get("error"):
+                raise RuntimeError(final_state["error"])
+            if complete_job(job.id, worker_id, final_state, db_path):
+                print(f"✅ Job {job.id} done")
+            else:
+                print(f"⚠️ Job {job.id} finished after its lease was reassigned")
+        except Exception as e:
+            error_msg = f"Job {job.id} failed: {str(e)}"
+            print(f"❌ {error_msg}")
+            fail_job(job.id, worker_id, error_msg, db_path)
+        finally:
+            stop.set()
+            keeper.join()
+            flush_traces()
+        processed += 1
+
+    print(f"👷 Worker {worker_id} exiting after {processed} jobs")
+    return processed
+
+
+def run_worker_pool(
+    num_workers: int,
+    db_path: str = DEFAULT_QUEUE_PATH,
+    stop_when_empty: bool = False,
+) -> None:
+    workers: List[Process] = [
+        Process(
+            target=run_worker,
+            kwargs={"db_path": db_path, "stop_when_empty": stop_when_empty},
+        )
+        for _ in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"🚀 Started {num_workers} workers on {db_path}")
+    for worker in workers:
+        worker.join()
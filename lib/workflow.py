@@ -1,29 +1,89 @@
+import asyncio
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
+
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
 from .utils import (
     AutomationState,
     scrape_blog_content,
+    ascrape_blog_content,
     generate_blog_summary,
+    agenerate_blog_summary,
     capture_idea,
     planner_agent,
     teaser_generator,
+    ateaser_generator,
     blog_drafter,
+    ablog_drafter,
     self_evaluator,
     recovery_agent,
+    flag_human_review,
+    refresh_human_review,
 )
+from .archive import archive_approved_posts
+from .blobs import load_text, store_text
+from .cassette import Cassette, use_cassette
+from .deadlines import has_time_for, make_deadline, use_deadline
+from .feed_watcher import record_pending_draft
+from .models import print_model_report, register_context_caches
 from .obsidian import process_obsidian_content
+from .post_pipeline import (
+    PostState,
+    aimprove_single_post,
+    areview_single_post,
+    avalidate_post,
+    improve_single_post,
+    make_post_state,
+    post_result,
+    review_single_post,
+    validate_post,
+)
+from .profiling import Profiler
+from .prompt_cache import print_semantic_cache_report
+from .scoring import print_scoring_report
+from .prompts import template_prefixes
+from .singleflight import print_singleflight_report
+from .tracing import annotate, current_trace_id, span, traced_node
 from .social_media import (
     generate_linkedin_posts,
+    agenerate_linkedin_posts,
     generate_x_posts,
+    agenerate_x_posts,
     validate_posts,
+    avalidate_posts,
     peer_review_agent,
+    apeer_review_agent,
     content_improver_agent,
+    acontent_improver_agent,
 )
 
+MAX_IMPROVEMENT_ITERATIONS = 3
+SKIPPED_STAGE_REASONS = {
+    "review": "Peer review skipped to meet the run deadline",
+    "improvement": "Improvement skipped to meet the run deadline",
+    "revalidation": "Revalidation of improved posts skipped to meet the run deadline",
+}
+
+
+def skip_for_deadline(stage: str) -> Callable:
+    # Stands in for an optional stage the remaining run time cannot cover:
+    # the posts go out as they are, flagged for a human to check.
+    def skip_stage(state: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"⏱️ Skipping {stage}: run deadline is close")
+        flag_human_review(state, SKIPPED_STAGE_REASONS[stage], "deadline_skips")
+        return state
+
+    return skip_stage
+
 
 def should_generate_teaser(state: AutomationState) -> str:
     if not state["blog_url"] and state["phase"] == "teaser":
         return "teaser_generator"
+    elif not state["blog_url"] and state["phase"] == "draft":
+        return "blog_drafter"
     elif state["blog_url"] and state["phase"] == "final":
         return "scraper"
     return "planner_agent"
@@ -55,7 +115,7 @@ def should_improve_or_evaluate(state: AutomationState) -> str:
     if state.get("error"):
         return "recovery_agent"
 
-    max_iterations = 3
+    max_iterations = MAX_IMPROVEMENT_ITERATIONS
     current_iteration = state.get("improvement_iteration_count", 0)
 
     if current_iteration >= max_iterations:
@@ -65,6 +125,8 @@ def should_improve_or_evaluate(state: AutomationState) -> str:
         return "self_evaluator"
 
     if state.get("validation_issues"):
+        if not has_time_for("peer_review", state.get("deadline")):
+            return "skip_review"
         return "peer_reviewer"
     return "self_evaluator"
 
@@ -74,7 +136,7 @@ def should_improve_or_end(state: AutomationState) -> str:
         return "recovery_agent"
 
     # Check if we've exceeded the maximum improvement iterations
-    max_iterations = 3
+    max_iterations = MAX_IMPROVEMENT_ITERATIONS
     current_iteration = state.get("improvement_iteration_count", 0)
 
     if current_iteration >= max_iterations:
@@ -88,6 +150,8 @@ def should_improve_or_end(state: AutomationState) -> str:
         feedback.get("improvement_priority") in ["medium", "high"]
         for feedback in peer_feedback.values()
     )
+    if needs_improvement and not has_time_for("improvement", state.get("deadline")):
+        return "skip_improvement"
     if needs_improvement:
         # Increment the iteration count before proceeding to content_improver
         state["improvement_iteration_count"] = current_iteration + 1
@@ -107,23 +171,231 @@ def should_loop_or_end(state: AutomationState) -> str:
     return "END"
 
 
-def create_workflow():
+def fan_out_posts(state: AutomationState) -> Union[str, List[Send]]:
+    if state.get("error"):
+        return "recovery_agent"
+
+    posts = state.get("linkedin_posts", []) + state.get("x_posts", [])
+    if not posts:
+        return "END"
+
+    return [
+        Send(
+            "post_pipeline",
+            make_post_state(
+                index,
+                post,
+                state["blog_url"],
+                state["blog_summary"],
+                state.get("deadline"),
+            ),
+        )
+        for index, post in enumerate(posts)
+    ]
+
+
+def should_review_post(state: PostState) -> str:
+    if state.get("error"):
+        return "END"
+    if state.get("validation_issues"):
+        if not has_time_for("peer_review", state.get("deadline")):
+            return "skip_review"
+        return "review_post"
+    return "END"
+
+
+def should_improve_single_post(state: PostState) -> str:
+    if state.get("error"):
+        return "END"
+
+    if state["improvement_iteration_count"] >= MAX_IMPROVEMENT_ITERATIONS:
+        post = state["post"]
+        print(
+            f"⚠️ Maximum improvement iterations ({MAX_IMPROVEMENT_ITERATIONS}) reached for {post.platform} {post.post_type}"
+        )
+        return "END"
+
+    feedback = state.get("peer_review_feedback", {})
+    if feedback.get("improvement_priority") in ["medium", "high"]:
+        if not has_time_for("improvement", state.get("deadline")):
+            return "skip_improvement"
+        return "improve_post"
+    return "END"
+
+
+def should_revalidate_post(state: PostState) -> str:
+    if state.get("error") or not state.get("post_changed"):
+        return "END"
+    if not has_time_for("revalidation", state.get("deadline")):
+        return "skip_revalidation"
+    return "validate_post"
+
+
+def create_post_pipeline(asynchronous: bool = False):
+    pipeline = StateGraph(PostState)
+
+    if asynchronous:
+        nodes = {
+            "validate_post": avalidate_post,
+            "review_post": areview_single_post,
+            "improve_post": aimprove_single_post,
+        }
+    else:
+        nodes = {
+            "validate_post": validate_post,
+            "review_post": review_single_post,
+            "improve_post": improve_single_post,
+        }
+    for stage in SKIPPED_STAGE_REASONS:
+        nodes[f"skip_{stage}"] = skip_for_deadline(stage)
+    for name, node in nodes.items():
+        pipeline.add_node(name, traced_node(name, node))
+    for stage in SKIPPED_STAGE_REASONS:
+        pipeline.add_edge(f"skip_{stage}", END)
+
+    pipeline.set_entry_point("validate_post")
+
+    pipeline.add_conditional_edges(
+        "validate_post",
+        should_review_post,
+        {"review_post": "review_post", "skip_review": "skip_review", "END": END},
+    )
+    pipeline.add_conditional_edges(
+        "review_post",
+        should_improve_single_post,
+        {
+            "improve_post": "improve_post",
+            "skip_improvement": "skip_improvement",
+            "END": END,
+        },
+    )
+    pipeline.add_conditional_edges(
+        "improve_post",
+        should_revalidate_post,
+        {
+            "validate_post": "validate_post",
+            "skip_revalidation": "skip_revalidation",
+            "END": END,
+        },
+    )
+
+    return pipeline.compile()
+
+
+def annotate_post(state: PostState) -> None:
+    post = state["post"]
+    annotate(
+        {
+            "post.index": state["post_index"],
+            "post.platform": post.platform,
+            "post.type": post.post_type,
+        }
+    )
+
+
+def make_post_pipeline_node(pipeline, asynchronous: bool = False):
+    def run_post_pipeline(state: PostState) -> Dict[str, Any]:
+        annotate_post(state)
+        final_state = pipeline.invoke(state)
+        return {"post_results": [post_result(final_state)]}
+
+    async def arun_post_pipeline(state: PostState) -> Dict[str, Any]:
+        annotate_post(state)
+        final_state = await pipeline.ainvoke(state)
+        return {"post_results": [post_result(final_state)]}
+
+    return arun_post_pipeline if asynchronous else run_post_pipeline
+
+
+def collect_posts(state: AutomationState) -> Dict[str, Any]:
+    # Only the merged keys are returned; post_results has a reducer and the
+    # per-post branches have already written it.
+    results = state.get("post_results", [])
+    linkedin_count = len(state.get("linkedin_posts", []))
+
+    validation_issues = []
+    fact_check_reports = []
+    peer_review_feedback = {}
+    improvement_summary = []
+    review = {
+        "deadline_skips": list(state.get("deadline_skips") or []),
+        "review_flags": [],
+        "run_flags": list(state.get("run_flags") or []),
+    }
+    error = None
+    for result in results:
+        validation_issues.extend(result["validation_issues"])
+        if result["fact_check_report"]:
+            fact_check_reports.append(load_text(result["fact_check_report"]))
+        if result["peer_review_feedback"]:
+            peer_review_feedback[result["post_id"]] = result["peer_review_feedback"]
+        improvement_summary.extend(result["improvement_summary"])
+        review["deadline_skips"].extend(result["deadline_skips"])
+        review["review_flags"].extend(result["review_flags"])
+        if result["error"] and not error:
+            error = result["error"]
+
+    refresh_human_review(review)
+
+    improved_posts = [result["post"] for result in results]
+    improved_count = len([p for p in improved_posts if p.is_improved_version])
+    print(
+        f"✅ Per-post pipelines complete. {len(results)} posts, {improved_count} improved."
+    )
+
+    return {
+        "improved_linkedin_posts": improved_posts[:linkedin_count],
+        "improved_x_posts": improved_posts[linkedin_count:],
+        "validation_issues": validation_issues,
+        "fact_check_report": (
+            store_text("\n\n".join(fact_check_reports)) if fact_check_reports else ""
+        ),
+        "peer_review_feedback": peer_review_feedback,
+        "improvement_summary": improvement_summary,
+        "requires_human_review": review["requires_human_review"],
+        "human_review_reason": review["human_review_reason"],
+        "deadline_skips": list(dict.fromkeys(review["deadline_skips"])),
+        "review_flags": list(dict.fromkeys(review["review_flags"])),
+        "improvement_iteration_count": max(
+            (r["improvement_iteration_count"] for r in results), default=0
+        ),
+        "error": error,
+    }
+
+
+def should_evaluate_or_recover(state: AutomationState) -> str:
+    if state.get("error"):
+        return "recovery_agent"
+    return "self_evaluator"
+
+
+def create_workflow(
+    pipelined: bool = True,
+    profiler: Optional[Profiler] = None,
+    asynchronous: bool = False,
+):
     workflow = StateGraph(AutomationState)
 
-    workflow.add_node("capture_idea", capture_idea)
-    workflow.add_node("obsidian_research", process_obsidian_content)
-    workflow.add_node("planner_agent", planner_agent)
-    workflow.add_node("teaser_generator", teaser_generator)
-    workflow.add_node("blog_drafter", blog_drafter)
-    workflow.add_node("scraper", scrape_blog_content)
-    workflow.add_node("summarizer", generate_blog_summary)
-    workflow.add_node("final_post_generator", generate_linkedin_posts)
-    workflow.add_node("x_generator", generate_x_posts)
-    workflow.add_node("validator", validate_posts)
-    workflow.add_node("peer_reviewer", peer_review_agent)
-    workflow.add_node("content_improver", content_improver_agent)
-    workflow.add_node("self_evaluator", self_evaluator)
-    workflow.add_node("recovery_agent", recovery_agent)
+    # Nodes without an async variant are quick and CPU-only; LangGraph runs
+    # them on its executor when the graph is driven with ainvoke.
+    def add_node(name: str, node: Callable, async_node: Optional[Callable] = None):
+        if asynchronous and async_node:
+            workflow.add_node(name, traced_node(name, async_node))
+        else:
+            node = profiler.wrap(name, node) if profiler else node
+            workflow.add_node(name, traced_node(name, node))
+
+    add_node("capture_idea", capture_idea)
+    add_node("obsidian_research", process_obsidian_content)
+    add_node("planner_agent", planner_agent)
+    add_node("teaser_generator", teaser_generator, ateaser_generator)
+    add_node("blog_drafter", blog_drafter, ablog_drafter)
+    add_node("scraper", scrape_blog_content, ascrape_blog_content)
+    add_node("summarizer", generate_blog_summary, agenerate_blog_summary)
+    add_node("final_post_generator", generate_linkedin_posts, agenerate_linkedin_posts)
+    add_node("x_generator", generate_x_posts, agenerate_x_posts)
+    add_node("self_evaluator", self_evaluator)
+    add_node("recovery_agent", recovery_agent)
 
     workflow.set_entry_point("capture_idea")
 
@@ -135,6 +407,7 @@ def create_workflow():
         should_generate_teaser,
         {
             "teaser_generator": "teaser_generator",
+            "blog_drafter": "blog_drafter",
             "planner_agent": "planner_agent",
             "scraper": "scraper",
         },
@@ -158,6 +431,55 @@ def create_workflow():
     workflow.add_edge("summarizer", "final_post_generator")
     workflow.add_edge("final_post_generator", "x_generator")
 
+    if pipelined:
+        _add_post_pipeline(workflow, add_node, asynchronous)
+    else:
+        _add_stage_review(workflow, add_node)
+
+    workflow.add_edge("recovery_agent", END)
+
+    return workflow.compile()
+
+
+def _add_post_pipeline(workflow: StateGraph, add_node: Callable, asynchronous: bool):
+    pipeline = create_post_pipeline(asynchronous)
+    add_node(
+        "post_pipeline",
+        make_post_pipeline_node(pipeline),
+        make_post_pipeline_node(pipeline, asynchronous=True),
+    )
+    add_node("collect_posts", collect_posts)
+
+    workflow.add_conditional_edges(
+        "x_generator",
+        fan_out_posts,
+        {
+            "post_pipeline": "post_pipeline",
+            "recovery_agent": "recovery_agent",
+            "END": END,
+        },
+    )
+    workflow.add_edge("post_pipeline", "collect_posts")
+    workflow.add_conditional_edges(
+        "collect_posts",
+        should_evaluate_or_recover,
+        {"self_evaluator": "self_evaluator", "recovery_agent": "recovery_agent"},
+    )
+    workflow.add_conditional_edges(
+        "self_evaluator",
+        should_loop_or_end,
+        {"recovery_agent": "recovery_agent", "END": END},
+    )
+
+
+def _add_stage_review(workflow: StateGraph, add_node: Callable):
+    add_node("validator", validate_posts, avalidate_posts)
+    add_node("peer_reviewer", peer_review_agent, apeer_review_agent)
+    add_node("content_improver", content_improver_agent, acontent_improver_agent)
+    for stage in ("review", "improvement"):
+        add_node(f"skip_{stage}", skip_for_deadline(stage))
+        workflow.add_edge(f"skip_{stage}", "self_evaluator")
+
     workflow.add_conditional_edges(
         "x_generator",
         should_validate_or_end,
@@ -169,6 +491,7 @@ def create_workflow():
         should_improve_or_evaluate,
         {
             "peer_reviewer": "peer_reviewer",
+            "skip_review": "skip_review",
             "self_evaluator": "self_evaluator",
             "recovery_agent": "recovery_agent",
         },
@@ -179,6 +502,7 @@ def create_workflow():
         should_improve_or_end,
         {
             "content_improver": "content_improver",
+            "skip_improvement": "skip_improvement",
             "self_evaluator": "self_evaluator",
             "recovery_agent": "recovery_agent",
         },
@@ -192,20 +516,24 @@ def create_workflow():
         {"validator": "validator", "recovery_agent": "recovery_agent", "END": END},
     )
 
-    workflow.add_edge("recovery_agent", END)
 
-    return workflow.compile()
+@lru_cache(maxsize=None)
+def get_workflow(pipelined: bool = True, asynchronous: bool = False):
+    # Compiling validates and wires the whole graph; worker processes run
+    # many jobs, so it is done once per process.
+    return create_workflow(pipelined, asynchronous=asynchronous)
 
 
-def run_automation(
-    idea_text: str, obsidian_notes: str = "", blog_url: str = "", phase: str = "idea"
-):
-    print("🚀 Starting Agentic Social Media Automation")
-    print("=" * 50)
-
-    initial_state: AutomationState = {
+def initial_automation_state(
+    idea_text: str,
+    obsidian_notes: str,
+    blog_url: str,
+    phase: str,
+    deadline: Optional[float] = None,
+) -> AutomationState:
+    return {
         "idea_text": idea_text,
-        "obsidian_notes": obsidian_notes,
+        "obsidian_notes": store_text(obsidian_notes),
         "blog_url": blog_url,
         "phase": phase,
         "blog_content": "",
@@ -213,23 +541,67 @@ def run_automation(
         "linkedin_posts": [],
         "x_posts": [],
         "validation_issues": [],
+        "fact_check_report": "",
         "peer_review_feedback": {},
         "improved_linkedin_posts": [],
         "improved_x_posts": [],
         "requires_human_review": False,
+        "human_review_reason": "",
+        "deadline_skips": [],
+        "review_flags": [],
+        "run_flags": [],
+        "deadline": deadline,
         "error": None,
         "custom_prompt": "",
         "improvement_summary": [],
         "improvement_iteration_count": 0,
+        "post_results": [],
     }
 
-    app = create_workflow()
-    final_state = app.invoke(initial_state)
 
+@contextmanager
+def run_span(phase: str):
+    # Root span for one run; every node, LLM call and fetch nests under it.
+    with span("automation run", {"automation.phase": phase}):
+        yield current_trace_id()
+
+
+def annotate_run(final_state: AutomationState) -> None:
+    annotate(
+        {
+            "automation.error": final_state.get("error"),
+            "automation.requires_human_review": final_state.get(
+                "requires_human_review", False
+            ),
+            "automation.human_review_reason": final_state.get("human_review_reason"),
+        }
+    )
+
+
+def finish_automation(final_state: AutomationState, replaying: bool = False) -> None:
+    # A replayed run already left its archive and pending-draft entries
+    # behind when it was recorded.
+    if not replaying:
+        archive_approved_posts(final_state)
+        record_pending_draft(final_state)
+    print_semantic_cache_report()
+    print_scoring_report()
+    print_singleflight_report()
+    print_model_report()
+
+
+def print_trace_id(trace_id: Optional[str]) -> None:
+    if trace_id:
+        print(f"🧭 Trace {trace_id} (python -m lib.tracing shows its critical path)")
+
+
+def print_automation_summary(final_state: AutomationState) -> None:
     if final_state.get("error"):
         print(f"\n❌ Automation failed: {final_state['error']}")
     elif final_state.get("requires_human_review"):
         print("\n⚠️ Automation completed but requires human review")
+        if final_state.get("human_review_reason"):
+            print(f"📋 Reason: {final_state['human_review_reason']}")
     else:
         print("\n🎉 Automation completed successfully!")
 
@@ -243,4 +615,77 @@ def run_automation(
             f"⚠️  Found {len(final_state['validation_issues'])} validation issues for review"
         )
 
+
+def run_automation(
+    idea_text: str,
+    obsidian_notes: str = "",
+    blog_url: str = "",
+    phase: str = "idea",
+    profile: bool = False,
+    cassette: Optional[Cassette] = None,
+    deadline_seconds: Optional[float] = None,
+):
+    print("🚀 Starting Agentic Social Media Automation")
+    print("=" * 50)
+
+    deadline = make_deadline(deadline_seconds)
+    initial_state = initial_automation_state(
+        idea_text, obsidian_notes, blog_url, phase, deadline
+    )
+    replaying = cassette is not None and cassette.replaying
+
+    if not replaying:
+        register_context_caches(template_prefixes())
+
+    profiler = Profiler().start() if profile else None
+    app = create_workflow(profiler=profiler) if profiler else get_workflow()
+    with use_cassette(cassette), use_deadline(deadline), run_span(phase) as trace_id:
+        try:
+            final_state = app.invoke(initial_state)
+        finally:
+            if profiler:
+                profiler.finish()
+        annotate_run(final_state)
+
+    finish_automation(final_state, replaying)
+    if profiler:
+        profiler.print_report()
+    print_automation_summary(final_state)
+    print_trace_id(trace_id)
+
+    return final_state
+
+
+async def arun_automation(
+    idea_text: str,
+    obsidian_notes: str = "",
+    blog_url: str = "",
+    phase: str = "idea",
+    cassette: Optional[Cassette] = None,
+    deadline_seconds: Optional[float] = None,
+):
+    # Same run as run_automation, driven with ainvoke so many automations can
+    # share one event loop instead of one blocked thread each.
+    print("🚀 Starting Agentic Social Media Automation")
+    print("=" * 50)
+
+    deadline = make_deadline(deadline_seconds)
+    initial_state = initial_automation_state(
+        idea_text, obsidian_notes, blog_url, phase, deadline
+    )
+
+    replaying = cassette is not None and cassette.replaying
+
+    if not replaying:
+        await asyncio.to_thread(register_context_caches, template_prefixes())
+
+    app = get_workflow(asynchronous=True)
+    with use_cassette(cassette), use_deadline(deadline), run_span(phase) as trace_id:
+        final_state = await app.ainvoke(initial_state)
+        annotate_run(final_state)
+
+    await asyncio.to_thread(finish_automation, final_state, replaying)
+    print_automation_summary(final_state)
+    print_trace_id(trace_id)
+
     return final_state
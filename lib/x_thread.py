@@ -0,0 +1,133 @@
+import re
+import unicodedata
+from typing import List
+
+# X counts text in weighted units: code points in these ranges weigh 1, all
+# others (CJK, emoji, ...) weigh 2, and every URL counts as 23 regardless of
+# its length. A tweet may hold 280 weighted units.
+MAX_TWEET_WEIGHT = 280
+URL_WEIGHT = 23
+_LIGHT_RANGES = [(0, 4351), (8192, 8205), (8208, 8223), (8242, 8247)]
+_URL_PATTERN = re.compile(r"https?://\S+")
+# "3/ text" or "3/8 text". Ratios like "24/7" or "50/50" also fit, which is
+# why pack_thread only accepts the next number in sequence.
+_NUMBERED_PATTERN = re.compile(r"^\s*(\d+)\s*/(?:\d+)?(?:\s+|$)(.*)$")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Joiners, variation selectors and skin-tone modifiers are part of the
+# preceding emoji and add no weight of their own.
+_ZERO_WEIGHT = {0x200D, 0xFE0E, 0xFE0F} | set(range(0x1F3FB, 0x1F400))
+
+
+def _char_weight(char: str) -> int:
+    code = ord(char)
+    if code in _ZERO_WEIGHT:
+        return 0
+    for low, high in _LIGHT_RANGES:
+        if low <= code <= high:
+            return 1
+    return 2
+
+
+def weighted_length(text: str) -> int:
+    text = unicodedata.normalize("NFC", text)
+    total = 0
+    position = 0
+    for match in _URL_PATTERN.finditer(text):
+        total += sum(_char_weight(c) for c in text[position : match.start()])
+        total += URL_WEIGHT
+        position = match.end()
+    return total + sum(_char_weight(c) for c in text[position:])
+
+
+def _split_words(text: str, budget: int) -> List[str]:
+    chunks: List[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if weighted_length(candidate) <= budget:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        while weighted_length(word) > budget:
+            cut = len(word)
+            while cut > 1 and weighted_length(word[:cut]) > budget:
+                cut -= 1
+            chunks.append(word[:cut])
+            word = word[cut:]
+        current = word
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def fit_text(text: str, budget: int = MAX_TWEET_WEIGHT) -> List[str]:
+    text = " ".join(text.split())
+    if weighted_length(text) <= budget:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_PATTERN.split(text):
+        candidate = f"{current} {sentence}" if current else sentence
+        if weighted_length(candidate) <= budget:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+        if weighted_length(sentence) <= budget:
+            current = sentence
+        else:
+            pieces = _split_words(sentence, budget)
+            chunks.extend(pieces[:-1])
+            current = pieces[-1] if pieces else ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def pack_thread(content: str, blog_url: str = "") -> List[str]:
+    preamble: List[str] = []
+    tweets: List[str] = []
+
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        numbered = _NUMBERED_PATTERN.match(line)
+        if numbered and int(numbered.group(1)) == len(tweets) + 1:
+            tweets.append(numbered.group(2))
+        elif tweets:
+            # Unnumbered text inside the thread continues the previous tweet.
+            tweets[-1] = f"{tweets[-1]} {line}"
+        else:
+            preamble.extend(fit_text(line))
+
+    if not tweets:
+        return preamble
+
+    if blog_url:
+        tweets = [" ".join(tweet.replace(blog_url, "").split()) for tweet in tweets]
+
+    # Reserve room for the widest "n/ " prefix the thread could need.
+    prefix_budget = len(f"{len(tweets) * 2}/ ")
+    bodies: List[str] = []
+    for tweet in tweets:
+        bodies.extend(fit_text(tweet, MAX_TWEET_WEIGHT - prefix_budget))
+
+    if blog_url:
+        if bodies and (
+            weighted_length(f"{bodies[-1]} {blog_url}")
+            <= MAX_TWEET_WEIGHT - prefix_budget
+        ):
+            bodies[-1] = f"{bodies[-1]} {blog_url}"
+        else:
+            bodies.append(blog_url)
+
+    return preamble + [f"{i}/ {body}" for i, body in enumerate(bodies, 1)]
+
+
+def pack_thread_content(content: str, blog_url: str = "") -> str:
+    return "\n\n".join(pack_thread(content, blog_url))
@@ -1,10 +1,13 @@
+import argparse
 import os
 from dotenv import load_dotenv
-from lib.workflow import run_automation
-from lib.obsidian import read_obsidian_notes
 
 load_dotenv()
 
+# Everything under lib is imported where it is used, after .env is loaded and
+# the environment checked, so `--help` or a missing key never pays for the
+# LangGraph/Gemini import chain.
+
 IDEA_TEXT = """
 Exploring the fascinating world of distributed systems and how eventual consistency works in practice. 
 DNS is perhaps the largest eventually consistent system in the world, with billions of queries happening every second across multiple layers of caching and resolution.
@@ -16,6 +19,8 @@ BLOG_URL = "https://www.piyushchoudhari.me/blog/SHAP-values-for-GBTs"
 
 
 def display_results(final_state):
+    from lib.blobs import load_text
+
     print("\n" + "=" * 60)
     print("📋 AUTOMATION RESULTS")
     print("=" * 60)
@@ -25,6 +30,8 @@ def display_results(final_state):
     print(
         f"⚠️  Requires Human Review: {final_state.get('requires_human_review', False)}"
     )
+    if final_state.get("human_review_reason"):
+        print(f"📋 Review Reason: {final_state['human_review_reason']}")
 
     if final_state.get("linkedin_posts"):
         print(f"\n📱 LinkedIn Posts: {len(final_state['linkedin_posts'])}")
@@ -61,14 +68,162 @@ def display_results(final_state):
         for issue in final_state["validation_issues"]:
             print(f"  • {issue}")
 
+    if final_state.get("fact_check_report"):
+        print("\n🔎 Fact-check report:")
+        print(load_text(final_state["fact_check_report"]))
+
+
+def parse_args(argv=None):
+    from lib.work_queue import DEFAULT_QUEUE_PATH
+
+    parser = argparse.ArgumentParser(description="Agentic social media automation")
+    parser.add_argument(
+        "--queue",
+        metavar="DB",
+        default=DEFAULT_QUEUE_PATH,
+        help="SQLite work queue shared by enqueuers and workers",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="add a job for the configured idea/blog to the queue instead of running it",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="run N worker processes that claim and execute queued jobs",
+    )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="stop workers once the queue is empty",
+    )
+    parser.add_argument(
+        "--watch-feed",
+        nargs="?",
+        const=os.getenv("BLOG_FEED_URL", ""),
+        metavar="FEED_URL",
+        help="poll the blog's RSS/Atom feed and enqueue final-phase jobs for new posts",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=300.0,
+        metavar="SECONDS",
+        help="feed polling interval for --watch-feed",
+    )
+    parser.add_argument(
+        "--watch-vault",
+        nargs="?",
+        const=os.getenv("OBSIDIAN_VAULT_DIR", os.path.dirname(OBSIDIAN_FILE_PATH)),
+        metavar="VAULT_DIR",
+        help="watch the Obsidian vault and enqueue a regeneration when relevant notes change",
+    )
+    parser.add_argument(
+        "--watch-phase",
+        choices=["idea", "draft"],
+        default="draft",
+        help="what --watch-vault regenerates: the teaser (idea) or the blog draft",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="end-to-end time budget; optional review stages are skipped to meet it",
+    )
+    parser.add_argument(
+        "--email-digest",
+        action="store_true",
+        help="email the finished posts as digests grouped by scheduled day "
+        "(with --workers: every finished job in the queue)",
+    )
+    parser.add_argument(
+        "--trace",
+        choices=["jsonl", "otlp"],
+        default=os.getenv("TRACE_EXPORTER") or None,
+        help="export OpenTelemetry spans to a JSON-lines file or an OTLP collector",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile each graph node (cProfile, tracemalloc, sampled stacks)",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        help="record every LLM and HTTP exchange of the run to a cassette file",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="serve LLM and HTTP responses from a recorded cassette (no network)",
+    )
+    parser.add_argument(
+        "--replay-strictness",
+        choices=["strict", "warn", "off"],
+        default="strict",
+        help="what a replayed call does when its prompt changed since recording",
+    )
+    return parser.parse_args(argv)
+
+
+def make_cassette(args):
+    if not (args.record or args.replay):
+        return None
+    from lib.cassette import Cassette
+
+    if args.record:
+        return Cassette(args.record, "record")
+    return Cassette(args.replay, "replay", args.replay_strictness)
+
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     print("🚀 Agentic Social Media Automation")
     print("Based on SPEC.md - Idea → Teaser → Blog → Final Posts")
     print("=" * 60)
 
+    if args.trace:
+        from lib.tracing import enable_tracing
+
+        try:
+            enable_tracing(args.trace)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+
+    if args.watch_feed is not None:
+        if not args.watch_feed:
+            print("❌ No feed URL given (pass one or set BLOG_FEED_URL)")
+            return 1
+        from lib.feed_watcher import watch_feed
+
+        watch_feed(args.watch_feed, interval=args.poll_interval, db_path=args.queue)
+        return 0
+
+    if args.watch_vault is not None:
+        from lib.vault_watcher import watch_vault
+
+        watch_vault(
+            args.watch_vault,
+            IDEA_TEXT,
+            OBSIDIAN_FILE_PATH,
+            phase=args.watch_phase,
+            db_path=args.queue,
+        )
+        return 0
+
     required_vars = ["GEMINI_API_KEY"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    if args.email_digest:
+        required_vars.append("DIGEST_TO")
+    # A replay never reaches the API, so it needs no key.
+    missing_vars = [
+        var for var in required_vars if not os.getenv(var) and not args.replay
+    ]
 
     if missing_vars:
         print(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
@@ -78,10 +233,23 @@ def main():
         return
 
     print("✅ Environment variables configured")
+
+    if args.workers:
+        from lib.work_queue import run_worker_pool
+
+        run_worker_pool(args.workers, db_path=args.queue, stop_when_empty=args.drain)
+        if args.email_digest:
+            from lib.email_digest import deliver_queue_digests
+
+            deliver_queue_digests(args.queue)
+        return 0
+
     print(f"💡 Idea: {IDEA_TEXT[:100]}...")
     print(f"📝 Obsidian File: {OBSIDIAN_FILE_PATH}")
     print(f"🌐 Blog URL: {BLOG_URL or 'Not yet published'}")
 
+    from lib.obsidian import read_obsidian_notes
+
     try:
         obsidian_notes = read_obsidian_notes(OBSIDIAN_FILE_PATH)
         print(
@@ -103,16 +271,43 @@ def main():
         phase = "idea"
         print("\n🎯 Starting from idea phase (no blog URL provided)")
 
+    if args.enqueue:
+        from lib.work_queue import enqueue_job
+
+        job_id = enqueue_job(
+            {
+                "idea_text": IDEA_TEXT,
+                "obsidian_notes": obsidian_notes,
+                "blog_url": BLOG_URL,
+                "phase": phase,
+                "deadline_seconds": args.deadline,
+            },
+            db_path=args.queue,
+        )
+        print(f"📥 Enqueued job {job_id} on {args.queue}")
+        return 0
+
+    from lib.workflow import run_automation
+
     try:
         final_state = run_automation(
             idea_text=IDEA_TEXT,
             obsidian_notes=obsidian_notes,
             blog_url=BLOG_URL,
             phase=phase,
+            profile=args.profile,
+            cassette=make_cassette(args),
+            deadline_seconds=args.deadline,
         )
 
         display_results(final_state)
 
+        # A replay must not repeat the recorded run's side effects.
+        if args.email_digest and not args.replay:
+            from lib.email_digest import deliver_run_digests
+
+            deliver_run_digests(final_state)
+
         if final_state.get("error"):
             print("\n❌ Workflow completed with errors")
             return 1
@@ -0,0 +1,87 @@
+import multiprocessing
+
+from lib import archive as archive_module
+from lib.archive import PostArchive, archive_approved_posts
+from lib.utils import SocialMediaPost
+
+
+def make_post(text, platform="linkedin", score=8.0):
+    return SocialMediaPost(
+        content=text,
+        platform=platform,
+        post_type="insight",
+        scheduled_day="Monday",
+        char_count=len(text),
+        validation_notes=[],
+        peer_review_score=score,
+    )
+
+
+def add_posts(directory, worker):
+    # Each worker's archive is loaded before the others have written.
+    archive = PostArchive(directory)
+    for i in range(20):
+        archive.add(
+            make_post(f"worker {worker} post {i} about caching", f"platform-{worker}")
+        )
+
+
+def test_concurrent_processes_append_whole_rows(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=add_posts, args=(str(tmp_path), worker))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    archive = PostArchive(str(tmp_path))
+
+    assert len(archive) == 80
+    platforms = {archive.row(row)["platform"] for row in range(len(archive))}
+    assert platforms == {f"platform-{worker}" for worker in range(4)}
+    assert archive.find_near_duplicates("worker 2 post 7 about caching")[0][1] == 1.0
+
+
+def test_add_skips_rows_another_process_already_wrote(tmp_path):
+    first = PostArchive(str(tmp_path))
+    second = PostArchive(str(tmp_path))
+
+    assert first.add(make_post("the same post"))
+    assert not second.add(make_post("the same post"))
+    assert len(PostArchive(str(tmp_path))) == 1
+
+
+def test_partial_row_is_cut_before_appending(tmp_path):
+    archive = PostArchive(str(tmp_path))
+    archive.add(make_post("first post"))
+    # A writer that died after the category columns.
+    with open(tmp_path / "platform.bin", "ab") as file:
+        file.write(b"\x00")
+
+    archive.add(make_post("second post", platform="x"))
+
+    reloaded = PostArchive(str(tmp_path))
+    assert len(reloaded) == 2
+    assert reloaded.row(1)["platform"] == "x"
+
+
+def archived_run_state(phase):
+    return {
+        "phase": phase,
+        "error": None,
+        "requires_human_review": False,
+        "linkedin_posts": [make_post(f"{phase} post about caching")],
+        "x_posts": [],
+    }
+
+
+def test_only_final_phase_runs_are_archived(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "_archive", PostArchive(str(tmp_path)))
+
+    assert archive_approved_posts(archived_run_state("teaser")) == 0
+    assert archive_approved_posts(archived_run_state("idea")) == 0
+    assert archive_approved_posts(archived_run_state("final")) == 1
+    assert len(PostArchive(str(tmp_path))) == 1
@@ -0,0 +1,37 @@
+from lib.social_media import pick_best_post
+from lib.utils import SocialMediaPost
+
+
+def make_post(content):
+    return SocialMediaPost(
+        content=content,
+        platform="X",
+        post_type="Thread",
+        scheduled_day="Tuesday",
+        char_count=len(content),
+        validation_notes=[],
+    )
+
+
+def test_banlisted_candidate_loses_to_one_with_a_single_hard_issue():
+    clean = make_post(
+        "1/ I cut p95 latency by 40% by caching embeddings. "
+        + "Here is the full story of the rollout and what broke. " * 6
+        + "\n2/ What would you cache first?"
+    )
+    banlisted = make_post(
+        "1/ Unlock cutting-edge latency wins.\n2/ Leverage caching to elevate."
+    )
+
+    assert pick_best_post([banlisted, clean], blog_url="") is clean
+
+
+def test_local_score_breaks_ties_between_clean_candidates():
+    flat = make_post("1/ Caching.\n2/ It helps.")
+    specific = make_post(
+        "1/ I cut p95 latency by 40% by caching embeddings.\n"
+        "2/ The trick was keying on a hash of the prompt prefix.\n"
+        "3/ What would you cache first?"
+    )
+
+    assert pick_best_post([flat, specific], blog_url="") is specific
@@ -0,0 +1,33 @@
+import threading
+
+from lib.cassette import RECORD, Cassette, active_cassette, use_cassette
+
+
+def test_concurrent_runs_see_their_own_cassette(tmp_path):
+    both_active = threading.Barrier(2)
+    seen = {}
+
+    def run(name):
+        cassette = Cassette(str(tmp_path / f"{name}.jsonl.gz"), RECORD)
+        with use_cassette(cassette):
+            both_active.wait()
+            seen[name] = active_cassette() is cassette
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"a": True, "b": True}
+    assert active_cassette() is None
+
+
+def test_nested_cassette_is_restored(tmp_path):
+    outer = Cassette(str(tmp_path / "outer.jsonl.gz"), RECORD)
+    inner = Cassette(str(tmp_path / "inner.jsonl.gz"), RECORD)
+
+    with use_cassette(outer):
+        with use_cassette(inner):
+            assert active_cassette() is inner
+        assert active_cassette() is outer
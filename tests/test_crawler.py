@@ -0,0 +1,63 @@
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lib.crawler import sitemap_urls
+
+INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{entries}
+</sitemapindex>
+"""
+URLSET = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{entries}
+</urlset>
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    handler = functools.partial(QuietHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def publish(name, template, *locations):
+        tag = "sitemap" if template is INDEX else "url"
+        entries = "\n".join(
+            f"<{tag}><loc>{base}/{loc}</loc></{tag}>" for loc in locations
+        )
+        (tmp_path / name).write_text(template.format(entries=entries))
+        return f"{base}/{name}"
+
+    yield base, publish
+    server.shutdown()
+    server.server_close()
+
+
+def test_sitemap_index_cycle_is_followed_once(site):
+    base, publish = site
+    publish("posts.xml", URLSET, "a", "b")
+    publish("other.xml", INDEX, "index.xml", "posts.xml")
+    index = publish("index.xml", INDEX, "index.xml", "other.xml", "posts.xml")
+
+    assert sitemap_urls(index) == [f"{base}/a", f"{base}/b"]
+
+
+def test_nesting_below_the_depth_cap_is_skipped(site):
+    base, publish = site
+    publish("posts.xml", URLSET, "deep")
+    publish("level2.xml", INDEX, "posts.xml")
+    publish("level1.xml", INDEX, "level2.xml")
+    index = publish("level0.xml", INDEX, "level1.xml")
+
+    assert sitemap_urls(index, max_depth=3) == [f"{base}/deep"]
+    assert sitemap_urls(index, max_depth=2) == []
@@ -0,0 +1,129 @@
+import socket
+from email import message_from_bytes
+
+import pytest
+
+import lib.email_digest as email_digest
+from lib.email_digest import SMTPPool, compose_digests, deliver_digests
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.delivered = []
+        self.peers = set()
+        # Digest keys to answer with a 451 once before accepting.
+        self.defer = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        key = message_from_bytes(envelope.content)["X-Post-Automation-Key"]
+        self.peers.add(session.peer)
+        if key in self.defer:
+            self.defer.discard(key)
+            return "451 4.3.0 Try again later"
+        self.delivered.append(key)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = controller_module.Controller(
+        handler, hostname="127.0.0.1", port=free_port()
+    )
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(email_digest, "RETRY_BASE_SECONDS", 0.0)
+
+
+def run_state():
+    posts = [
+        {
+            "content": f"Post for {day}",
+            "platform": "linkedin",
+            "post_type": "insight",
+            "scheduled_day": day,
+            "char_count": 12,
+            "validation_notes": [],
+            "peer_review_score": 8.5,
+        }
+        for day in DAYS
+    ]
+    return {"idea_text": "Caching", "blog_url": "", "linkedin_posts": posts}
+
+
+def digests():
+    return compose_digests(run_state(), key="job-1", recipients=["me@example.com"])
+
+
+def make_pool(controller, size=2):
+    return SMTPPool(controller.hostname, controller.port, size=size, starttls=False)
+
+
+def test_digests_share_pooled_connections(smtp_server, tmp_path):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+
+    report = deliver_digests(digests(), pool, db_path=str(tmp_path / "sent.sqlite"))
+    pool.close()
+
+    assert report["sent"] == len(DAYS)
+    assert sorted(handler.delivered) == sorted(f"job-1:{day}" for day in DAYS)
+    assert pool.stats["opened"] <= 2
+    assert len(handler.peers) == pool.stats["opened"]
+
+
+def test_451_reply_is_retried_on_the_same_connection(smtp_server, tmp_path):
+    controller, handler = smtp_server
+    handler.defer = {"job-1:Monday", "job-1:Friday"}
+    pool = make_pool(controller, size=1)
+
+    report = deliver_digests(digests(), pool, db_path=str(tmp_path / "sent.sqlite"))
+    pool.close()
+
+    assert report == {
+        "sent": len(DAYS),
+        "failed": 0,
+        "skipped": 0,
+        "connections": 1,
+    }
+    assert sorted(handler.delivered) == sorted(f"job-1:{day}" for day in DAYS)
+
+
+def test_rerun_does_not_resend(smtp_server, tmp_path):
+    controller, handler = smtp_server
+    db_path = str(tmp_path / "sent.sqlite")
+
+    deliver_digests(digests(), make_pool(controller), db_path=db_path)
+    report = deliver_digests(digests(), make_pool(controller), db_path=db_path)
+
+    assert report == {"sent": 0, "failed": 0, "skipped": len(DAYS)}
+    assert len(handler.delivered) == len(DAYS)
+
+
+def test_failed_digest_is_sent_by_the_next_run(smtp_server, tmp_path, monkeypatch):
+    controller, handler = smtp_server
+    db_path = str(tmp_path / "sent.sqlite")
+    monkeypatch.setattr(email_digest, "MAX_SEND_ATTEMPTS", 1)
+    handler.defer = {"job-1:Tuesday"}
+
+    first = deliver_digests(digests(), make_pool(controller), db_path=db_path)
+    second = deliver_digests(digests(), make_pool(controller), db_path=db_path)
+
+    assert (first["sent"], first["failed"]) == (len(DAYS) - 1, 1)
+    assert (second["sent"], second["skipped"]) == (1, len(DAYS) - 1)
+    assert handler.delivered.count("job-1:Tuesday") == 1
@@ -0,0 +1,41 @@
+import lib.social_media as social_media
+from lib.post_pipeline import _store_validation, make_post_state
+from lib.social_media import FACT_CHECK_ISSUE, validate_posts
+from lib.utils import SocialMediaPost
+
+
+def make_post():
+    return SocialMediaPost(
+        content="A post",
+        platform="linkedin",
+        post_type="insight",
+        scheduled_day="Monday",
+        char_count=6,
+        validation_notes=[],
+    )
+
+
+def test_clean_recheck_clears_the_post_report():
+    state = make_post_state(0, make_post(), "", "summary")
+
+    _store_validation(state, [], "Claim 2 is unsupported")
+    _store_validation(state, [], None)
+
+    assert state["fact_check_report"] == ""
+    assert state["validation_issues"] == []
+
+
+def test_clean_recheck_clears_the_run_report(monkeypatch):
+    reports = iter(["Claim 2 is unsupported", None])
+    monkeypatch.setattr(social_media, "check_post", lambda post, blog_url: [])
+    monkeypatch.setattr(
+        social_media, "fact_check_posts", lambda linkedin, x: next(reports)
+    )
+    state = {"linkedin_posts": [make_post()], "x_posts": [], "blog_url": ""}
+
+    validate_posts(state)
+    assert state["validation_issues"] == [FACT_CHECK_ISSUE]
+    validate_posts(state)
+
+    assert state["fact_check_report"] == ""
+    assert state["validation_issues"] == []
@@ -0,0 +1,129 @@
+import functools
+import json
+import multiprocessing
+import sqlite3
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import lib.feed_watcher as feed_watcher
+from lib.feed_watcher import (
+    _read_json,
+    pending_draft,
+    poll_feed,
+    record_pending_draft,
+)
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel>
+<item><guid>post-1</guid><title>First post</title><link>https://blog/1</link></item>
+<item><guid>post-2</guid><title>Second post</title><link>https://blog/2</link></item>
+</channel></rss>
+"""
+
+
+def draft_state(title):
+    return {
+        "phase": "draft",
+        "idea_text": f"Idea behind {title}",
+        "obsidian_notes": "",
+        "blog_content": f"# {title}\n\nBody",
+        "error": None,
+    }
+
+
+def record_drafts(path, worker):
+    for i in range(10):
+        record_pending_draft(draft_state(f"Worker {worker} draft {i}"), path)
+
+
+def test_concurrent_processes_keep_every_draft(tmp_path):
+    path = str(tmp_path / "pending.json")
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=record_drafts, args=(path, worker))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    assert len(_read_json(path, [])) == 40
+
+
+def test_draft_is_removed_once_its_job_is_enqueued(tmp_path):
+    path = str(tmp_path / "pending.json")
+    record_pending_draft(draft_state("Caching LLM calls"), path)
+
+    with pending_draft("Caching LLM Calls!", path) as draft:
+        assert draft["idea_text"] == "Idea behind Caching LLM calls"
+
+    assert _read_json(path, []) == []
+
+
+def test_draft_survives_a_failed_enqueue(tmp_path):
+    path = str(tmp_path / "pending.json")
+    record_pending_draft(draft_state("Caching LLM calls"), path)
+
+    with pytest.raises(RuntimeError):
+        with pending_draft("Caching LLM calls", path) as draft:
+            assert draft is not None
+            raise RuntimeError("queue is locked")
+
+    assert len(_read_json(path, [])) == 1
+
+
+def test_unmatched_title_yields_none(tmp_path):
+    path = str(tmp_path / "pending.json")
+    record_pending_draft(draft_state("Caching LLM calls"), path)
+
+    with pending_draft("A completely different post", path) as draft:
+        assert draft is None
+
+    assert len(_read_json(path, [])) == 1
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_url(tmp_path):
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "feed.xml").write_text(RSS)
+    handler = functools.partial(QuietHandler, directory=str(site))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/feed.xml"
+    server.shutdown()
+    server.server_close()
+
+
+def test_failed_enqueue_does_not_requeue_earlier_entries(
+    feed_url, tmp_path, monkeypatch
+):
+    pytest.importorskip("requests")
+    state_path = str(tmp_path / "feed_state.json")
+    (tmp_path / "feed_state.json").write_text(json.dumps({"seen": []}))
+    enqueued = []
+    failures = ["https://blog/2"]
+
+    def enqueue_job(payload, db_path):
+        if payload["blog_url"] in failures:
+            failures.remove(payload["blog_url"])
+            raise sqlite3.OperationalError("database is locked")
+        enqueued.append(payload["blog_url"])
+        return f"job-{len(enqueued)}"
+
+    monkeypatch.setattr(feed_watcher, "enqueue_job", enqueue_job)
+
+    with pytest.raises(sqlite3.OperationalError):
+        poll_feed(feed_url, state_path)
+    assert poll_feed(feed_url, state_path) == ["job-2"]
+
+    assert enqueued == ["https://blog/1", "https://blog/2"]
+    assert _read_json(state_path, {})["seen"] == ["post-1", "post-2"]
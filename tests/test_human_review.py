@@ -0,0 +1,43 @@
+from lib.post_pipeline import _store_review, make_post_state
+from lib.social_media import fact_check_skipped, summarize_reviews
+from lib.utils import SocialMediaPost
+
+
+def make_post(score=None):
+    return SocialMediaPost(
+        content="A post",
+        platform="x",
+        post_type="thread",
+        scheduled_day="Monday",
+        char_count=6,
+        validation_notes=[],
+        peer_review_score=score,
+    )
+
+
+def test_later_review_round_clears_earlier_flags():
+    post = make_post(4.0)
+    state = {"deadline_skips": [], "review_flags": [], "run_flags": []}
+
+    summarize_reviews(state, [post], [{"overall_score": 4.0}])
+    assert state["requires_human_review"]
+
+    post.peer_review_score = 9.0
+    summarize_reviews(state, [post], [{"overall_score": 9.0}])
+
+    assert not state["requires_human_review"]
+    assert state["human_review_reason"] == ""
+
+
+def test_deadline_skip_survives_a_clean_review_round():
+    post = make_post(9.0)
+    state = make_post_state(0, post, "https://example.com", "summary")
+
+    fact_check_skipped(state)
+    _store_review(state, {"overall_score": 4.0})
+    _store_review(state, {"overall_score": 9.0})
+
+    assert state["requires_human_review"]
+    assert state["human_review_reason"] == (
+        "Fact-check skipped to meet the run deadline"
+    )
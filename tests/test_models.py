@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import time
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+import lib.models as models
+from lib.prompts import TEMPLATES, RenderedPrompt
+
+PROMPT = RenderedPrompt(name="improve_post", prefix="House style.\n\n", body="Post")
+
+
+@pytest.fixture
+def context_cache(monkeypatch):
+    monkeypatch.setattr(models, "_context_caches", {})
+    model = models.model_for_node("improve_post_content").model
+    key = (model, models._prefix_key(PROMPT.prefix))
+
+    def register(expires_in):
+        expires_at = time.time() + expires_in
+        models._context_caches[key] = ("cachedContents/abc", expires_at)
+
+    return key, register
+
+
+def test_live_context_cache_sends_only_the_body(context_cache):
+    key, register = context_cache
+    register(models.CONTEXT_CACHE_TTL_SECONDS)
+
+    _, _, payload, cached_content = models._prepare_call(
+        "improve_post_content", PROMPT
+    )
+
+    assert cached_content == "cachedContents/abc"
+    assert payload == "Post"
+
+
+def test_expired_context_cache_is_dropped(context_cache):
+    key, register = context_cache
+    register(models.CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS - 1)
+
+    _, _, payload, cached_content = models._prepare_call(
+        "improve_post_content", PROMPT
+    )
+
+    assert cached_content is None
+    assert payload == PROMPT.text
+    assert key not in models._context_caches
+
+
+class FakeCaches:
+    def __init__(self):
+        self.created = []
+
+    def create(self, model, config):
+        self.created.append((model, config.display_name))
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    caches = FakeCaches()
+    genai = ModuleType("google.genai")
+    genai.Client = lambda api_key: SimpleNamespace(caches=caches)
+    genai.types = ModuleType("google.genai.types")
+    genai.types.CreateCachedContentConfig = SimpleNamespace
+    genai.types.Content = SimpleNamespace
+    genai.types.Part = SimpleNamespace
+    google = ModuleType("google")
+    google.genai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.genai", genai)
+    monkeypatch.setitem(sys.modules, "google.genai.types", genai.types)
+    monkeypatch.setattr(models, "_context_caches", {})
+    return caches
+
+
+def test_every_template_maps_to_the_nodes_that_render_it():
+    assert set(models.TEMPLATE_NODES) == set(TEMPLATES)
+    for nodes in models.TEMPLATE_NODES.values():
+        assert set(nodes) <= set(models.NODE_MODELS)
+
+
+def test_context_cache_is_registered_only_on_the_rendering_nodes_model(fake_genai):
+    prefix = "House style. " * models.CONTEXT_CACHE_MIN_TOKENS
+
+    registered = models.register_context_caches(
+        {"fact_check": prefix, "peer_review": "Too short to cache."}
+    )
+
+    model = models.model_for_node("validate_posts").model
+    assert registered == 1
+    assert fake_genai.created == [(model, "post-automation-fact_check")]
+    rendered = RenderedPrompt(name="fact_check", prefix=prefix, body="Posts")
+    _, _, payload, cached_content = models._prepare_call("validate_posts", rendered)
+    assert cached_content == "cachedContents/1"
+    assert payload == "Posts"
+
+    assert models.register_context_caches({"fact_check": prefix}) == 0
+
+
+class FakeClient:
+    def invoke(self, prompt):
+        return SimpleNamespace(content="ok", usage_metadata={})
+
+    async def ainvoke(self, prompt):
+        return SimpleNamespace(content="ok", usage_metadata={})
+
+
+@pytest.fixture
+def client_timeouts(monkeypatch):
+    timeouts = []
+
+    def fake_get_client(config, cached_content=None, timeout=None):
+        timeouts.append(timeout)
+        return FakeClient()
+
+    monkeypatch.setattr(models, "get_client", fake_get_client)
+    monkeypatch.setattr(models, "rate_limiter", models.RateLimiter(6000, 1))
+    return timeouts
+
+
+def test_limiter_wait_is_bounded_by_the_deadline(client_timeouts):
+    config = models.model_for_node("validate_posts")
+    models.rate_limiter.acquire()  # held by a hung call
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError, match="rate-limiter slot"):
+        models._call_hedged("validate_posts", config, 0.2, "prompt", None)
+
+    assert time.monotonic() - started < 1.0
+    assert client_timeouts == []
+
+
+def test_async_limiter_wait_is_bounded_by_the_deadline(client_timeouts):
+    config = models.model_for_node("validate_posts")
+    models.rate_limiter.acquire()
+
+    with pytest.raises(TimeoutError, match="rate-limiter slot"):
+        asyncio.run(
+            models._acall_hedged("validate_posts", config, 0.2, "prompt", None)
+        )
+
+
+def test_client_requests_time_out_with_the_node_deadline(client_timeouts):
+    config = models.model_for_node("validate_posts")
+
+    models._call_hedged("validate_posts", config, 5.0, "prompt", None)
+
+    assert client_timeouts == [models.NODE_DEADLINES["validate_posts"]]
+
+
+def test_acquire_many_gives_back_partial_slots_on_timeout():
+    limiter = models.RateLimiter(6000, 2)
+    limiter.acquire()
+
+    assert not limiter.acquire_many(2, timeout=0.05)
+    limiter.release()
+    assert limiter.acquire_many(2, timeout=0.05)
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+import lib.models as models
+import lib.prompt_cache as prompt_cache
+
+
+@pytest.fixture
+def llm_calls(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        prompt_cache, "SEMANTIC_CACHE_DB", str(tmp_path / "cache.sqlite")
+    )
+    calls = []
+
+    def fake_invoke_llm(node, prompt):
+        calls.append(prompt)
+        return SimpleNamespace(content=f"response {len(calls)}")
+
+    monkeypatch.setattr(prompt_cache, "invoke_llm", fake_invoke_llm)
+    return calls
+
+
+POST = (
+    "Caching LLM responses cut our bill in half. We keyed entries on the "
+    "static prompt and compared the variable parts with SimHash."
+)
+
+
+def review(post):
+    return prompt_cache.cached_invoke(
+        "peer_review_agent", f"Review this post:\n{post}", [post]
+    )
+
+
+def test_review_near_hit_is_not_reused(llm_calls):
+    review(POST)
+    # Same SimHash: punctuation and case are not features.
+    edited = POST.replace("half.", "half!")
+
+    assert prompt_cache.simhash(edited) == prompt_cache.simhash(POST)
+    assert review(edited) == "response 2"
+    assert len(llm_calls) == 2
+
+
+def test_review_exact_hit_is_reused(llm_calls):
+    first = review(POST)
+
+    assert review(POST) == first
+    assert len(llm_calls) == 1
+
+
+def test_changing_the_routed_model_misses(llm_calls, monkeypatch):
+    review(POST)
+    monkeypatch.setitem(
+        models.NODE_MODELS,
+        "peer_review_agent",
+        models.ModelConfig(model="gemini-2.5-pro", temperature=0.1),
+    )
+
+    review(POST)
+
+    assert len(llm_calls) == 2
@@ -0,0 +1,60 @@
+import pytest
+
+from lib.prompts import TEMPLATES, render_prompt
+
+SAMPLES = [
+    {
+        "blog_content": "first",
+        "idea_text": "first",
+        "obsidian_notes": "first",
+        "blog_summary": "first",
+        "blog_url": "https://example.com/a",
+        "linkedin_posts": "first",
+        "x_posts": "first",
+        "platform": "LinkedIn",
+        "post_type": "Monday Teaser",
+        "char_count": 1100,
+        "source_type": "blog",
+        "validation_notes": [],
+        "content": "first",
+        "issues": "[]",
+        "strengths": [],
+    },
+    {
+        "blog_content": "second {not a field}",
+        "idea_text": "second",
+        "obsidian_notes": "",
+        "blog_summary": "second",
+        "blog_url": "",
+        "linkedin_posts": "second",
+        "x_posts": "second",
+        "platform": "X",
+        "post_type": "X Thread",
+        "char_count": 900,
+        "source_type": "obsidian",
+        "validation_notes": ["issue"],
+        "content": "second",
+        "issues": "[{}]",
+        "strengths": ["s"],
+    },
+]
+
+
+@pytest.mark.parametrize("name", sorted(TEMPLATES))
+def test_prefix_is_stable_across_variables(name):
+    template = TEMPLATES[name]
+    first, second = (render_prompt(name, **sample) for sample in SAMPLES)
+
+    assert first.prefix == second.prefix == template.prefix
+    assert first.text.startswith(template.prefix)
+    assert first.body != second.body
+    assert template.prefix.startswith(template.shared_prefix)
+
+
+def test_values_keep_their_whitespace():
+    sketch = "    +-----+\n    | LLM |\n    +-----+\n\nCaching  works."
+    sample = dict(SAMPLES[0], content=sketch)
+
+    prompt = render_prompt("improve_post", **sample)
+
+    assert f"ORIGINAL POST:\n{sketch}\n" in prompt.body
@@ -0,0 +1,39 @@
+from lib.utils import SocialMediaPost, self_evaluator
+
+
+def make_post(score=None):
+    return SocialMediaPost(
+        content="A post",
+        platform="linkedin",
+        post_type="insight",
+        scheduled_day="Monday",
+        char_count=6,
+        validation_notes=[],
+        peer_review_score=score,
+    )
+
+
+def test_clean_run_is_not_flagged():
+    state = {"linkedin_posts": [make_post(), make_post()], "x_posts": [make_post()]}
+
+    state = self_evaluator(state)
+
+    assert not state.get("requires_human_review")
+    assert not state.get("human_review_reason")
+
+
+def test_unreviewed_posts_do_not_lower_the_average():
+    state = {"linkedin_posts": [make_post(9.0), make_post()], "x_posts": []}
+
+    state = self_evaluator(state)
+
+    assert not state.get("requires_human_review")
+
+
+def test_low_reviewed_average_is_flagged():
+    state = {"linkedin_posts": [make_post(6.0), make_post()], "x_posts": []}
+
+    state = self_evaluator(state)
+
+    assert state["requires_human_review"]
+    assert "Average quality score 6.0" in state["human_review_reason"]
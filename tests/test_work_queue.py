@@ -0,0 +1,110 @@
+import sys
+import threading
+import time
+from types import ModuleType
+
+import pytest
+
+import lib.work_queue as work_queue
+from lib.work_queue import (
+    _keep_lease_alive,
+    claim_job,
+    complete_job,
+    completed_results,
+    enqueue_job,
+    fail_job,
+    get_job,
+    heartbeat,
+    run_worker,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+
+@pytest.fixture
+def fake_workflow(monkeypatch):
+    # run_worker imports the graph lazily; the queue tests only need the
+    # final state it returns.
+    workflow = ModuleType("lib.workflow")
+    monkeypatch.setitem(sys.modules, "lib.workflow", workflow)
+    return workflow
+
+
+def test_run_that_ends_with_an_error_is_retried_then_failed(db_path, fake_workflow):
+    fake_workflow.run_automation = lambda **payload: {"error": "scraper timed out"}
+    job_id = enqueue_job({"idea_text": "caching"}, db_path)
+
+    assert run_worker(db_path, "worker-a", stop_when_empty=True) == (
+        work_queue.MAX_ATTEMPTS
+    )
+
+    job = get_job(job_id, db_path)
+    assert job["status"] == "failed"
+    assert job["attempts"] == work_queue.MAX_ATTEMPTS
+    assert "scraper timed out" in job["error"]
+    assert list(completed_results(db_path)) == []
+
+
+def test_clean_run_is_done(db_path, fake_workflow):
+    fake_workflow.run_automation = lambda **payload: {"error": None, **payload}
+    job_id = enqueue_job({"idea_text": "caching"}, db_path)
+
+    run_worker(db_path, "worker-a", stop_when_empty=True)
+
+    assert get_job(job_id, db_path)["status"] == "done"
+    assert list(completed_results(db_path)) == [
+        (job_id, {"error": None, "idea_text": "caching"})
+    ]
+
+
+def test_expired_lease_is_reclaimed_and_only_the_new_owner_finishes(db_path):
+    job_id = enqueue_job({"idea_text": "caching"}, db_path)
+    assert claim_job("worker-a", db_path, lease_seconds=0.0).attempts == 1
+    time.sleep(0.01)
+
+    reclaimed = claim_job("worker-b", db_path)
+
+    assert reclaimed.id == job_id
+    assert reclaimed.attempts == 2
+    assert not heartbeat(job_id, "worker-a", db_path)
+    assert not complete_job(job_id, "worker-a", {"late": True}, db_path)
+    assert not fail_job(job_id, "worker-a", "late failure", db_path)
+    assert complete_job(job_id, "worker-b", {"idea_text": "caching"}, db_path)
+    job = get_job(job_id, db_path)
+    assert job["status"] == "done"
+    assert job["result"] == {"idea_text": "caching"}
+    assert job["error"] is None
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(db_path):
+    job_id = enqueue_job({"idea_text": "caching"}, db_path)
+    for attempt in range(work_queue.MAX_ATTEMPTS):
+        claim_job(f"worker-{attempt}", db_path, lease_seconds=0.0)
+        time.sleep(0.01)
+
+    assert claim_job("worker-last", db_path) is None
+    job = get_job(job_id, db_path)
+    assert job["status"] == "failed"
+    assert job["error"] == "Lease expired after maximum attempts"
+
+
+def test_heartbeat_keeps_the_lease_from_being_reclaimed(db_path, monkeypatch):
+    monkeypatch.setattr(work_queue, "HEARTBEAT_SECONDS", 0.01)
+    job_id = enqueue_job({"idea_text": "caching"}, db_path)
+    claim_job("worker-a", db_path, lease_seconds=0.05)
+    stop = threading.Event()
+    keeper = threading.Thread(
+        target=_keep_lease_alive, args=(job_id, "worker-a", db_path, stop)
+    )
+    keeper.start()
+    try:
+        time.sleep(0.2)
+        assert claim_job("worker-b", db_path) is None
+    finally:
+        stop.set()
+        keeper.join()
+
+    assert complete_job(job_id, "worker-a", {"idea_text": "caching"}, db_path)
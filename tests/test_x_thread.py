@@ -0,0 +1,35 @@
+from lib.x_thread import pack_thread
+
+
+def test_numbered_lines_become_tweets():
+    content = "1/ Caching matters.\n2/3 It cut our bill.\n3/ Here is how."
+
+    assert pack_thread(content) == [
+        "1/ Caching matters.",
+        "2/ It cut our bill.",
+        "3/ Here is how.",
+    ]
+
+
+def test_ratio_at_line_start_is_not_a_tweet_number():
+    content = "1/ Reliability first.\n24/7 uptime is the goal.\n2/ Then speed."
+
+    assert pack_thread(content) == [
+        "1/ Reliability first. 24/7 uptime is the goal.",
+        "2/ Then speed.",
+    ]
+
+
+def test_ratio_before_the_thread_stays_in_the_preamble():
+    content = "50/50 odds this works.\n1/ Let's find out."
+
+    assert pack_thread(content) == ["50/50 odds this works.", "1/ Let's find out."]
+
+
+def test_out_of_sequence_number_continues_the_previous_tweet():
+    content = "1/ Two lessons.\n3/ skipped ahead\n2/ The second one."
+
+    assert pack_thread(content) == [
+        "1/ Two lessons. 3/ skipped ahead",
+        "2/ The second one.",
+    ]